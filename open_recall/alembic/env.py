@@ -22,6 +22,13 @@ config.set_main_option("sqlalchemy.url", str(engine.url))
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Leave the full-text index and its shadow tables, created by raw SQL, out of autogenerate"""
+    if type_ == "table":
+        return not name.startswith("screenshots_fts")
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -30,6 +37,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -41,7 +49,7 @@ def run_migrations_online() -> None:
     connectable = engine
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,27 @@
+"""Add monitor column to screenshots
+
+Revision ID: 3f2a9c1d7b45
+Revises: 176b845f3f94
+Create Date: 2026-10-18 09:12:40.512731
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c1d7b45"
+down_revision: Union[str, None] = "176b845f3f94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("screenshots", sa.Column("monitor", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("screenshots") as batch_op:
+        batch_op.drop_column("monitor")
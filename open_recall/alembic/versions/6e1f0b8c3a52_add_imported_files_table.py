@@ -0,0 +1,40 @@
+"""Add imported files table
+
+Revision ID: 6e1f0b8c3a52
+Revises: d4a7c2e91f36
+Create Date: 2026-10-18 15:02:47.518330
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6e1f0b8c3a52"
+down_revision: Union[str, None] = "d4a7c2e91f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "imported_files",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source_path", sa.String(), nullable=True),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("modified_at", sa.Float(), nullable=True),
+        sa.Column("screenshot_id", sa.Integer(), nullable=True),
+        sa.Column("imported_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["screenshot_id"], ["screenshots.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_imported_files_id"), "imported_files", ["id"], unique=False)
+    op.create_index(op.f("ix_imported_files_source_path"), "imported_files", ["source_path"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_imported_files_source_path"), table_name="imported_files")
+    op.drop_index(op.f("ix_imported_files_id"), table_name="imported_files")
+    op.drop_table("imported_files")
@@ -0,0 +1,29 @@
+"""Add encoded size and encode time to screenshots
+
+Revision ID: 8c4e1b2a9d60
+Revises: 3f2a9c1d7b45
+Create Date: 2026-10-18 10:03:17.280415
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e1b2a9d60"
+down_revision: Union[str, None] = "3f2a9c1d7b45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("screenshots", sa.Column("file_size", sa.Integer(), nullable=True))
+    op.add_column("screenshots", sa.Column("encode_time_ms", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("screenshots") as batch_op:
+        batch_op.drop_column("encode_time_ms")
+        batch_op.drop_column("file_size")
@@ -0,0 +1,65 @@
+"""Add screenshots full-text index
+
+Revision ID: 9a3c5e7f1b24
+Revises: 6e1f0b8c3a52
+Create Date: 2026-10-18 16:21:09.204871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a3c5e7f1b24"
+down_revision: Union[str, None] = "6e1f0b8c3a52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS screenshots_fts USING fts5(
+            extracted_text, window_title, notes,
+            content='screenshots', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS screenshots_fts_ai AFTER INSERT ON screenshots BEGIN
+            INSERT INTO screenshots_fts(rowid, extracted_text, window_title, notes)
+            VALUES (new.id, new.extracted_text, new.window_title, new.notes);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS screenshots_fts_ad AFTER DELETE ON screenshots BEGIN
+            INSERT INTO screenshots_fts(screenshots_fts, rowid, extracted_text, window_title, notes)
+            VALUES ('delete', old.id, old.extracted_text, old.window_title, old.notes);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS screenshots_fts_au
+        AFTER UPDATE OF extracted_text, window_title, notes ON screenshots BEGIN
+            INSERT INTO screenshots_fts(screenshots_fts, rowid, extracted_text, window_title, notes)
+            VALUES ('delete', old.id, old.extracted_text, old.window_title, old.notes);
+            INSERT INTO screenshots_fts(rowid, extracted_text, window_title, notes)
+            VALUES (new.id, new.extracted_text, new.window_title, new.notes);
+        END
+        """
+    )
+    # Backfill the index from the existing screenshots
+    op.execute("INSERT INTO screenshots_fts(screenshots_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS screenshots_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS screenshots_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS screenshots_fts_ai")
+    op.execute("DROP TABLE IF EXISTS screenshots_fts")
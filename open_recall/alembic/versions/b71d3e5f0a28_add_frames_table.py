@@ -0,0 +1,63 @@
+"""Add content-addressed frames table
+
+Revision ID: b71d3e5f0a28
+Revises: 8c4e1b2a9d60
+Create Date: 2026-10-18 11:26:05.904133
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71d3e5f0a28"
+down_revision: Union[str, None] = "8c4e1b2a9d60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "frames",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(), nullable=True),
+        sa.Column("perceptual_hash", sa.String(), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=True),
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("extracted_text", sa.Text(), nullable=True),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_path"),
+    )
+    op.create_index(op.f("ix_frames_id"), "frames", ["id"], unique=False)
+    op.create_index(op.f("ix_frames_content_hash"), "frames", ["content_hash"], unique=True)
+    op.create_index(op.f("ix_frames_perceptual_hash"), "frames", ["perceptual_hash"], unique=False)
+
+    with op.batch_alter_table("screenshots") as batch_op:
+        batch_op.add_column(sa.Column("frame_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_screenshots_frame_id_frames", "frames", ["frame_id"], ["id"], ondelete="SET NULL"
+        )
+    op.create_index(op.f("ix_screenshots_frame_id"), "screenshots", ["frame_id"], unique=False)
+
+    # Repeat sightings of a frame share its file, so file_path can no longer be unique
+    op.drop_index(op.f("ix_screenshots_file_path"), table_name="screenshots")
+    op.create_index(op.f("ix_screenshots_file_path"), "screenshots", ["file_path"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_screenshots_file_path"), table_name="screenshots")
+    op.create_index(op.f("ix_screenshots_file_path"), "screenshots", ["file_path"], unique=True)
+    op.drop_index(op.f("ix_screenshots_frame_id"), table_name="screenshots")
+    with op.batch_alter_table("screenshots") as batch_op:
+        batch_op.drop_constraint("fk_screenshots_frame_id_frames", type_="foreignkey")
+        batch_op.drop_column("frame_id")
+    op.drop_index(op.f("ix_frames_perceptual_hash"), table_name="frames")
+    op.drop_index(op.f("ix_frames_content_hash"), table_name="frames")
+    op.drop_index(op.f("ix_frames_id"), table_name="frames")
+    op.drop_table("frames")
@@ -0,0 +1,125 @@
+"""Add screenshot and tag count rollups
+
+Revision ID: c5e2a8d4f7b3
+Revises: 9a3c5e7f1b24
+Create Date: 2026-10-18 19:42:31.660213
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e2a8d4f7b3"
+down_revision: Union[str, None] = "9a3c5e7f1b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY = "day, app_name, monitor, is_favorite"
+
+
+def _key(row: str) -> str:
+    return (
+        f"coalesce(date({row}.timestamp), ''), coalesce({row}.app_name, ''), "
+        f"coalesce({row}.monitor, -1), coalesce({row}.is_favorite, 0)"
+    )
+
+
+def _add(row: str) -> str:
+    return f"""
+        INSERT INTO screenshot_rollups({KEY}, screenshot_count) VALUES ({_key(row)}, 1)
+        ON CONFLICT({KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+        INSERT INTO tag_rollups(tag_id, {KEY}, screenshot_count)
+        SELECT tag_id, {_key(row)}, 1 FROM screenshot_tags WHERE screenshot_id = {row}.id
+        ON CONFLICT(tag_id, {KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+    """
+
+
+def _remove(row: str) -> str:
+    return f"""
+        UPDATE screenshot_rollups SET screenshot_count = screenshot_count - 1 WHERE ({KEY}) = ({_key(row)});
+        DELETE FROM screenshot_rollups WHERE ({KEY}) = ({_key(row)}) AND screenshot_count <= 0;
+        UPDATE tag_rollups SET screenshot_count = screenshot_count - 1
+        WHERE ({KEY}) = ({_key(row)}) AND tag_id IN (SELECT tag_id FROM screenshot_tags WHERE screenshot_id = {row}.id);
+        DELETE FROM tag_rollups WHERE ({KEY}) = ({_key(row)}) AND screenshot_count <= 0;
+    """
+
+
+def _rollup_columns():
+    return (
+        sa.Column("day", sa.String(), nullable=False),
+        sa.Column("app_name", sa.String(), nullable=False),
+        sa.Column("monitor", sa.Integer(), nullable=False),
+        sa.Column("is_favorite", sa.Boolean(), nullable=False),
+        sa.Column("screenshot_count", sa.Integer(), nullable=False),
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "screenshot_rollups",
+        *_rollup_columns(),
+        sa.PrimaryKeyConstraint("day", "app_name", "monitor", "is_favorite"),
+    )
+    op.create_table(
+        "tag_rollups",
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        *_rollup_columns(),
+        sa.PrimaryKeyConstraint("tag_id", "day", "app_name", "monitor", "is_favorite"),
+    )
+
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS screenshot_rollups_ai AFTER INSERT ON screenshots BEGIN {_add('new')} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS screenshot_rollups_ad AFTER DELETE ON screenshots BEGIN {_remove('old')} END"
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS screenshot_rollups_au
+        AFTER UPDATE OF timestamp, app_name, monitor, is_favorite ON screenshots
+        BEGIN {_remove('old')} {_add('new')} END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tag_rollups_ai AFTER INSERT ON screenshot_tags BEGIN
+            INSERT INTO tag_rollups(tag_id, {KEY}, screenshot_count)
+            SELECT new.tag_id, {_key('s')}, 1 FROM screenshots s WHERE s.id = new.screenshot_id
+            ON CONFLICT(tag_id, {KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tag_rollups_ad AFTER DELETE ON screenshot_tags BEGIN
+            UPDATE tag_rollups SET screenshot_count = screenshot_count - 1
+            WHERE tag_id = old.tag_id
+                AND ({KEY}) = (SELECT {_key('s')} FROM screenshots s WHERE s.id = old.screenshot_id);
+            DELETE FROM tag_rollups WHERE tag_id = old.tag_id AND screenshot_count <= 0;
+        END
+        """
+    )
+
+    # Backfill the rollups from the existing screenshots and tags
+    op.execute(
+        f"INSERT INTO screenshot_rollups({KEY}, screenshot_count) "
+        f"SELECT {_key('s')}, count(*) FROM screenshots s GROUP BY 1, 2, 3, 4"
+    )
+    op.execute(
+        f"INSERT INTO tag_rollups(tag_id, {KEY}, screenshot_count) "
+        f"SELECT st.tag_id, {_key('s')}, count(*) FROM screenshot_tags st "
+        "JOIN screenshots s ON s.id = st.screenshot_id GROUP BY 1, 2, 3, 4, 5"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS tag_rollups_ad")
+    op.execute("DROP TRIGGER IF EXISTS tag_rollups_ai")
+    op.execute("DROP TRIGGER IF EXISTS screenshot_rollups_au")
+    op.execute("DROP TRIGGER IF EXISTS screenshot_rollups_ad")
+    op.execute("DROP TRIGGER IF EXISTS screenshot_rollups_ai")
+    op.drop_table("tag_rollups")
+    op.drop_table("screenshot_rollups")
@@ -0,0 +1,35 @@
+"""Add packed word geometry table
+
+Revision ID: d4a7c2e91f36
+Revises: b71d3e5f0a28
+Create Date: 2026-10-18 12:48:31.271604
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c2e91f36"
+down_revision: Union[str, None] = "b71d3e5f0a28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "frame_words",
+        sa.Column("frame_id", sa.Integer(), nullable=False),
+        sa.Column("word_count", sa.Integer(), nullable=True),
+        sa.Column("truncated", sa.Boolean(), nullable=True),
+        sa.Column("byte_size", sa.Integer(), nullable=True),
+        sa.Column("data", sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(["frame_id"], ["frames.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("frame_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("frame_words")
@@ -0,0 +1,27 @@
+"""Add ocr_skipped column to frames
+
+Revision ID: e8b1f6a3d259
+Revises: c5e2a8d4f7b3
+Create Date: 2026-10-18 21:05:17.384920
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b1f6a3d259"
+down_revision: Union[str, None] = "c5e2a8d4f7b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("frames", sa.Column("ocr_skipped", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("frames") as batch_op:
+        batch_op.drop_column("ocr_skipped")
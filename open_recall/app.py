@@ -17,7 +17,7 @@ from open_recall import __version__
 
 # Import the FastAPI app
 from open_recall.main import app as fastapi_app
-from open_recall.main import load_config
+from open_recall.utils.config import load_config
 from open_recall.utils.settings import BASE_DIR
 
 # Filter out specific warnings from third-party libraries
@@ -12,14 +12,19 @@ from enum import Enum
 
 import uvicorn
 
-from open_recall.main import app as fastapi_app
-from open_recall.main import load_config
+from open_recall.utils.config import load_config
 
 
 class CommandEnum(Enum):
     SERVER = "server"
     DESKTOP = "desktop"
     VERSION = "version"
+    BENCHMARK_OCR = "benchmark-ocr"
+    REPROCESS_OCR = "reprocess-ocr"
+    IMPORT = "import"
+    BENCHMARK_SEARCH = "benchmark-search"
+    EMBED_SCREENSHOTS = "embed-screenshots"
+    REBUILD_ROLLUPS = "rebuild-rollups"
 
 
 def get_parser():
@@ -45,6 +50,105 @@ def get_parser():
     # Version command
     subparsers.add_parser(CommandEnum.VERSION.value, help="Show Open_Recall version")
 
+    # OCR benchmark command
+    benchmark_parser = subparsers.add_parser(
+        CommandEnum.BENCHMARK_OCR.value, help="Compare OCR backends for speed and accuracy on a set of images"
+    )
+    benchmark_parser.add_argument("image_dir", help="Directory of images, optionally with <name>.txt ground truth")
+    benchmark_parser.add_argument(
+        "--backends", nargs="+", default=["doctr", "onnx", "onnx_int8"], help="OCR backends to compare"
+    )
+    benchmark_parser.add_argument("--batch-size", type=int, default=8, help="Pages per OCR call (default: 8)")
+    benchmark_parser.add_argument(
+        "--threads", type=int, default=None, help="Intra-op threads per backend (default: runtime default)"
+    )
+    benchmark_parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the images (default: 3)")
+    benchmark_parser.add_argument("--limit", type=int, default=None, help="Only use the first N images")
+    benchmark_parser.add_argument(
+        "--profiles", nargs="+", default=["accurate"], help="OCR preprocessing profiles to compare (default: accurate)"
+    )
+    benchmark_parser.add_argument(
+        "--json", dest="json_path", default=None, help="Also write the full results to a file"
+    )
+
+    # OCR reprocessing command
+    reprocess_parser = subparsers.add_parser(
+        CommandEnum.REPROCESS_OCR.value, help="Re-run OCR over the stored screenshots, resuming where it last stopped"
+    )
+    reprocess_parser.add_argument("--start-date", default=None, help="Only screenshots from this ISO date/time on")
+    reprocess_parser.add_argument("--end-date", default=None, help="Only screenshots up to this ISO date/time")
+    reprocess_parser.add_argument(
+        "--only-empty", action="store_true", help="Only screenshots that have no extracted text"
+    )
+    reprocess_parser.add_argument("--batch-size", type=int, default=8, help="Pages per OCR call (default: 8)")
+    reprocess_parser.add_argument(
+        "--chunk-size", type=int, default=64, help="Screenshots per database transaction (default: 64)"
+    )
+    reprocess_parser.add_argument(
+        "--decode-workers", type=int, default=2, help="Processes decoding images (default: 2)"
+    )
+    reprocess_parser.add_argument(
+        "--max-pages-per-second", type=float, default=None, help="Throttle OCR to this rate (default: unlimited)"
+    )
+    reprocess_parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint of an unfinished run and start over"
+    )
+
+    # Import command
+    import_parser = subparsers.add_parser(
+        CommandEnum.IMPORT.value, help="Import a folder of screenshots taken by other tools into the archive"
+    )
+    import_parser.add_argument("directory", help="Folder to import images from, including subfolders")
+    import_parser.add_argument(
+        "--app-name", default="Imported", help="App name recorded for the imported screenshots (default: Imported)"
+    )
+    import_parser.add_argument(
+        "--chunk-size", type=int, default=32, help="Files written per database transaction (default: 32)"
+    )
+    import_parser.add_argument(
+        "--decode-workers", type=int, default=2, help="Processes decoding and encoding images (default: 2)"
+    )
+    import_parser.add_argument(
+        "--ocr-workers", type=int, default=0, help="OCR worker processes; 0 runs OCR in this process (default: 0)"
+    )
+    import_parser.add_argument("--batch-size", type=int, default=8, help="Pages per OCR call (default: 8)")
+
+    # Search benchmark command
+    search_benchmark_parser = subparsers.add_parser(
+        CommandEnum.BENCHMARK_SEARCH.value, help="Compare substring and full-text search latency on a synthetic archive"
+    )
+    search_benchmark_parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000, 100000], help="Archive sizes to time (default: 10000 100000)"
+    )
+    search_benchmark_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (default: 5)")
+    search_benchmark_parser.add_argument(
+        "--text-words", type=int, default=200, help="Words of OCR text per screenshot (default: 200)"
+    )
+    search_benchmark_parser.add_argument(
+        "--db", dest="db_path", default=None, help="Build the synthetic archive in this file and keep it"
+    )
+    search_benchmark_parser.add_argument(
+        "--json", dest="json_path", default=None, help="Also write the full results to a file"
+    )
+
+    # Semantic index backfill command
+    embed_parser = subparsers.add_parser(
+        CommandEnum.EMBED_SCREENSHOTS.value, help="Add the stored screenshots to the semantic search index"
+    )
+    embed_parser.add_argument("--batch-size", type=int, default=16, help="Texts per model call (default: 16)")
+    embed_parser.add_argument(
+        "--chunk-size", type=int, default=256, help="Screenshots read from the database at a time (default: 256)"
+    )
+    embed_parser.add_argument(
+        "--rebuild", action="store_true", help="Empty the index first and embed every screenshot again"
+    )
+
+    # Rollup rebuild command
+    subparsers.add_parser(
+        CommandEnum.REBUILD_ROLLUPS.value,
+        help="Recompute the screenshot count rollups behind facets and listing totals",
+    )
+
     return parser
 
 
@@ -69,7 +173,9 @@ def main():
         if not args.no_browser:
             webbrowser.open(f"http://{host}:{port}")
 
-        # Start the server
+        # Start the server; the app is imported here so other commands stay fast
+        from open_recall.main import app as fastapi_app
+
         uvicorn.run(fastapi_app, host=host, port=port)
 
     elif args.command == CommandEnum.DESKTOP.value:
@@ -82,6 +188,137 @@ def main():
     elif args.command == CommandEnum.VERSION.value:
         print(f"Open_Recall version {__version__}")
 
+    elif args.command == CommandEnum.BENCHMARK_OCR.value:
+        import json
+
+        from open_recall.utils.ocr_benchmark import format_report, run_benchmark
+
+        report = run_benchmark(
+            args.image_dir,
+            args.backends,
+            batch_size=args.batch_size,
+            threads=args.threads,
+            repeat=args.repeat,
+            limit=args.limit,
+            profiles=args.profiles,
+        )
+        print(format_report(report))
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    elif args.command == CommandEnum.REPROCESS_OCR.value:
+        from datetime import datetime
+
+        from open_recall.utils.reprocess import OCRReprocessJob
+        from open_recall.utils.screenshot_utils import screenshot_manager
+
+        job = OCRReprocessJob(
+            screenshot_manager.storage_path,
+            start_date=datetime.fromisoformat(args.start_date) if args.start_date else None,
+            end_date=datetime.fromisoformat(args.end_date) if args.end_date else None,
+            only_empty=args.only_empty,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            decode_workers=args.decode_workers,
+            max_pages_per_second=args.max_pages_per_second,
+            resume=not args.restart,
+            on_progress=lambda status: print(
+                f"{status['progress']['screenshots']}/{status['progress']['total']} screenshots, "
+                f"{status['pages_per_second']} pages/s"
+            ),
+        )
+        job.run()
+        status = job.get_status()
+        progress = status["progress"]
+        print(
+            f"OCR reprocessing {status['state']}: {progress['screenshots']}/{progress['total']} screenshots, "
+            f"{progress['pages']} pages read, {progress['failed']} unreadable, {status['pages_per_second']} pages/s"
+        )
+        if status["state"] == "failed":
+            print(f"Error: {status['error']}")
+            return 1
+
+    elif args.command == CommandEnum.IMPORT.value:
+        from open_recall.utils.db_utils import Base, engine
+        from open_recall.utils.importer import ScreenshotImporter
+        from open_recall.utils.screenshot_utils import screenshot_manager
+
+        if not os.path.isdir(args.directory):
+            print(f"Error: {args.directory} is not a directory")
+            return 1
+        # The archive may not have been created yet if the server never ran
+        Base.metadata.create_all(bind=engine)
+
+        importer = ScreenshotImporter(
+            screenshot_manager.storage_path,
+            app_name=args.app_name,
+            chunk_size=args.chunk_size,
+            decode_workers=args.decode_workers,
+            ocr_workers=args.ocr_workers,
+            batch_size=args.batch_size,
+            on_progress=lambda status: print(
+                f"{status['imported'] + status['duplicates'] + status['failed']}/"
+                f"{status['found'] - status['skipped']} files, {status['files_per_second']} files/s, "
+                f"{status['pages_per_second']} pages/s, {status['mb_per_second']} MB/s"
+            ),
+        )
+        status = importer.run(args.directory)
+        print(
+            f"Import finished in {status['elapsed_s']}s: {status['imported']} imported, "
+            f"{status['duplicates']} duplicates, {status['skipped']} already imported, {status['failed']} unreadable"
+        )
+
+    elif args.command == CommandEnum.BENCHMARK_SEARCH.value:
+        import json
+
+        from open_recall.utils.search_benchmark import (
+            format_report,
+            run_search_benchmark,
+        )
+
+        report = run_search_benchmark(args.rows, repeat=args.repeat, text_words=args.text_words, db_path=args.db_path)
+        print(format_report(report))
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    elif args.command == CommandEnum.EMBED_SCREENSHOTS.value:
+        from open_recall.utils.db_utils import Base, engine
+        from open_recall.utils.semantic_search import EmbeddingBackfillJob
+
+        Base.metadata.create_all(bind=engine)
+        job = EmbeddingBackfillJob(
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            rebuild=args.rebuild,
+            on_progress=lambda status: print(
+                f"{status['progress']['screenshots']}/{status['progress']['total']} screenshots, "
+                f"{status['texts_per_second']} texts/s"
+            ),
+        )
+        job.run()
+        status = job.get_status()
+        progress = status["progress"]
+        print(
+            f"Embedding {status['state']}: {progress['embedded']} screenshots embedded, "
+            f"{progress['skipped']} already indexed or without text, {status['texts_per_second']} texts/s"
+        )
+        if status["state"] == "failed":
+            print(f"Error: {status['error']}")
+            return 1
+
+    elif args.command == CommandEnum.REBUILD_ROLLUPS.value:
+        from open_recall.utils.db_utils import Base, engine, rebuild_rollups
+
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            result = rebuild_rollups(connection)
+        print(
+            f"Rebuilt {result['screenshot_rollups']} screenshot and {result['tag_rollups']} tag rollup rows, "
+            f"{result['corrected']} of them had drifted"
+        )
+
     else:
         parser.print_help()
         return 1
@@ -1,4 +1,4 @@
-import json
+import asyncio
 import math
 import multiprocessing
 import os
@@ -6,25 +6,76 @@ import signal
 import sys
 from contextlib import asynccontextmanager
 from datetime import datetime, time
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import uvicorn
 from fastapi import Depends, FastAPI, HTTPException, Query, Request, WebSocket
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import func, or_
 
-from open_recall.utils.db_utils import Base, Screenshot, Tag, engine, get_db
+from open_recall.utils.change_detection import CHANGE_DETECTORS
+from open_recall.utils.config import load_config
+from open_recall.utils.db_utils import (
+    KEYSET_ORDER,
+    Base,
+    Screenshot,
+    Tag,
+    after_cursor,
+    count_screenshots,
+    encode_cursor,
+    engine,
+    frame_crud,
+    frame_words_crud,
+    get_db,
+    rollup_app_names,
+    screenshot_facets,
+    screenshot_text_filter,
+)
+from open_recall.utils.db_utils.fts import (
+    bm25_score,
+    fts_match,
+    fts_match_clause,
+    is_fts_available,
+    mark_matches,
+    plain_snippet,
+    screenshots_fts,
+    snippet_columns,
+    to_fts_query,
+)
+from open_recall.utils.encoding import get_available_profiles, is_profile_available
+from open_recall.utils.events import event_bus
+from open_recall.utils.exclusion import ExclusionRules
+from open_recall.utils.journal import ingestion_journal
+from open_recall.utils.model_loader import model_warmup, models_to_warm_up
+from open_recall.utils.ocr_cache import ocr_cache
+from open_recall.utils.ocr_preprocessing import OCR_PROFILES, ocr_profile_stats
+from open_recall.utils.ocr_utils import (
+    OCR_BACKENDS,
+    extract_words_batch,
+    reset_ocr_processor,
+)
+from open_recall.utils.pipeline import DROP_POLICIES
+from open_recall.utils.reprocess import OCRReprocessJob, reprocess_manager
 from open_recall.utils.schemas import (
     BaseModel,
+    CursorPage,
     EventType,
     Page,
     ScreenshotResponse,
+    SearchResultResponse,
     TagCreate,
     TagResponse,
 )
 from open_recall.utils.screenshot_utils import screenshot_manager
-from open_recall.utils.settings import BASE_DIR, settings_manager
+from open_recall.utils.semantic_search import (
+    EmbeddingBackfillJob,
+    embedding_backfill,
+    forget_screenshots,
+    semantic_matches,
+)
+from open_recall.utils.settings import BASE_DIR, DEFAULT_SETTINGS, settings_manager
 from open_recall.utils.summarization import (
     download_model,
     generate_search_results_summary,
@@ -32,6 +83,8 @@ from open_recall.utils.summarization import (
     get_available_models,
     is_model_downloaded,
 )
+from open_recall.utils.vector_index import INDEX_DTYPES, vector_index
+from open_recall.utils.word_geometry import find_match_boxes
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -42,20 +95,6 @@ os.makedirs(screenshots_dir, exist_ok=True)
 os.makedirs(screenshot_manager.storage_path, exist_ok=True)
 
 
-# Load configuration from config.json
-def load_config():
-    try:
-        config_path = os.path.join(os.path.dirname(__file__), "config.json")
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                config = json.load(f)
-            return config
-        return {"app": {"port": 8742, "host": "localhost", "debug": False}}
-    except Exception as e:
-        print(f"Error loading config: {e}")
-        return {"app": {"port": 8742, "host": "localhost", "debug": False}}
-
-
 # Get configuration
 config = load_config()
 APP_PORT = int(os.environ.get("OPEN_RECALL_PORT", config["app"]["port"]))
@@ -83,14 +122,26 @@ def on_worker_exit(server):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: start the screenshot manager
+    # Startup: deliver capture events to WebSocket clients, then start the screenshot manager
+    event_dispatcher = asyncio.create_task(event_bus.run(manager.broadcast))
     if multiprocessing.current_process().name == "MainProcess":
         screenshot_manager.start()
+        # Load the OCR and summarization models in the background once the server is up
+        model_warmup.warm_up_in_background(models_to_warm_up(), delay=1.0)
     yield
     # Shutdown: stop the screenshot manager
     if multiprocessing.current_process().name == "MainProcess":
         print("FastAPI shutting down, stopping screenshot manager...")
-        screenshot_manager.stop()
+        # A reprocessing job resumes from its checkpoint on the next start
+        reprocess_manager.cancel()
+        embedding_backfill.cancel()
+        # Stopping drains the pipeline, so run it off the loop while the dispatcher keeps delivering
+        await asyncio.to_thread(screenshot_manager.stop)
+    event_dispatcher.cancel()
+    try:
+        await event_dispatcher
+    except asyncio.CancelledError:
+        pass
 
 
 app = FastAPI(lifespan=lifespan)
@@ -108,58 +159,352 @@ async def read_root(request: Request):
     return templates.TemplateResponse(request=request, name="index.html")
 
 
-@app.get("/api/screenshots", response_model=Page[ScreenshotResponse])
-async def get_screenshots(
+# Candidates of each kind fused by hybrid search, and the most screenshots its filters may leave
+# for the semantic search to be run exactly over them
+HYBRID_MAX_CANDIDATES = 1000
+HYBRID_PREFILTER_LIMIT = 100000
+
+
+def _parse_date(value: Optional[str], name: str) -> Optional[datetime]:
+    """Parse an ISO date filter, rejecting the request if it is malformed"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} format")
+
+
+def _filter_screenshots(
+    query,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
     is_favorite: Optional[bool] = None,
-    tag_ids: Optional[List[int]] = Query(None),
-    search_text: Optional[str] = None,
-    page: int = Query(1, ge=1),
-    size: int = Query(12, ge=1, le=100),
-    db=Depends(get_db),
+    tag_ids: Optional[List[int]] = None,
 ):
-    # Base query
-    query = db.query(Screenshot)
-
-    # Apply filters
-    if start_date:
-        try:
-            start_datetime = datetime.fromisoformat(start_date)
-            query = query.filter(Screenshot.timestamp >= start_datetime)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid start_date format")
-
-    if end_date:
-        try:
-            end_datetime = datetime.fromisoformat(end_date)
-            query = query.filter(Screenshot.timestamp <= end_datetime)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid end_date format")
+    """Apply the filters the screenshot listing and search endpoints share"""
+    start_datetime = _parse_date(start_date, "start_date")
+    if start_datetime is not None:
+        query = query.filter(Screenshot.timestamp >= start_datetime)
+    end_datetime = _parse_date(end_date, "end_date")
+    if end_datetime is not None:
+        query = query.filter(Screenshot.timestamp <= end_datetime)
 
     if app_name:
         query = query.filter(Screenshot.app_name == app_name)
+    if monitor is not None:
+        query = query.filter(Screenshot.monitor == monitor)
     if is_favorite is not None:
         query = query.filter(Screenshot.is_favorite == is_favorite)
     if tag_ids:
         query = query.filter(Screenshot.tags.any(Tag.id.in_(tag_ids)))
+    return query
+
+
+def _count_filtered(
+    db,
+    query,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    app_name: Optional[str],
+    monitor: Optional[int],
+    is_favorite: Optional[bool],
+    tag_ids: Optional[List[int]],
+    search_text: Optional[str],
+) -> int:
+    """Count a filtered listing from the rollups, or by counting its rows when they cannot answer it"""
+    if search_text or (tag_ids and len(tag_ids) > 1):
+        return query.count()
+    return count_screenshots(
+        db,
+        _parse_date(start_date, "start_date"),
+        _parse_date(end_date, "end_date"),
+        app_name=app_name or None,
+        monitor=monitor,
+        is_favorite=is_favorite,
+        tag_id=tag_ids[0] if tag_ids else None,
+    )
+
+
+@app.get("/api/screenshots", response_model=Page[ScreenshotResponse])
+async def get_screenshots(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    search_text: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    size: int = Query(12, ge=1, le=100),
+    db=Depends(get_db),
+):
+    # Base query with filters
+    query = _filter_screenshots(db.query(Screenshot), start_date, end_date, app_name, monitor, is_favorite, tag_ids)
     if search_text:
-        query = query.filter(Screenshot.extracted_text.ilike(f"%{search_text}%"))
+        query = query.filter(screenshot_text_filter(db, search_text))
 
     # Get total count
-    total = query.count()
+    total = _count_filtered(db, query, start_date, end_date, app_name, monitor, is_favorite, tag_ids, search_text)
 
     # Calculate pagination
     pages = math.ceil(total / size)
     start = (page - 1) * size
 
     # Get paginated items
-    items = query.order_by(Screenshot.timestamp.desc()).offset(start).limit(size).all()
+    items = query.order_by(*KEYSET_ORDER).offset(start).limit(size).all()
 
     return {"items": items, "total": total, "page": page, "size": size, "pages": pages}
 
 
+# Most screenshots a capped count of the cursor listing looks at
+CURSOR_COUNT_LIMIT = 10000
+
+
+@app.get("/api/screenshots/cursor", response_model=CursorPage[ScreenshotResponse])
+async def get_screenshots_by_cursor(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    search_text: Optional[str] = None,
+    cursor: Optional[str] = None,
+    size: int = Query(12, ge=1, le=100),
+    count: str = Query("none", pattern="^(none|capped|exact)$"),
+    db=Depends(get_db),
+):
+    """
+    List screenshots newest first, a page at a time, with keyset pagination
+
+    Each page starts right after the `next_cursor` of the previous one instead of skipping rows, so
+    a page deep into the archive is as fast as the first, and screenshots captured meanwhile do not
+    shift the pages. The total is left out unless `count` asks for it: `exact` counts every match,
+    `capped` stops at CURSOR_COUNT_LIMIT.
+    """
+    query = _filter_screenshots(db.query(Screenshot), start_date, end_date, app_name, monitor, is_favorite, tag_ids)
+    if search_text:
+        query = query.filter(screenshot_text_filter(db, search_text))
+
+    total, total_capped = None, False
+    if count == "exact":
+        total = _count_filtered(db, query, start_date, end_date, app_name, monitor, is_favorite, tag_ids, search_text)
+    elif count == "capped":
+        total = query.with_entities(Screenshot.id).limit(CURSOR_COUNT_LIMIT + 1).count()
+        total_capped = total > CURSOR_COUNT_LIMIT
+        total = min(total, CURSOR_COUNT_LIMIT)
+
+    try:
+        position = after_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if position is not None:
+        query = query.filter(position)
+
+    # One extra row tells whether there is a next page
+    items = query.order_by(*KEYSET_ORDER).limit(size + 1).all()
+    next_cursor = encode_cursor(items[size - 1].timestamp, items[size - 1].id) if len(items) > size else None
+    return {
+        "items": items[:size],
+        "size": size,
+        "next_cursor": next_cursor,
+        "total": total,
+        "total_capped": total_capped,
+    }
+
+
+def _search_weights() -> tuple:
+    """BM25 weights of the OCR text, window title and notes from settings"""
+    return (
+        settings_manager.get_setting("search_weight_text", 1.0),
+        settings_manager.get_setting("search_weight_title", 4.0),
+        settings_manager.get_setting("search_weight_notes", 2.0),
+    )
+
+
+def _search_items(
+    db, ranked: List[tuple], fts_query: Optional[str], search_text: str, snippet_tokens: int
+) -> List[SearchResultResponse]:
+    """
+    Build search results for ranked (screenshot id, score) pairs
+
+    Screenshots that match the full-text query get snippets around their matches; the others,
+    such as hits found only by meaning, get the start of their OCR text.
+    """
+    ids = [screenshot_id for screenshot_id, _ in ranked]
+    snippets = {}
+    if fts_query is not None and ids:
+        snippets = {
+            row[0]: row[1:]
+            for row in db.query(screenshots_fts.c.rowid, *snippet_columns(snippet_tokens))
+            .filter(fts_match_clause(fts_query), screenshots_fts.c.rowid.in_(ids))
+            .all()
+        }
+    screenshots = {screenshot.id: screenshot for screenshot in db.query(Screenshot).filter(Screenshot.id.in_(ids))}
+
+    items = []
+    for screenshot_id, score in ranked:
+        screenshot = screenshots.get(screenshot_id)
+        if screenshot is None:
+            continue
+        if screenshot_id in snippets:
+            snippet, title_highlight, notes_snippet = snippets[screenshot_id]
+            update = {
+                "snippet": mark_matches(snippet) or "",
+                "title_highlight": mark_matches(title_highlight),
+                "notes_snippet": mark_matches(notes_snippet) if screenshot.notes else None,
+            }
+        else:
+            update = {"snippet": plain_snippet(screenshot.extracted_text, search_text, snippet_tokens)}
+        items.append(SearchResultResponse.model_validate(screenshot).model_copy(update={**update, "score": score}))
+    return items
+
+
+@app.get("/api/search", response_model=Page[SearchResultResponse])
+async def search_screenshots(
+    q: str = Query(..., min_length=1),
+    order: str = Query("relevance", pattern="^(relevance|newest)$"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    half_life_days: Optional[float] = Query(None, ge=0),
+    snippet_tokens: int = Query(24, ge=4, le=64),
+    page: int = Query(1, ge=1),
+    size: int = Query(12, ge=1, le=100),
+    db=Depends(get_db),
+):
+    """
+    Search screenshots, returning highlighted snippets of the matching text instead of the full OCR text
+
+    By default hits are ranked by BM25 over OCR text, window title and notes, with the field weights
+    and recency half-life from settings (half_life_days overrides the latter, 0 turns decay off);
+    order=newest lists them newest first.
+    """
+    filters = (start_date, end_date, app_name, monitor, is_favorite, tag_ids)
+    start = (page - 1) * size
+    fts_query = to_fts_query(q) if is_fts_available(db) else None
+
+    if fts_query is None:
+        # No full-text index, or nothing but punctuation to search for: substring matches, newest first
+        query = _filter_screenshots(db.query(Screenshot), *filters).filter(screenshot_text_filter(db, q))
+        total = query.count()
+        ranked = query.with_entities(Screenshot.id).order_by(Screenshot.timestamp.desc()).offset(start).limit(size)
+        items = _search_items(db, [(row.id, None) for row in ranked], None, q, snippet_tokens)
+        return {"items": items, "total": total, "page": page, "size": size, "pages": math.ceil(total / size)}
+
+    total = _filter_screenshots(db.query(Screenshot), *filters).filter(fts_match(fts_query)).count()
+
+    # Rank first, then build snippets for the page only; snippet() is costly next to bm25()
+    if half_life_days is None:
+        half_life_days = settings_manager.get_setting("search_recency_half_life_days", 30)
+    score = bm25_score(_search_weights(), half_life_days if order == "relevance" else 0).label("score")
+    query = _filter_screenshots(
+        db.query(Screenshot.id, score)
+        .select_from(screenshots_fts)
+        .join(Screenshot, Screenshot.id == screenshots_fts.c.rowid)
+        .filter(fts_match_clause(fts_query)),
+        *filters,
+    )
+    if order == "relevance":
+        query = query.order_by(score.desc(), Screenshot.timestamp.desc())
+    else:
+        query = query.order_by(Screenshot.timestamp.desc())
+    ranked = query.offset(start).limit(size).all()
+    items = _search_items(db, [(row.id, row.score) for row in ranked], fts_query, q, snippet_tokens)
+    return {"items": items, "total": total, "page": page, "size": size, "pages": math.ceil(total / size)}
+
+
+@app.get("/api/search/hybrid", response_model=Page[SearchResultResponse])
+async def hybrid_search(
+    q: str = Query(..., min_length=1),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    semantic_weight: Optional[float] = Query(None, ge=0, le=1),
+    snippet_tokens: int = Query(24, ge=4, le=64),
+    page: int = Query(1, ge=1),
+    size: int = Query(12, ge=1, le=100),
+    db=Depends(get_db),
+):
+    """
+    Search screenshots by meaning and by keywords at once
+
+    The best keyword hits, ranked by BM25 as in /api/search, and the screenshots whose embeddings
+    are closest to the query's are fused: each score is divided by the best of its kind and they
+    are combined as semantic_weight * semantic + (1 - semantic_weight) * keyword. Only the top few
+    hundred candidates of each kind are fused, so `total` counts fused candidates rather than every
+    screenshot that matches.
+    """
+    if not settings_manager.get_setting("semantic_search_enabled", False):
+        raise HTTPException(status_code=400, detail="Semantic search is disabled in settings")
+    filters = (start_date, end_date, app_name, monitor, is_favorite, tag_ids)
+    if semantic_weight is None:
+        semantic_weight = settings_manager.get_setting("semantic_weight", 0.5)
+    pool = min(HYBRID_MAX_CANDIDATES, max(100, page * size * 2))
+
+    keyword = {}
+    fts_query = to_fts_query(q) if is_fts_available(db) else None
+    if fts_query is not None:
+        half_life_days = settings_manager.get_setting("search_recency_half_life_days", 30)
+        score = bm25_score(_search_weights(), half_life_days).label("score")
+        rows = _filter_screenshots(
+            db.query(Screenshot.id, score)
+            .select_from(screenshots_fts)
+            .join(Screenshot, Screenshot.id == screenshots_fts.c.rowid)
+            .filter(fts_match_clause(fts_query)),
+            *filters,
+        )
+        keyword = {row.id: row.score for row in rows.order_by(score.desc()).limit(pool)}
+
+    # With filters, a small enough set of screenshots is searched exactly; otherwise the
+    # approximate search overfetches and the filters are applied to what it finds
+    filtered = any(value not in (None, "", []) for value in filters)
+    allowed_ids = None
+    if filtered:
+        ids = [
+            row.id for row in _filter_screenshots(db.query(Screenshot.id), *filters).limit(HYBRID_PREFILTER_LIMIT + 1)
+        ]
+        if len(ids) <= HYBRID_PREFILTER_LIMIT:
+            allowed_ids = np.array(ids, dtype=np.int64)
+    try:
+        ids, similarities = await asyncio.to_thread(
+            semantic_matches, q, pool * 4 if filtered and allowed_ids is None else pool, allowed_ids
+        )
+    except Exception as e:
+        print(f"Semantic search failed: {e}")
+        raise HTTPException(status_code=503, detail=f"Semantic search is unavailable: {e}")
+
+    # Vectors of deleted screenshots stay in the index until it is rebuilt
+    ids = ids.tolist()
+    existing = {row.id for row in _filter_screenshots(db.query(Screenshot.id), *filters).filter(Screenshot.id.in_(ids))}
+    semantic = {}
+    for screenshot_id, similarity in zip(ids, similarities.tolist()):
+        if screenshot_id in existing and screenshot_id not in semantic and len(semantic) < pool:
+            semantic[screenshot_id] = max(similarity, 0.0)
+
+    best_keyword = max(keyword.values(), default=0) or 1
+    best_semantic = max(semantic.values(), default=0) or 1
+    fused = {
+        screenshot_id: semantic_weight * semantic.get(screenshot_id, 0) / best_semantic
+        + (1 - semantic_weight) * keyword.get(screenshot_id, 0) / best_keyword
+        for screenshot_id in keyword.keys() | semantic.keys()
+    }
+    ranking = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    total = len(ranking)
+    start = (page - 1) * size
+    items = _search_items(db, ranking[start : start + size], fts_query, q, snippet_tokens)
+    return {"items": items, "total": total, "page": page, "size": size, "pages": math.ceil(total / size)}
+
+
 @app.get("/api/tags", response_model=List[TagResponse])
 async def get_tags(db=Depends(get_db)):
     return db.query(Tag).all()
@@ -218,18 +563,72 @@ async def update_notes(screenshot_id: int, notes_data: NotesUpdate, db=Depends(g
     return {"success": True, "notes": screenshot.notes}
 
 
+@app.get("/api/screenshots/{screenshot_id}/matches")
+async def get_match_boxes(
+    screenshot_id: int, q: str = Query(..., min_length=1), limit: int = Query(500, ge=1, le=5000), db=Depends(get_db)
+):
+    """Get the boxes of the words in a screenshot that match the query, for highlighting without re-running OCR"""
+    screenshot = db.query(Screenshot).filter(Screenshot.id == screenshot_id).first()
+    if not screenshot:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+
+    frame = screenshot.frame
+    geometry = frame.words if frame is not None else None
+    if geometry is None:
+        return {"screenshot_id": screenshot_id, "query": q, "has_geometry": False, "matches": []}
+
+    matches = find_match_boxes(frame.extracted_text or "", geometry.data, q, frame.width, frame.height, limit=limit)
+    return {
+        "screenshot_id": screenshot_id,
+        "query": q,
+        "has_geometry": True,
+        "width": frame.width,
+        "height": frame.height,
+        "truncated": geometry.truncated,
+        "matches": matches,
+    }
+
+
+@app.get("/api/word-geometry/stats")
+async def get_word_geometry_stats(db=Depends(get_db)):
+    """Get how much storage word geometry uses per frame and per word"""
+    return frame_words_crud.get_storage_stats(db)
+
+
 @app.get("/api/app-names")
 async def get_app_names(db=Depends(get_db)):
     """Get unique app names for autocomplete"""
-    app_names = (
-        db.query(Screenshot.app_name)
-        .filter(Screenshot.app_name.isnot(None))
-        .filter(Screenshot.app_name != "")
-        .distinct()
-        .order_by(Screenshot.app_name)
-        .all()
+    return rollup_app_names(db)
+
+
+@app.get("/api/facets")
+async def get_facets(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = Query(None),
+    search_text: Optional[str] = None,
+    db=Depends(get_db),
+):
+    """
+    Count screenshots per app, day, monitor, favorite flag and tag for the listing filters
+
+    Each facet ignores its own filter, so the other choices keep their counts; `total` applies
+    every filter. Counts come from rollups kept up to date on every write, so they cost the same
+    for any archive size, except with search text or several tags, which count the matches.
+    """
+    return screenshot_facets(
+        db,
+        _parse_date(start_date, "start_date"),
+        _parse_date(end_date, "end_date"),
+        app_name=app_name or None,
+        monitor=monitor,
+        is_favorite=is_favorite,
+        tag_ids=tag_ids,
+        text_filter=screenshot_text_filter(db, search_text) if search_text else None,
     )
-    return [name[0] for name in app_names]
 
 
 # WebSocket connection manager
@@ -242,14 +641,17 @@ class ConnectionManager:
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
                 await connection.send_json(message)
             except Exception:
-                pass
+                # Drop clients that went away without a clean disconnect
+                if connection in self.active_connections:
+                    self.active_connections.remove(connection)
 
 
 manager = ConnectionManager()
@@ -367,13 +769,12 @@ async def delete_screenshots_before_date(
 
         count = len(screenshots)
 
-        # Get the file paths to delete from filesystem
-        # Get the screenshots storage path
+        # Screenshots without a frame own their file; frame blobs are shared and only
+        # deleted once no remaining screenshot references them
         file_paths = [
-            os.path.join(screenshot_manager.storage_path, screenshot.file_path)
-            for screenshot in screenshots
-            if screenshot.file_path
+            screenshot.file_path for screenshot in screenshots if screenshot.file_path and not screenshot.frame_id
         ]
+        frame_ids = list({screenshot.frame_id for screenshot in screenshots if screenshot.frame_id})
 
         # Delete screenshots from database
         deleted_ids = [screenshot.id for screenshot in screenshots]
@@ -381,6 +782,11 @@ async def delete_screenshots_before_date(
             db.delete(screenshot)
         db.commit()
 
+        await asyncio.to_thread(forget_screenshots, deleted_ids)
+
+        file_paths.extend(frame_crud.delete_orphans(db, ids=frame_ids))
+        file_paths = [os.path.join(screenshot_manager.storage_path, file_path) for file_path in file_paths]
+
         # Delete the actual files
         deleted_files = 0
         for file_path in file_paths:
@@ -453,7 +859,7 @@ async def summarize_search_results(
             query = query.filter(Screenshot.tags.any(Tag.id == tag_id))
 
     if search_text:
-        query = query.filter(Screenshot.extracted_text.contains(search_text))
+        query = query.filter(screenshot_text_filter(db, search_text))
 
     # Order by timestamp
     query = query.order_by(Screenshot.timestamp.desc())
@@ -509,6 +915,48 @@ class SettingsUpdate(BaseModel):
     enable_summarization: Optional[bool] = None
     capture_interval: Optional[int] = None
     summarization_model: Optional[str] = None
+    adaptive_capture: Optional[bool] = None
+    min_capture_interval: Optional[int] = None
+    max_capture_interval: Optional[int] = None
+    focus_poll_interval: Optional[float] = None
+    focus_polling: Optional[str] = None
+    capture_monitors: Optional[Union[str, List[int]]] = None
+    image_profile: Optional[str] = None
+    change_detector: Optional[str] = None
+    change_threshold: Optional[float] = None
+    incremental_ocr: Optional[bool] = None
+    ocr_tile_rows: Optional[int] = None
+    ocr_tile_cols: Optional[int] = None
+    ocr_full_frame_threshold: Optional[float] = None
+    ocr_batch_size: Optional[int] = None
+    store_word_geometry: Optional[bool] = None
+    word_geometry_max_words: Optional[int] = None
+    ocr_batch_wait_ms: Optional[float] = None
+    ocr_backend: Optional[str] = None
+    ocr_threads: Optional[Dict[str, int]] = None
+    ocr_mode: Optional[str] = None
+    ocr_process_workers: Optional[int] = None
+    ocr_torch_threads: Optional[int] = None
+    ocr_job_timeout: Optional[float] = None
+    ocr_profile: Optional[str] = None
+    ocr_cache_enabled: Optional[bool] = None
+    ocr_cache_max_mb: Optional[int] = None
+    search_weight_text: Optional[float] = None
+    search_weight_title: Optional[float] = None
+    search_weight_notes: Optional[float] = None
+    search_recency_half_life_days: Optional[float] = None
+    semantic_search_enabled: Optional[bool] = None
+    embedding_model: Optional[str] = None
+    embedding_batch_size: Optional[int] = None
+    semantic_index_dtype: Optional[str] = None
+    semantic_nprobe: Optional[int] = None
+    semantic_weight: Optional[float] = None
+    journal_enabled: Optional[bool] = None
+    journal_max_replay: Optional[int] = None
+    journal_max_age_hours: Optional[float] = None
+    journal_fsync: Optional[bool] = None
+    pipeline: Optional[Dict[str, Dict[str, Any]]] = None
+    exclusion_rules: Optional[List[Dict[str, Any]]] = None
 
 
 @app.put("/api/settings")
@@ -523,17 +971,169 @@ async def update_settings(settings: SettingsUpdate):
     if "capture_interval" in settings_dict and settings_dict["capture_interval"] < 10:
         raise HTTPException(status_code=400, detail="Capture interval must be at least 10 seconds")
 
+    # Validate adaptive capture bounds if provided
+    min_interval = settings_dict.get("min_capture_interval", settings_manager.get_setting("min_capture_interval", 10))
+    max_interval = settings_dict.get("max_capture_interval", settings_manager.get_setting("max_capture_interval", 600))
+    if min_interval < 1 or max_interval < min_interval:
+        raise HTTPException(
+            status_code=400,
+            detail="Capture interval bounds must satisfy 1 <= min_capture_interval <= max_capture_interval",
+        )
+    if "focus_poll_interval" in settings_dict and settings_dict["focus_poll_interval"] <= 0:
+        raise HTTPException(status_code=400, detail="Focus poll interval must be positive")
+    if "focus_polling" in settings_dict and settings_dict["focus_polling"] not in ("auto", "on", "off"):
+        raise HTTPException(status_code=400, detail="focus_polling must be 'auto', 'on' or 'off'")
+
+    # Validate monitor selection if provided
+    monitors = settings_dict.get("capture_monitors", "all")
+    if isinstance(monitors, str) and monitors not in ("all", "primary"):
+        raise HTTPException(status_code=400, detail="capture_monitors must be 'all', 'primary' or a list of indexes")
+
+    # Validate image encoding profile if provided
+    if "image_profile" in settings_dict and not is_profile_available(settings_dict["image_profile"]):
+        raise HTTPException(
+            status_code=400, detail=f"Image profile '{settings_dict['image_profile']}' is not available"
+        )
+
+    # Validate change detection settings if provided
+    if "change_detector" in settings_dict and settings_dict["change_detector"] not in CHANGE_DETECTORS:
+        raise HTTPException(status_code=400, detail=f"Unknown change detector '{settings_dict['change_detector']}'")
+    if "change_threshold" in settings_dict and not 0 < settings_dict["change_threshold"] <= 1:
+        raise HTTPException(status_code=400, detail="Change threshold must be between 0 and 1")
+
+    # Validate incremental OCR grid if provided
+    if settings_dict.get("ocr_tile_rows", 1) < 1 or settings_dict.get("ocr_tile_cols", 1) < 1:
+        raise HTTPException(status_code=400, detail="OCR tile grid must have at least one row and column")
+
+    if settings_dict.get("word_geometry_max_words", 1) < 1:
+        raise HTTPException(status_code=400, detail="word_geometry_max_words must be at least 1")
+
+    # Validate OCR batching if provided
+    if settings_dict.get("ocr_batch_size", 1) < 1 or settings_dict.get("ocr_batch_wait_ms", 0) < 0:
+        raise HTTPException(
+            status_code=400, detail="OCR batch size must be at least 1 and the wait must not be negative"
+        )
+
+    # Validate OCR backend settings if provided
+    if "ocr_backend" in settings_dict and settings_dict["ocr_backend"] not in OCR_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown OCR backend '{settings_dict['ocr_backend']}'")
+    if any(threads < 0 for threads in settings_dict.get("ocr_threads", {}).values()):
+        raise HTTPException(status_code=400, detail="OCR thread counts must not be negative")
+
+    if "ocr_profile" in settings_dict and settings_dict["ocr_profile"] not in OCR_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown OCR profile '{settings_dict['ocr_profile']}'")
+    if settings_dict.get("ocr_cache_max_mb", 1) < 1:
+        raise HTTPException(status_code=400, detail="ocr_cache_max_mb must be at least 1")
+
+    # Validate search ranking settings if provided
+    search_keys = ("search_weight_text", "search_weight_title", "search_weight_notes", "search_recency_half_life_days")
+    if any(settings_dict.get(key, 0) < 0 for key in search_keys):
+        raise HTTPException(status_code=400, detail="Search weights and recency half-life must not be negative")
+
+    # Validate semantic search settings if provided
+    if settings_dict.get("semantic_index_dtype", "float16") not in INDEX_DTYPES:
+        raise HTTPException(status_code=400, detail=f"semantic_index_dtype must be one of {list(INDEX_DTYPES)}")
+    if settings_dict.get("embedding_batch_size", 1) < 1 or settings_dict.get("semantic_nprobe", 1) < 1:
+        raise HTTPException(status_code=400, detail="embedding_batch_size and semantic_nprobe must be at least 1")
+    if not 0 <= settings_dict.get("semantic_weight", 0) <= 1:
+        raise HTTPException(status_code=400, detail="semantic_weight must be between 0 and 1")
+
+    # Validate ingestion journal settings if provided
+    if settings_dict.get("journal_max_replay", 0) < 0:
+        raise HTTPException(status_code=400, detail="journal_max_replay must not be negative")
+    if settings_dict.get("journal_max_age_hours", 1) <= 0:
+        raise HTTPException(status_code=400, detail="journal_max_age_hours must be positive")
+
+    # Validate OCR worker settings if provided
+    if settings_dict.get("ocr_mode", "thread") not in ("thread", "process"):
+        raise HTTPException(status_code=400, detail="ocr_mode must be 'thread' or 'process'")
+    if settings_dict.get("ocr_process_workers", 1) < 1 or settings_dict.get("ocr_torch_threads", 1) < 1:
+        raise HTTPException(status_code=400, detail="OCR workers and torch threads must be at least 1")
+    if settings_dict.get("ocr_job_timeout", 1) <= 0:
+        raise HTTPException(status_code=400, detail="OCR job timeout must be positive")
+
+    # Validate pipeline stage configuration if provided
+    for stage_name, stage_config in settings_dict.get("pipeline", {}).items():
+        if stage_name not in DEFAULT_SETTINGS["pipeline"]:
+            raise HTTPException(status_code=400, detail=f"Unknown pipeline stage '{stage_name}'")
+        if not isinstance(stage_config, dict):
+            raise HTTPException(status_code=400, detail=f"Pipeline stage '{stage_name}' must be an object")
+        unknown = set(stage_config) - {"workers", "queue_size", "drop_policy"}
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown options for pipeline stage '{stage_name}': {sorted(unknown)}"
+            )
+        if stage_config.get("drop_policy", "block") not in DROP_POLICIES:
+            raise HTTPException(status_code=400, detail=f"Invalid drop policy for pipeline stage '{stage_name}'")
+        for key in ("workers", "queue_size"):
+            value = stage_config.get(key, 1)
+            # bool is an int subclass, so reject it explicitly
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise HTTPException(
+                    status_code=400, detail=f"Pipeline stage '{stage_name}' {key} must be an integer of at least 1"
+                )
+
+    # Validate exclusion rules if provided
+    if "exclusion_rules" in settings_dict:
+        try:
+            ExclusionRules.compile(settings_dict["exclusion_rules"])
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid exclusion rules: {e}")
+
     # Update settings
     success = settings_manager.update_settings(settings_dict)
 
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update settings")
 
-    # Update screenshot manager's capture interval if it was changed
-    if "capture_interval" in settings_dict:
-        screenshot_manager.capture_interval = settings_dict["capture_interval"]
-        screenshot_manager.stop()
-        screenshot_manager.start()
+    # Restart the screenshot manager if its capture interval, change detection or pipeline layout changed
+    restart_keys = {
+        "capture_interval",
+        "adaptive_capture",
+        "min_capture_interval",
+        "max_capture_interval",
+        "focus_poll_interval",
+        "focus_polling",
+        "capture_monitors",
+        "change_detector",
+        "change_threshold",
+        "incremental_ocr",
+        "ocr_tile_rows",
+        "ocr_tile_cols",
+        "ocr_full_frame_threshold",
+        "ocr_batch_size",
+        "ocr_batch_wait_ms",
+        "ocr_backend",
+        "ocr_threads",
+        "ocr_mode",
+        "ocr_process_workers",
+        "ocr_torch_threads",
+        "ocr_job_timeout",
+        "ocr_profile",
+        "ocr_cache_max_mb",
+        "journal_enabled",
+        "journal_fsync",
+        "semantic_search_enabled",
+        "embedding_batch_size",
+        "pipeline",
+    }
+    if restart_keys & settings_dict.keys():
+        reset_ocr = bool({"ocr_backend", "ocr_threads", "ocr_batch_size"} & settings_dict.keys())
+
+        def restart_capture():
+            screenshot_manager.stop()
+            if reset_ocr:
+                reset_ocr_processor()
+            screenshot_manager.capture_interval = settings_manager.get_setting("capture_interval", 300)
+            screenshot_manager.start()
+
+        # Stopping drains the pipeline and the OCR workers, so run it off the loop while events keep flowing
+        await asyncio.to_thread(restart_capture)
+        model_warmup.warm_up_in_background(models_to_warm_up())
+
+    # Exclusion rules are swapped in place without restarting the capture loop
+    if "exclusion_rules" in settings_dict:
+        screenshot_manager.reload_exclusion_rules()
 
     # Broadcast settings update
     updated_settings = settings_manager.get_all_settings()
@@ -542,6 +1142,177 @@ async def update_settings(settings: SettingsUpdate):
     return updated_settings
 
 
+@app.get("/api/status")
+async def get_status():
+    """Get whether the models the current settings need have finished loading"""
+    required = models_to_warm_up()
+    models = model_warmup.get_status()
+    ready = all(models[name]["state"] == "ready" for name in required)
+
+    ocr_workers = None
+    if screenshot_manager.ocr_pool is not None:
+        ocr_workers = [worker["ready"] for worker in screenshot_manager.ocr_pool.get_stats()["workers"]]
+        ready = ready and any(ocr_workers)
+
+    return {
+        "ready": ready,
+        "capturing": screenshot_manager.is_running,
+        "required_models": required,
+        "models": models,
+        "ocr_workers_ready": ocr_workers,
+    }
+
+
+@app.get("/api/pipeline/stats")
+async def get_pipeline_stats():
+    """Get per-stage queue depth and throughput of the capture pipeline"""
+    stats = screenshot_manager.get_pipeline_stats()
+    stats["events"] = event_bus.get_stats()
+    return stats
+
+
+@app.get("/api/pipeline/journal")
+async def get_ingestion_journal(limit: int = 100):
+    """Get the frames the ingestion journal holds as not yet persisted, oldest first"""
+    return {**ingestion_journal.get_stats(), "pending_frames": ingestion_journal.get_pending(limit)}
+
+
+@app.get("/api/exclusion-rules/stats")
+async def get_exclusion_rule_stats():
+    """Get how often each exclusion rule matched and which capture work it saved"""
+    return screenshot_manager.exclusion_rules.get_stats()
+
+
+class OCRReprocessRequest(BaseModel):
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    only_empty: bool = False
+    batch_size: int = 8
+    chunk_size: int = 64
+    decode_workers: int = 2
+    max_pages_per_second: Optional[float] = None
+    resume: bool = True
+
+
+@app.post("/api/ocr/reprocess")
+async def start_ocr_reprocess(request: OCRReprocessRequest):
+    """Start re-running OCR over stored screenshots in the background, yielding to live capture"""
+    try:
+        start_date = datetime.fromisoformat(request.start_date) if request.start_date else None
+        end_date = datetime.fromisoformat(request.end_date) if request.end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+    if request.batch_size < 1 or request.chunk_size < 1 or request.decode_workers < 1:
+        raise HTTPException(status_code=400, detail="batch_size, chunk_size and decode_workers must be at least 1")
+    if request.max_pages_per_second is not None and request.max_pages_per_second <= 0:
+        raise HTTPException(status_code=400, detail="max_pages_per_second must be positive")
+
+    # Share the OCR worker processes with live capture when they are running
+    read_batch = screenshot_manager.ocr_pool.read if screenshot_manager.ocr_pool is not None else extract_words_batch
+    job = OCRReprocessJob(
+        screenshot_manager.storage_path,
+        start_date=start_date,
+        end_date=end_date,
+        only_empty=request.only_empty,
+        batch_size=request.batch_size,
+        chunk_size=request.chunk_size,
+        decode_workers=request.decode_workers,
+        max_pages_per_second=request.max_pages_per_second,
+        resume=request.resume,
+        read_batch=read_batch,
+        is_busy=screenshot_manager.is_ocr_busy,
+    )
+    if not reprocess_manager.start(job):
+        raise HTTPException(status_code=409, detail="An OCR reprocessing job is already running")
+    return {"success": True, "job": job.get_status()}
+
+
+@app.get("/api/ocr/reprocess")
+async def get_ocr_reprocess_status():
+    """Get the state and progress of the latest OCR reprocessing job"""
+    return {"running": reprocess_manager.is_running(), "job": reprocess_manager.get_status()}
+
+
+@app.delete("/api/ocr/reprocess")
+async def cancel_ocr_reprocess():
+    """Stop the running OCR reprocessing job after its current chunk; it can be resumed later"""
+    if not reprocess_manager.cancel():
+        raise HTTPException(status_code=404, detail="No OCR reprocessing job is running")
+    return {"success": True}
+
+
+class EmbeddingBackfillRequest(BaseModel):
+    batch_size: Optional[int] = None
+    chunk_size: int = 256
+    rebuild: bool = False
+
+
+@app.post("/api/semantic/backfill")
+async def start_embedding_backfill(request: EmbeddingBackfillRequest):
+    """Start embedding the stored screenshots that are not in the semantic index yet, in the background"""
+    if not settings_manager.get_setting("semantic_search_enabled", False):
+        raise HTTPException(status_code=400, detail="Semantic search is disabled in settings")
+    batch_size = request.batch_size or settings_manager.get_setting("embedding_batch_size", 16)
+    if batch_size < 1 or request.chunk_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size and chunk_size must be at least 1")
+    job = EmbeddingBackfillJob(
+        batch_size=batch_size,
+        chunk_size=request.chunk_size,
+        rebuild=request.rebuild,
+        is_busy=screenshot_manager.is_ocr_busy,
+    )
+    if not embedding_backfill.start(job):
+        raise HTTPException(status_code=409, detail="An embedding backfill is already running")
+    return {"success": True, "job": job.get_status()}
+
+
+@app.get("/api/semantic/backfill")
+async def get_embedding_backfill_status():
+    """Get the state and progress of the latest embedding backfill and the size of the semantic index"""
+    return {
+        "running": embedding_backfill.is_running(),
+        "job": embedding_backfill.get_status(),
+        "index": vector_index.get_stats(),
+    }
+
+
+@app.delete("/api/semantic/backfill")
+async def cancel_embedding_backfill():
+    """Stop the running embedding backfill after its current chunk; a new run skips what is indexed"""
+    if not embedding_backfill.cancel():
+        raise HTTPException(status_code=404, detail="No embedding backfill is running")
+    return {"success": True}
+
+
+@app.get("/api/ocr/profiles")
+async def get_ocr_profiles():
+    """Get the OCR preprocessing profiles, the active one, and timing and confidence measured for each"""
+    return {
+        "active": screenshot_manager.ocr_profile_name,
+        "profiles": {name: dict(profile) for name, profile in OCR_PROFILES.items()},
+        "stats": ocr_profile_stats.get_stats(),
+    }
+
+
+@app.get("/api/ocr/cache")
+async def get_ocr_cache_stats():
+    """Get the hit/miss counters and size of the OCR result cache"""
+    return ocr_cache.get_stats()
+
+
+@app.delete("/api/ocr/cache")
+async def clear_ocr_cache():
+    """Remove every entry from the OCR result cache"""
+    await asyncio.to_thread(ocr_cache.clear)
+    return {"success": True}
+
+
+@app.get("/api/image-profiles")
+async def get_image_profiles():
+    """Get the screenshot encoding profiles and whether each one is available"""
+    return get_available_profiles()
+
+
 @app.get("/api/summarization/models")
 async def get_summarization_models():
     """Get all available summarization models and their download status"""
@@ -218,14 +218,16 @@ const App = () => {
       ...(filters.endDate && { end_date: filters.endDate }),
       ...(filters.appName && { app_name: filters.appName }),
       ...(filters.isFavorite && { is_favorite: filters.isFavorite }),
-      ...(filters.searchText && { search_text: filters.searchText }),
+      ...(filters.searchText && { q: filters.searchText }),
     });
 
     if (filters.tagIds.length > 0) {
       filters.tagIds.forEach((id) => params.append("tag_ids", id));
     }
 
-    const response = await fetch(`/api/screenshots?${params}`);
+    // Searches come back ranked, with snippets of the matching text instead of the full OCR text
+    const endpoint = filters.searchText ? "/api/search" : "/api/screenshots";
+    const response = await fetch(`${endpoint}?${params}`);
     const data = await response.json();
     setScreenshots(data);
   };
@@ -84,6 +84,13 @@ const ScreenshotGrid = ({
                 <p className="card-text small text-muted">
                   {moment(`${screenshot.timestamp}Z`).calendar()}
                 </p>
+                {screenshot.snippet && (
+                  // Escaped by the server; only the <mark> tags around matches are markup
+                  <p
+                    className="card-text small search-snippet"
+                    dangerouslySetInnerHTML={{ __html: screenshot.snippet }}
+                  />
+                )}
                 <div className="tags-container">
                   {screenshot.tags.map((tag) => (
                     <span
@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Union
+
+import mss
+import numpy as np
+
+MonitorSelection = Union[str, List[int]]
+
+
+class ScreenGrabber:
+    """
+    Long-lived screen capture backend.
+
+    Keeps one mss handle (X connection / shared memory on Linux, device contexts on
+    Windows) open between captures instead of paying the setup cost on every frame.
+    mss handles are bound to the thread that created them, so open(), grab() and
+    close() must all be called from the capture thread.
+    """
+
+    def __init__(self, monitors: MonitorSelection = "all", display: Optional[str] = None):
+        # "all", "primary" or a list of mss monitor indexes (1-based, 0 is the virtual union of all screens)
+        self.selection = monitors
+        self.display = display
+        self._sct = None
+
+    def open(self):
+        """Open the capture handle if it is not already open"""
+        if self._sct is None:
+            self._sct = mss.mss(display=self.display) if self.display else mss.mss()
+
+    def close(self):
+        """Release the capture handle"""
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception as e:
+                print(f"Error closing screen grabber: {e}")
+            self._sct = None
+
+    def available_monitors(self) -> Dict[int, dict]:
+        """Physical monitors known to the backend, keyed by mss index"""
+        self.open()
+        return {index: monitor for index, monitor in enumerate(self._sct.monitors) if index > 0}
+
+    def selected_monitors(self) -> List[int]:
+        """Indexes of the monitors that should be captured"""
+        available = self.available_monitors()
+        if self.selection == "primary":
+            return [1] if 1 in available else []
+        if self.selection == "all" or not self.selection:
+            return sorted(available)
+        return [index for index in self.selection if index in available]
+
+    def grab(self, index: int) -> np.ndarray:
+        """Capture one monitor and return it as a contiguous RGB uint8 array"""
+        self.open()
+        try:
+            shot = self._sct.grab(self._sct.monitors[index])
+        except Exception:
+            # The display may have gone away (resolution change, hotplug); reconnect on the next grab
+            self.close()
+            raise
+        # mss returns BGRA; reorder to RGB and drop alpha
+        return np.ascontiguousarray(np.asarray(shot)[:, :, 2::-1])
+
+    def __del__(self):
+        self.close()
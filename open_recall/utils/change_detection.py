@@ -0,0 +1,146 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .settings import settings_manager
+
+
+def to_small_gray(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """Downsample an RGB uint8 array to a small grayscale uint8 array of the given (width, height)"""
+    # reducing_gap lets Pillow box-reduce the full frame first, so no full-size float copy is ever made
+    small = Image.fromarray(image).resize(size, Image.Resampling.BOX, reducing_gap=2.0)
+    return np.asarray(small.convert("L"), dtype=np.uint8)
+
+
+class ChangeDetector(ABC):
+    """Computes compact fingerprints of frames and decides whether two fingerprints differ significantly"""
+
+    name = "base"
+    default_threshold = 0.05
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = self.default_threshold if threshold is None else float(threshold)
+
+    @abstractmethod
+    def fingerprint(self, image: np.ndarray) -> np.ndarray:
+        """Return a compact fingerprint of an RGB uint8 frame"""
+
+    @abstractmethod
+    def difference(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """Return the fraction (0-1) of the fingerprint that changed"""
+
+    def is_significant_change(self, previous: Optional[np.ndarray], current: np.ndarray) -> bool:
+        """Check if the current fingerprint differs enough from the previous one"""
+        if previous is None or previous.shape != current.shape:
+            return True
+        return self.difference(previous, current) >= self.threshold
+
+
+class DownsampledChangeDetector(ChangeDetector):
+    """Compares small grayscale thumbnails and counts pixels that moved by more than a tolerance"""
+
+    name = "downsampled"
+    default_threshold = 0.01
+
+    def __init__(self, threshold: Optional[float] = None, size: Tuple[int, int] = (128, 72), tolerance: int = 12):
+        super().__init__(threshold)
+        self.size = size
+        self.tolerance = tolerance
+
+    def fingerprint(self, image: np.ndarray) -> np.ndarray:
+        return to_small_gray(image, self.size)
+
+    def difference(self, previous: np.ndarray, current: np.ndarray) -> float:
+        delta = np.abs(previous.astype(np.int16) - current.astype(np.int16))
+        return float(np.count_nonzero(delta > self.tolerance)) / delta.size
+
+
+class _HashChangeDetector(ChangeDetector):
+    """Base for perceptual hashes stored as packed bits and compared by Hamming distance"""
+
+    def __init__(self, threshold: Optional[float] = None, hash_size: int = 16):
+        super().__init__(threshold)
+        self.hash_size = hash_size
+
+    @abstractmethod
+    def _bits(self, image: np.ndarray) -> np.ndarray:
+        """Return the hash of a frame as a (hash_size, hash_size) boolean array"""
+
+    def fingerprint(self, image: np.ndarray) -> np.ndarray:
+        return np.packbits(self._bits(image).ravel())
+
+    def difference(self, previous: np.ndarray, current: np.ndarray) -> float:
+        distance = int(np.unpackbits(np.bitwise_xor(previous, current)).sum())
+        return distance / (self.hash_size * self.hash_size)
+
+
+class AverageHashChangeDetector(_HashChangeDetector):
+    """aHash: each bit says whether a cell is brighter than the mean"""
+
+    name = "ahash"
+
+    def _bits(self, image: np.ndarray) -> np.ndarray:
+        pixels = to_small_gray(image, (self.hash_size, self.hash_size))
+        return pixels > pixels.mean()
+
+
+class DifferenceHashChangeDetector(_HashChangeDetector):
+    """dHash: each bit says whether a cell is brighter than its right neighbour"""
+
+    name = "dhash"
+
+    def _bits(self, image: np.ndarray) -> np.ndarray:
+        pixels = to_small_gray(image, (self.hash_size + 1, self.hash_size))
+        return pixels[:, 1:] > pixels[:, :-1]
+
+
+class PerceptualHashChangeDetector(_HashChangeDetector):
+    """pHash: each bit says whether a low-frequency DCT coefficient is above the median.
+
+    It describes global layout rather than local detail, so it needs a higher threshold than aHash/dHash.
+    """
+
+    name = "phash"
+    default_threshold = 0.1
+
+    def __init__(self, threshold: Optional[float] = None, hash_size: int = 16, highfreq_factor: int = 4):
+        super().__init__(threshold, hash_size)
+        self.image_size = hash_size * highfreq_factor
+        # Orthonormal DCT-II basis, so the 2D transform is two small matrix products
+        n = self.image_size
+        k = np.arange(n)[:, None]
+        basis = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+        basis[0] *= 1 / np.sqrt(2)
+        self._dct = (basis * np.sqrt(2 / n)).astype(np.float32)
+
+    def _bits(self, image: np.ndarray) -> np.ndarray:
+        pixels = to_small_gray(image, (self.image_size, self.image_size)).astype(np.float32)
+        coefficients = self._dct @ pixels @ self._dct.T
+        low = coefficients[: self.hash_size, : self.hash_size]
+        return low > np.median(low)
+
+
+CHANGE_DETECTORS = {
+    detector.name: detector
+    for detector in (
+        DownsampledChangeDetector,
+        AverageHashChangeDetector,
+        DifferenceHashChangeDetector,
+        PerceptualHashChangeDetector,
+    )
+}
+
+
+def create_change_detector(name: Optional[str] = None, threshold: Optional[float] = None) -> ChangeDetector:
+    """Create the change detector selected in settings (or by name), falling back to dHash"""
+    name = name or settings_manager.get_setting("change_detector", "dhash")
+    if threshold is None:
+        threshold = settings_manager.get_setting("change_threshold")
+
+    detector_class = CHANGE_DETECTORS.get(name)
+    if detector_class is None:
+        print(f"Unknown change detector '{name}', using dhash")
+        detector_class = DifferenceHashChangeDetector
+    return detector_class(threshold=threshold)
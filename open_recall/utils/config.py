@@ -0,0 +1,18 @@
+import json
+import os
+
+DEFAULT_CONFIG = {"app": {"port": 8742, "host": "localhost", "debug": False}}
+
+
+# Load configuration from config.json
+def load_config():
+    try:
+        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                config = json.load(f)
+            return config
+        return DEFAULT_CONFIG
+    except Exception as e:
+        print(f"Error loading config: {e}")
+        return DEFAULT_CONFIG
@@ -1,14 +1,44 @@
 from .base import Base, engine, get_db
-from .crud import screenshot_crud, tag_crud
-from .models import Screenshot, Tag, screenshot_tags
+from .crud import (
+    frame_crud,
+    frame_words_crud,
+    imported_file_crud,
+    screenshot_crud,
+    tag_crud,
+)
+from .fts import rebuild_fts_index, screenshot_text_filter, to_fts_query
+from .models import Frame, FrameWords, ImportedFile, Screenshot, Tag, screenshot_tags
+from .pagination import KEYSET_ORDER, after_cursor, encode_cursor
+from .rollups import (
+    count_screenshots,
+    rebuild_rollups,
+    rollup_app_names,
+    screenshot_facets,
+)
 
 __all__ = [
     "Base",
     "engine",
     "get_db",
+    "rebuild_fts_index",
+    "screenshot_text_filter",
+    "to_fts_query",
+    "KEYSET_ORDER",
+    "after_cursor",
+    "encode_cursor",
+    "count_screenshots",
+    "rebuild_rollups",
+    "rollup_app_names",
+    "screenshot_facets",
+    "Frame",
+    "FrameWords",
+    "ImportedFile",
     "Screenshot",
     "Tag",
     "screenshot_tags",
+    "frame_crud",
+    "frame_words_crud",
+    "imported_file_crud",
     "screenshot_crud",
     "tag_crud",
 ]
@@ -1,10 +1,12 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from . import models
+from .fts import screenshot_text_filter
 
 
 class CRUDBase:
@@ -29,6 +31,15 @@ class ScreenshotCRUD(CRUDBase):
     def get_by_path(self, db: Session, file_path: str) -> Optional[models.Screenshot]:
         return db.query(self.model).filter(self.model.file_path == file_path).first()
 
+    def get_by_capture(self, db: Session, file_path: str, timestamp: datetime) -> Optional[models.Screenshot]:
+        """Find the screenshot of one capture: its stored image at its capture time"""
+        return db.query(self.model).filter(self.model.file_path == file_path, self.model.timestamp == timestamp).first()
+
+    def get_latest_for_frame(self, db: Session, frame_id: int) -> Optional[models.Screenshot]:
+        return (
+            db.query(self.model).filter(self.model.frame_id == frame_id).order_by(self.model.timestamp.desc()).first()
+        )
+
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100, order_by: str = "timestamp"
     ) -> List[models.Screenshot]:
@@ -50,13 +61,7 @@ class ScreenshotCRUD(CRUDBase):
         search_query = db.query(self.model)
 
         if query:
-            search_query = search_query.filter(
-                or_(
-                    self.model.extracted_text.ilike(f"%{query}%"),
-                    self.model.window_title.ilike(f"%{query}%"),
-                    self.model.notes.ilike(f"%{query}%"),
-                )
-            )
+            search_query = search_query.filter(screenshot_text_filter(db, query))
 
         if app_name:
             search_query = search_query.filter(self.model.app_name == app_name)
@@ -91,6 +96,132 @@ class ScreenshotCRUD(CRUDBase):
         return False
 
 
+class FrameCRUD(CRUDBase):
+    def __init__(self):
+        super().__init__(models.Frame)
+
+    def get(self, db: Session, id: int) -> Optional[models.Frame]:
+        return db.query(self.model).filter(self.model.id == id).first()
+
+    def get_by_content_hash(self, db: Session, content_hash: str) -> Optional[models.Frame]:
+        return db.query(self.model).filter(self.model.content_hash == content_hash).first()
+
+    def get_or_create(self, db: Session, *, data: Dict[str, Any]) -> models.Frame:
+        frame = self.get_by_content_hash(db, data["content_hash"])
+        if not frame:
+            try:
+                frame = self.model(**data)
+                db.add(frame)
+                db.commit()
+                db.refresh(frame)
+            except IntegrityError:
+                # Another worker stored the same frame first
+                db.rollback()
+                frame = self.get_by_content_hash(db, data["content_hash"])
+        return frame
+
+    def fill_text(self, db: Session, frame: models.Frame, *, extracted_text: str, confidence_score: float) -> bool:
+        """Set the text of a frame stored without OCR, unless another sighting already did"""
+        updated = (
+            db.query(self.model)
+            .filter(self.model.id == frame.id, self.model.ocr_skipped.is_(True))
+            .update(
+                {"extracted_text": extracted_text, "confidence_score": confidence_score, "ocr_skipped": False},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        db.refresh(frame)
+        return updated == 1
+
+    def get_recent_perceptual_hashes(self, db: Session, *, limit: int) -> List[tuple]:
+        """Return (id, perceptual_hash) of the most recently created frames"""
+        return (
+            db.query(self.model.id, self.model.perceptual_hash)
+            .filter(self.model.perceptual_hash.isnot(None))
+            .filter(self.model.ocr_skipped.isnot(True))
+            .order_by(self.model.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def delete_orphans(self, db: Session, *, ids: List[int]) -> List[str]:
+        """Delete the given frames if no screenshot references them any more and return their file paths"""
+        if not ids:
+            return []
+        orphans = db.query(self.model).filter(self.model.id.in_(ids)).filter(~self.model.screenshots.any()).all()
+        file_paths = [frame.file_path for frame in orphans if frame.file_path]
+        for frame in orphans:
+            db.delete(frame)
+        db.commit()
+        return file_paths
+
+
+class FrameWordsCRUD(CRUDBase):
+    def __init__(self):
+        super().__init__(models.FrameWords)
+
+    def get(self, db: Session, frame_id: int) -> Optional[models.FrameWords]:
+        return db.query(self.model).filter(self.model.frame_id == frame_id).first()
+
+    def create_if_missing(self, db: Session, *, data: Dict[str, Any]) -> models.FrameWords:
+        """Store a frame's packed words unless another worker already stored them"""
+        existing = self.get(db, data["frame_id"])
+        if existing is not None:
+            return existing
+        try:
+            db_obj = self.model(**data)
+            db.add(db_obj)
+            db.commit()
+            return db_obj
+        except IntegrityError:
+            db.rollback()
+            return self.get(db, data["frame_id"])
+
+    def get_storage_stats(self, db: Session) -> Dict[str, Any]:
+        """Return how much space word geometry takes compared to the stored images"""
+        count, total_bytes, max_bytes, total_words, truncated, image_bytes = (
+            db.query(
+                func.count(self.model.frame_id),
+                func.coalesce(func.sum(self.model.byte_size), 0),
+                func.coalesce(func.max(self.model.byte_size), 0),
+                func.coalesce(func.sum(self.model.word_count), 0),
+                func.coalesce(func.sum(case((self.model.truncated.is_(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(models.Frame.file_size), 0),
+            )
+            .join(models.Frame, models.Frame.id == self.model.frame_id)
+            .one()
+        )
+        return {
+            "frames": count,
+            "total_bytes": total_bytes,
+            "max_bytes": max_bytes,
+            "avg_bytes_per_frame": round(total_bytes / count, 1) if count else 0.0,
+            "avg_bytes_per_word": round(total_bytes / total_words, 2) if total_words else 0.0,
+            "avg_words_per_frame": round(total_words / count, 1) if count else 0.0,
+            "truncated_frames": truncated,
+            "ratio_to_image_bytes": round(total_bytes / image_bytes, 4) if image_bytes else 0.0,
+        }
+
+
+class ImportedFileCRUD(CRUDBase):
+    def __init__(self):
+        super().__init__(models.ImportedFile)
+
+    def get_by_paths(self, db: Session, paths: List[str]) -> Dict[str, models.ImportedFile]:
+        """Return the import records of the given source paths that have one, keyed by path"""
+        records = {}
+        # Stay well below SQLite's bound parameter limit
+        for offset in range(0, len(paths), 500):
+            chunk = paths[offset : offset + 500]
+            for record in db.query(self.model).filter(self.model.source_path.in_(chunk)).all():
+                records[record.source_path] = record
+        return records
+
+    def count(self, db: Session) -> int:
+        return db.query(func.count(self.model.id)).scalar()
+
+
 class TagCRUD(CRUDBase):
     def __init__(self):
         super().__init__(models.Tag)
@@ -158,4 +289,7 @@ class TagCRUD(CRUDBase):
 
 # Create CRUD instances
 screenshot_crud = ScreenshotCRUD()
+frame_crud = FrameCRUD()
+frame_words_crud = FrameWordsCRUD()
 tag_crud = TagCRUD()
+imported_file_crud = ImportedFileCRUD()
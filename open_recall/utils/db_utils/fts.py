@@ -0,0 +1,210 @@
+import html
+import re
+from typing import Optional
+
+from sqlalchemy import column, event, func, literal_column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+
+from .base import Base
+from .models import Screenshot
+
+# External-content FTS5 index over the searchable screenshot columns. It stores only the
+# inverted index; the text stays in `screenshots`. Prefix indexes make "as you type" prefix
+# queries of two to four characters index lookups instead of term scans.
+FTS_TABLE = "screenshots_fts"
+FTS_COLUMNS = ("extracted_text", "window_title", "notes")
+
+CREATE_FTS_STATEMENTS = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        extracted_text, window_title, notes,
+        content='screenshots', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )
+    """,
+    # Triggers keep the index in step with every write path, including bulk inserts and updates
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON screenshots BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, extracted_text, window_title, notes)
+        VALUES (new.id, new.extracted_text, new.window_title, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON screenshots BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, extracted_text, window_title, notes)
+        VALUES ('delete', old.id, old.extracted_text, old.window_title, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF extracted_text, window_title, notes ON screenshots
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, extracted_text, window_title, notes)
+        VALUES ('delete', old.id, old.extracted_text, old.window_title, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, extracted_text, window_title, notes)
+        VALUES (new.id, new.extracted_text, new.window_title, new.notes);
+    END
+    """,
+)
+
+# The hidden column named after the table is the left operand of MATCH and of the ranking functions
+screenshots_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE), *(column(name) for name in FTS_COLUMNS))
+
+# Match markers put around matches by snippet() and highlight(); control characters never occur in
+# OCR text, so the text can be HTML-escaped before the markers become <mark> tags
+MATCH_START, MATCH_END = "\x02", "\x03"
+
+_WORD = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"?|([^\s"]+)')
+
+# Whether each database has a usable index, keyed by its URL
+_fts_available = {}
+
+
+def ensure_fts_index(connection) -> bool:
+    """
+    Create the full-text index and its triggers if they are missing, and backfill it
+
+    Returns:
+        bool: whether the index is available; False when SQLite was built without FTS5
+    """
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    try:
+        for statement in CREATE_FTS_STATEMENTS:
+            connection.execute(text(statement))
+    except OperationalError as e:
+        print(f"Full-text search index unavailable, falling back to substring search: {e}")
+        return False
+    if not exists:
+        rebuild_fts_index(connection)
+    return True
+
+
+def rebuild_fts_index(connection):
+    """Rebuild the full-text index from the screenshots table"""
+    rows = connection.execute(text("SELECT count(*) FROM screenshots")).scalar()
+    if rows:
+        print(f"Building full-text search index over {rows} screenshots...")
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_fts_index(target, connection, **kw):
+    """Databases created with create_all rather than migrations get the index too"""
+    if connection.dialect.name == "sqlite":
+        _fts_available[str(connection.engine.url)] = ensure_fts_index(connection)
+
+
+def is_fts_available(db) -> bool:
+    """Whether the session's database has the full-text index"""
+    url = str(db.get_bind().url)
+    if url not in _fts_available:
+        exists = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        _fts_available[url] = exists is not None
+    return _fts_available[url]
+
+
+def to_fts_query(search_text: str) -> Optional[str]:
+    """
+    Translate what a user typed into an FTS5 query
+
+    Every term must match; bare terms match as prefixes, so results update as a word is typed,
+    and "quoted text" matches as an exact phrase. Punctuation is dropped rather than passed on
+    as FTS5 syntax.
+
+    Returns:
+        str: the MATCH expression, or None if the text has no searchable words
+    """
+    parts = []
+    for phrase, term in _QUERY_PART.findall(search_text):
+        words = _WORD.findall(phrase or term)
+        if not words:
+            continue
+        parts.append(f'"{" ".join(words)}"' + ("" if phrase else "*"))
+    return " AND ".join(parts) or None
+
+
+def fts_match(fts_query: str):
+    """Filter screenshots whose indexed text matches an FTS5 query"""
+    return Screenshot.id.in_(select(screenshots_fts.c.rowid).where(fts_match_clause(fts_query)))
+
+
+def fts_match_clause(fts_query: str):
+    """MATCH condition on the full-text table itself, for queries that select from it"""
+    return screenshots_fts.c[FTS_TABLE].match(fts_query)
+
+
+def screenshot_text_filter(db, search_text: str):
+    """
+    Filter screenshots whose OCR text, window title or notes contain the search text
+
+    Uses the full-text index when it is available and falls back to substring matching otherwise.
+    """
+    fts_query = to_fts_query(search_text) if is_fts_available(db) else None
+    if fts_query is not None:
+        return fts_match(fts_query)
+    return or_(
+        Screenshot.extracted_text.ilike(f"%{search_text}%"),
+        Screenshot.window_title.ilike(f"%{search_text}%"),
+        Screenshot.notes.ilike(f"%{search_text}%"),
+    )
+
+
+def bm25_score(weights, half_life_days: float = 0):
+    """
+    Relevance of the matched screenshot, higher is better
+
+    Args:
+        weights: BM25 weights of the OCR text, window title and notes
+        half_life_days: if positive, the score is halved for a match this many days old, and
+            divided by 1 + age / half life in general, so recent matches outrank old ones of similar relevance
+    """
+    # bm25() is negative, lower meaning more relevant
+    score = -func.bm25(literal_column(FTS_TABLE), *weights)
+    if half_life_days > 0:
+        age_days = func.max(func.julianday("now") - func.julianday(Screenshot.timestamp), 0)
+        score = score / (1 + func.coalesce(age_days, 0) / half_life_days)
+    return score
+
+
+def snippet_columns(tokens: int = 24):
+    """OCR text snippet, highlighted window title and notes snippet of the matched screenshot"""
+    fts = literal_column(FTS_TABLE)
+    return (
+        func.snippet(fts, 0, MATCH_START, MATCH_END, "…", tokens),
+        func.highlight(fts, 1, MATCH_START, MATCH_END),
+        func.snippet(fts, 2, MATCH_START, MATCH_END, "…", tokens),
+    )
+
+
+def mark_matches(marked: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and wrap its matches in <mark> tags"""
+    if marked is None:
+        return None
+    return html.escape(marked).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+def plain_snippet(text_value: Optional[str], search_text: str, tokens: int = 24) -> str:
+    """Snippet around the first occurrence of the search text, for when there is no full-text index"""
+    if not text_value:
+        return ""
+    start = text_value.lower().find(search_text.lower())
+    if start < 0:
+        return html.escape(" ".join(text_value.split()[:tokens]))
+    # Roughly the same length as an FTS5 snippet of the same number of tokens
+    width = tokens * 3
+    before, match, after = (
+        text_value[max(0, start - width) : start],
+        text_value[start : start + len(search_text)],
+        text_value[start + len(search_text) : start + len(search_text) + width],
+    )
+    return (
+        ("…" if start > width else "")
+        + html.escape(before)
+        + f"<mark>{html.escape(match)}</mark>"
+        + html.escape(after)
+        + ("…" if start + len(search_text) + width < len(text_value) else "")
+    )
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Table,
     Text,
@@ -25,14 +26,55 @@ screenshot_tags = Table(
 )
 
 
+class Frame(Base):
+    """A distinct screen image: one stored blob and one OCR result, shared by every sighting of it"""
+
+    __tablename__ = "frames"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, unique=True, index=True)  # Hash of the raw pixels
+    perceptual_hash = Column(String, index=True)  # Hex dHash, matches visually identical frames
+    file_path = Column(String, unique=True)
+    width = Column(Integer)
+    height = Column(Integer)
+    file_size = Column(Integer)
+    extracted_text = Column(Text)
+    confidence_score = Column(Float)
+    ocr_skipped = Column(Boolean, default=False)  # Stored under a skip_ocr rule, so its text is still unread
+    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+
+    # Relationship with Screenshots (each screenshot is one timestamped sighting of the frame)
+    screenshots = relationship("Screenshot", back_populates="frame")
+    words = relationship("FrameWords", back_populates="frame", uselist=False, cascade="all, delete-orphan")
+
+
+class FrameWords(Base):
+    """Word boxes, lines and confidences of a frame's OCR result, packed by utils/word_geometry.py"""
+
+    __tablename__ = "frame_words"
+
+    frame_id = Column(Integer, ForeignKey("frames.id", ondelete="CASCADE"), primary_key=True)
+    word_count = Column(Integer)
+    truncated = Column(Boolean, default=False)  # True if words beyond the configured limit were dropped
+    byte_size = Column(Integer)
+    data = Column(LargeBinary)
+
+    frame = relationship("Frame", back_populates="words")
+
+
 class Screenshot(Base):
     __tablename__ = "screenshots"
 
     id = Column(Integer, primary_key=True, index=True)
-    file_path = Column(String, unique=True, index=True)
+    frame_id = Column(Integer, ForeignKey("frames.id", ondelete="SET NULL"), index=True)
+    # Repeat sightings of a frame share its blob, so the path is not unique
+    file_path = Column(String, index=True)
+    file_size = Column(Integer)  # Encoded size in bytes
+    encode_time_ms = Column(Float)
     timestamp = Column(DateTime, default=datetime.now(timezone.utc), index=True)
     app_name = Column(String, index=True)
     window_title = Column(String)
+    monitor = Column(Integer)  # mss monitor index the frame was captured from (1 = primary)
     extracted_text = Column(Text)
     confidence_score = Column(Float)
     is_favorite = Column(Boolean, default=False)
@@ -41,15 +83,20 @@ class Screenshot(Base):
 
     # Relationship with Tags
     tags = relationship("Tag", secondary=screenshot_tags, back_populates="screenshots", cascade="save-update")
+    frame = relationship("Frame", back_populates="screenshots")
 
     def to_dict(self):
         """Convert model to dictionary"""
         return {
             "id": self.id,
+            "frame_id": self.frame_id,
             "file_path": self.file_path,
+            "file_size": self.file_size,
+            "encode_time_ms": self.encode_time_ms,
             "timestamp": self.timestamp.isoformat(),
             "app_name": self.app_name,
             "window_title": self.window_title,
+            "monitor": self.monitor,
             "extracted_text": self.extracted_text,
             "confidence_score": self.confidence_score,
             "is_favorite": self.is_favorite,
@@ -59,6 +106,19 @@ class Screenshot(Base):
         }
 
 
+class ImportedFile(Base):
+    """An external image file brought in by the import command, so re-running it skips the file"""
+
+    __tablename__ = "imported_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_path = Column(String, unique=True, index=True)  # Absolute path the file was imported from
+    file_size = Column(Integer)
+    modified_at = Column(Float)  # Source file mtime; a changed file is imported again
+    screenshot_id = Column(Integer, ForeignKey("screenshots.id", ondelete="SET NULL"))
+    imported_at = Column(DateTime, default=datetime.now(timezone.utc))
+
+
 class Tag(Base):
     __tablename__ = "tags"
 
@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+from .models import Screenshot
+
+# Newest first, with the id breaking ties between screenshots taken in the same instant. SQLite
+# stores the row id in every index entry, so the timestamp index already serves this order.
+KEYSET_ORDER = (Screenshot.timestamp.desc(), Screenshot.id.desc())
+
+
+def encode_cursor(timestamp: datetime, screenshot_id: int) -> str:
+    """Opaque cursor pointing just past a screenshot in newest-first order"""
+    raw = json.dumps([timestamp.isoformat(), screenshot_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Read back the (timestamp, id) a cursor points past
+
+    Raises:
+        ValueError: if the cursor was not made by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, screenshot_id = json.loads(raw)
+        if not isinstance(screenshot_id, int):
+            raise ValueError("cursor id is not an integer")
+        return datetime.fromisoformat(timestamp), screenshot_id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def after_cursor(cursor: Optional[str]):
+    """
+    Filter screenshots that come after a cursor in newest-first order, or None for the first page
+
+    The row-value comparison seeks straight to the cursor in the timestamp index, so every page
+    costs the same however deep it is.
+    """
+    if not cursor:
+        return None
+    timestamp, screenshot_id = decode_cursor(cursor)
+    return tuple_(Screenshot.timestamp, Screenshot.id) < tuple_(timestamp, screenshot_id)
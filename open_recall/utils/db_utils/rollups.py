@@ -0,0 +1,317 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    Table,
+    event,
+    func,
+    select,
+    text,
+)
+
+from .base import Base
+from .models import Screenshot, Tag, screenshot_tags
+
+# Screenshot counts per day, app, monitor and favorite flag, and the same per tag, kept up to date
+# by triggers on every write so that counts and facets read a few thousand rollup rows instead of
+# scanning the screenshots. Missing values are stored as '' and -1, since NULLs never conflict in
+# the upserts that maintain the counts.
+screenshot_rollups = Table(
+    "screenshot_rollups",
+    Base.metadata,
+    Column("day", String, primary_key=True),  # date(timestamp), YYYY-MM-DD
+    Column("app_name", String, primary_key=True),
+    Column("monitor", Integer, primary_key=True),
+    Column("is_favorite", Boolean, primary_key=True),
+    Column("screenshot_count", Integer, nullable=False),
+)
+
+tag_rollups = Table(
+    "tag_rollups",
+    Base.metadata,
+    Column("tag_id", Integer, primary_key=True),
+    Column("day", String, primary_key=True),
+    Column("app_name", String, primary_key=True),
+    Column("monitor", Integer, primary_key=True),
+    Column("is_favorite", Boolean, primary_key=True),
+    Column("screenshot_count", Integer, nullable=False),
+)
+
+ROLLUP_KEY = "day, app_name, monitor, is_favorite"
+
+
+def _key(row: str) -> str:
+    """Rollup key of a screenshot row in trigger SQL"""
+    return (
+        f"coalesce(date({row}.timestamp), ''), coalesce({row}.app_name, ''), "
+        f"coalesce({row}.monitor, -1), coalesce({row}.is_favorite, 0)"
+    )
+
+
+def _add(row: str) -> str:
+    return f"""
+        INSERT INTO screenshot_rollups({ROLLUP_KEY}, screenshot_count) VALUES ({_key(row)}, 1)
+        ON CONFLICT({ROLLUP_KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+        INSERT INTO tag_rollups(tag_id, {ROLLUP_KEY}, screenshot_count)
+        SELECT tag_id, {_key(row)}, 1 FROM screenshot_tags WHERE screenshot_id = {row}.id
+        ON CONFLICT(tag_id, {ROLLUP_KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+    """
+
+
+def _remove(row: str) -> str:
+    return f"""
+        UPDATE screenshot_rollups SET screenshot_count = screenshot_count - 1
+        WHERE ({ROLLUP_KEY}) = ({_key(row)});
+        DELETE FROM screenshot_rollups WHERE ({ROLLUP_KEY}) = ({_key(row)}) AND screenshot_count <= 0;
+        UPDATE tag_rollups SET screenshot_count = screenshot_count - 1
+        WHERE ({ROLLUP_KEY}) = ({_key(row)})
+            AND tag_id IN (SELECT tag_id FROM screenshot_tags WHERE screenshot_id = {row}.id);
+        DELETE FROM tag_rollups WHERE ({ROLLUP_KEY}) = ({_key(row)}) AND screenshot_count <= 0;
+    """
+
+
+# A screenshot's tags are counted by whichever of the screenshot and its tag links is deleted first:
+# the other trigger then no longer finds its counterpart and changes nothing
+CREATE_ROLLUP_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS screenshot_rollups_ai AFTER INSERT ON screenshots BEGIN {_add('new')} END",
+    f"CREATE TRIGGER IF NOT EXISTS screenshot_rollups_ad AFTER DELETE ON screenshots BEGIN {_remove('old')} END",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS screenshot_rollups_au
+    AFTER UPDATE OF timestamp, app_name, monitor, is_favorite ON screenshots BEGIN {_remove('old')} {_add('new')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tag_rollups_ai AFTER INSERT ON screenshot_tags BEGIN
+        INSERT INTO tag_rollups(tag_id, {ROLLUP_KEY}, screenshot_count)
+        SELECT new.tag_id, {_key('s')}, 1 FROM screenshots s WHERE s.id = new.screenshot_id
+        ON CONFLICT(tag_id, {ROLLUP_KEY}) DO UPDATE SET screenshot_count = screenshot_count + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tag_rollups_ad AFTER DELETE ON screenshot_tags BEGIN
+        UPDATE tag_rollups SET screenshot_count = screenshot_count - 1
+        WHERE tag_id = old.tag_id
+            AND ({ROLLUP_KEY}) = (SELECT {_key('s')} FROM screenshots s WHERE s.id = old.screenshot_id);
+        DELETE FROM tag_rollups WHERE tag_id = old.tag_id AND screenshot_count <= 0;
+    END
+    """,
+)
+
+REBUILD_ROLLUP_STATEMENTS = (
+    "DELETE FROM screenshot_rollups",
+    "DELETE FROM tag_rollups",
+    f"""
+    INSERT INTO screenshot_rollups({ROLLUP_KEY}, screenshot_count)
+    SELECT {_key('s')}, count(*) FROM screenshots s GROUP BY 1, 2, 3, 4
+    """,
+    f"""
+    INSERT INTO tag_rollups(tag_id, {ROLLUP_KEY}, screenshot_count)
+    SELECT st.tag_id, {_key('s')}, count(*)
+    FROM screenshot_tags st JOIN screenshots s ON s.id = st.screenshot_id GROUP BY 1, 2, 3, 4, 5
+    """,
+)
+
+
+def ensure_rollups(connection):
+    """Create the rollup triggers if they are missing, and fill rollup tables that are still empty"""
+    for statement in CREATE_ROLLUP_TRIGGERS:
+        connection.execute(text(statement))
+    empty = connection.execute(text("SELECT 1 FROM screenshot_rollups LIMIT 1")).first() is None
+    if empty and connection.execute(text("SELECT 1 FROM screenshots LIMIT 1")).first() is not None:
+        rebuild_rollups(connection)
+
+
+def _snapshot(connection) -> Counter:
+    counts = Counter()
+    for row in connection.execute(text(f"SELECT 0, {ROLLUP_KEY}, screenshot_count FROM screenshot_rollups")):
+        counts[tuple(row[:-1])] = row[-1]
+    for row in connection.execute(text(f"SELECT tag_id, {ROLLUP_KEY}, screenshot_count FROM tag_rollups")):
+        counts[("tag",) + tuple(row[:-1])] = row[-1]
+    return counts
+
+
+def rebuild_rollups(connection) -> Dict[str, int]:
+    """
+    Recompute the rollups from the screenshots and their tags
+
+    Returns:
+        dict: rollup rows written, and how many rollup counts were wrong before the rebuild
+    """
+    before = _snapshot(connection)
+    for statement in REBUILD_ROLLUP_STATEMENTS:
+        connection.execute(text(statement))
+    after = _snapshot(connection)
+    return {
+        "screenshot_rollups": sum(1 for key in after if key[0] != "tag"),
+        "tag_rollups": sum(1 for key in after if key[0] == "tag"),
+        "corrected": sum(1 for key in before.keys() | after.keys() if before[key] != after[key]),
+    }
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_rollup_triggers(target, connection, **kw):
+    """Databases created with create_all rather than migrations get the triggers too"""
+    if connection.dialect.name == "sqlite":
+        ensure_rollups(connection)
+
+
+def _live_rows(db, start: Optional[datetime], end: Optional[datetime], tagged: bool, conditions: Sequence = ()):
+    """
+    Screenshots in a time range grouped like the rollups
+
+    They are read once and every facet is then counted from these rows, so the screenshots are
+    not scanned again per facet.
+    """
+    key = [
+        func.coalesce(func.date(Screenshot.timestamp), "").label("day"),
+        func.coalesce(Screenshot.app_name, "").label("app_name"),
+        func.coalesce(Screenshot.monitor, -1).label("monitor"),
+        func.coalesce(Screenshot.is_favorite, False).label("is_favorite"),
+    ]
+    if tagged:
+        key.insert(0, screenshot_tags.c.tag_id)
+    query = select(*key, func.count().label("screenshot_count")).select_from(Screenshot)
+    if tagged:
+        query = query.join(screenshot_tags, screenshot_tags.c.screenshot_id == Screenshot.id)
+    if start is not None:
+        query = query.where(Screenshot.timestamp >= start)
+    if end is not None:
+        query = query.where(Screenshot.timestamp <= end)
+    return [row._asdict() for row in db.execute(query.where(*conditions).group_by(*key))]
+
+
+def _sources(db, start: Optional[datetime], end: Optional[datetime], tagged: bool, conditions: Sequence = ()):
+    """
+    Sources that together cover a time range exactly, as (rollup table, conditions) or (rows, None) pairs
+
+    Whole days come from the rollups; the parts of the first and last day that the range cuts are
+    counted from the screenshots themselves, which reads at most two days of the timestamp index.
+    Screenshot conditions the rollups cannot answer, such as a text search, make it all live.
+    """
+    if conditions:
+        return [(_live_rows(db, start, end, tagged, conditions), None)]
+    rollups = tag_rollups if tagged else screenshot_rollups
+    first_day = None if start is None else start.date() + timedelta(days=start.time() != time.min)
+    # Timestamps are compared up to the microsecond, so a day is whole if the range reaches its last microsecond
+    last_day = None if end is None else (end + timedelta(microseconds=1)).date() - timedelta(days=1)
+    if first_day is not None and last_day is not None and first_day > last_day:
+        return [(_live_rows(db, start, end, tagged), None)]
+
+    # Screenshots without a timestamp never match a date range
+    day_range = [rollups.c.day != ""] if start is not None or end is not None else []
+    sources = []
+    if first_day is not None:
+        day_range.append(rollups.c.day >= first_day.isoformat())
+        if start.time() != time.min:
+            first_midnight = datetime.combine(first_day, time.min)
+            sources.append((_live_rows(db, start, first_midnight - timedelta(microseconds=1), tagged), None))
+    if last_day is not None:
+        day_range.append(rollups.c.day <= last_day.isoformat())
+        if end.time() != time.max:
+            last_midnight = datetime.combine(last_day + timedelta(days=1), time.min)
+            sources.append((_live_rows(db, last_midnight, end, tagged), None))
+    sources.append((rollups, day_range))
+    return sources
+
+
+def _count_by(db, dimension: Optional[str], sources, **filters) -> Counter:
+    """Sum screenshot counts over the sources, grouped by one rollup column or in total"""
+    filters = {name: value for name, value in filters.items() if value is not None}
+    counts = Counter()
+    for source, conditions in sources:
+        if conditions is None:
+            for row in source:
+                if all(row[name] == value for name, value in filters.items()):
+                    counts[row[dimension] if dimension else None] += row["screenshot_count"]
+            continue
+        conditions = conditions + [source.c[name] == value for name, value in filters.items()]
+        group = [source.c[dimension]] if dimension else []
+        query = select(*group, func.sum(source.c.screenshot_count)).where(*conditions).group_by(*group)
+        for row in db.execute(query):
+            if row[-1]:
+                counts[row[0] if dimension else None] += row[-1]
+    return counts
+
+
+def count_screenshots(
+    db,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_id: Optional[int] = None,
+) -> int:
+    """Number of screenshots matching the listing filters, with at most one tag, read from the rollups"""
+    tagged = tag_id is not None
+    filters = {"app_name": app_name, "monitor": monitor, "is_favorite": is_favorite, "tag_id": tag_id}
+    return _count_by(db, None, _sources(db, start, end, tagged), **filters)[None]
+
+
+def screenshot_facets(
+    db,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    app_name: Optional[str] = None,
+    monitor: Optional[int] = None,
+    is_favorite: Optional[bool] = None,
+    tag_ids: Optional[List[int]] = None,
+    text_filter=None,
+) -> Dict[str, Any]:
+    """
+    Screenshot counts per app, day, monitor, favorite flag and tag for a set of filters
+
+    Each facet is counted with every filter except its own, so that with one app selected the
+    other apps still show how many screenshots they would give; the total applies all filters.
+    The counts come from the rollups, except with a text filter or several tags, which have to
+    look at the matching screenshots.
+
+    Args:
+        tag_ids: screenshots with any of these tags
+        text_filter: condition on screenshots, such as a full-text match
+    """
+    text_conditions = [text_filter] if text_filter is not None else []
+    if text_conditions or (tag_ids and len(tag_ids) > 1):
+        tag_id = None
+        tag_conditions = [Screenshot.tags.any(Tag.id.in_(tag_ids))] if tag_ids else []
+    else:
+        tag_id = tag_ids[0] if tag_ids else None
+        tag_conditions = []
+    sources = _sources(db, start, end, tag_id is not None, text_conditions + tag_conditions)
+    filters = {"app_name": app_name, "monitor": monitor, "is_favorite": is_favorite, "tag_id": tag_id}
+
+    def facet(dimension: str) -> Counter:
+        return _count_by(db, dimension, sources, **{**filters, dimension: None})
+
+    days = _count_by(db, "day", sources, **filters)
+    apps, monitors, favorites = facet("app_name"), facet("monitor"), facet("is_favorite")
+    tags = _count_by(db, "tag_id", _sources(db, start, end, True, text_conditions), **{**filters, "tag_id": None})
+    tag_names = dict(db.query(Tag.id, Tag.name).filter(Tag.id.in_(list(tags))).all()) if tags else {}
+
+    return {
+        "total": sum(days.values()),
+        "apps": [{"app_name": name or None, "count": count} for name, count in apps.most_common()],
+        "days": [{"day": day or None, "count": count} for day, count in sorted(days.items(), reverse=True)],
+        "monitors": [
+            {"monitor": None if number == -1 else number, "count": count} for number, count in sorted(monitors.items())
+        ],
+        "favorites": sum(count for favorite, count in favorites.items() if favorite),
+        "tags": [
+            {"id": tag, "name": tag_names[tag], "count": count} for tag, count in tags.most_common() if tag in tag_names
+        ],
+    }
+
+
+def rollup_app_names(db) -> List[str]:
+    """Names of the apps that have screenshots, in alphabetical order"""
+    query = (
+        select(screenshot_rollups.c.app_name)
+        .where(screenshot_rollups.c.app_name != "")
+        .distinct()
+        .order_by(screenshot_rollups.c.app_name)
+    )
+    return [row[0] for row in db.execute(query)]
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from .settings import settings_manager
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# OCR text beyond this many characters falls past the model's token limit anyway
+MAX_TEXT_CHARS = 2000
+
+
+def embedding_text(window_title: Optional[str], extracted_text: Optional[str]) -> str:
+    """Text embedded for a screenshot: its window title, then the start of its OCR text"""
+    text = f"{window_title or ''}\n{' '.join((extracted_text or '').split())}"
+    return text.strip()[:MAX_TEXT_CHARS]
+
+
+class TextEmbedder:
+    """
+    Sentence embeddings from a small local transformer, on CPU.
+
+    Texts are run through the model in batches, sorted by length so a batch pads to
+    similar lengths, and the token embeddings are mean-pooled over the attention mask
+    and L2-normalized, so a dot product of two vectors is their cosine similarity.
+    Vectors of recently embedded texts are kept, because repeat sightings of a screen
+    share its text.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, max_tokens: int = 256, cache_size: int = 512):
+        # Imported here so that the server starts without loading torch
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.cache_size = cache_size
+        self._torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+        self.dim = self.model.config.hidden_size
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # The model is not safe to call from several threads at once
+        self._lock = threading.Lock()
+        self.stats = {"texts": 0, "cache_hits": 0, "batches": 0}
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        torch = self._torch
+        with torch.inference_mode():
+            encoded = self.tokenizer(
+                texts, padding=True, truncation=True, max_length=self.max_tokens, return_tensors="pt"
+            )
+            tokens = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(tokens.dtype)
+            pooled = (tokens * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.numpy().astype(np.float32)
+
+    def embed(self, texts: List[str], batch_size: int = 16) -> np.ndarray:
+        """Embed texts, returning a (len(texts), dim) float32 array of unit vectors"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        with self._lock:
+            missing = []
+            for index, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    vectors[index] = cached
+                    self.stats["cache_hits"] += 1
+                else:
+                    missing.append(index)
+
+            missing.sort(key=lambda index: len(texts[index]))
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start : start + batch_size]
+                vectors[batch] = self._run([texts[index] for index in batch])
+                self.stats["batches"] += 1
+                for index in batch:
+                    self._cache[keys[index]] = vectors[index]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats["texts"] += len(texts)
+        return vectors
+
+
+# Global embedder, loaded on first use
+_embedder: Optional[TextEmbedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> TextEmbedder:
+    """Get the embedder for the configured model, loading it if needed"""
+    global _embedder
+    model_name = settings_manager.get_setting("embedding_model", DEFAULT_EMBEDDING_MODEL)
+    with _embedder_lock:
+        if _embedder is None or _embedder.model_name != model_name:
+            _embedder = TextEmbedder(model_name)
+        return _embedder
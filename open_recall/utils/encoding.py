@@ -0,0 +1,108 @@
+import io
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+# Named trade-offs between encode CPU time and bytes on disk
+ENCODING_PROFILES: Dict[str, Dict] = {
+    "webp_fast": {
+        "format": "WEBP",
+        "extension": "webp",
+        "params": {"quality": 80, "method": 0},
+        "description": "Lossy WebP at the lowest encoder effort; fastest WebP option",
+    },
+    "webp_balanced": {
+        "format": "WEBP",
+        "extension": "webp",
+        "params": {"quality": 90, "method": 4},
+        "description": "Lossy WebP at libwebp's default effort",
+    },
+    "webp_small": {
+        "format": "WEBP",
+        "extension": "webp",
+        "params": {"quality": 90, "method": 6},
+        "description": "Lossy WebP at maximum effort; smallest files, slowest encode",
+    },
+    "webp_lossless": {
+        "format": "WEBP",
+        "extension": "webp",
+        # For lossless WebP, quality is the compression effort
+        "params": {"lossless": True, "quality": 10, "method": 1},
+        "description": "Lossless WebP at low effort; screen content compresses well losslessly",
+    },
+    "jpeg": {
+        "format": "JPEG",
+        "extension": "jpg",
+        "params": {"quality": 85},
+        "description": "Baseline JPEG; very fast, larger files and blurrier text",
+    },
+    "png": {
+        "format": "PNG",
+        "extension": "png",
+        "params": {"compress_level": 1},
+        "description": "Lossless PNG with light zlib compression",
+    },
+    "avif": {
+        "format": "AVIF",
+        "extension": "avif",
+        "params": {"quality": 70, "speed": 8},
+        "description": "AVIF at a fast encoder speed; needs Pillow AVIF support",
+    },
+}
+
+DEFAULT_PROFILE = "webp_fast"
+
+
+def is_profile_available(name: str) -> bool:
+    """Check if Pillow in this environment can write the profile's format"""
+    profile = ENCODING_PROFILES.get(name)
+    if profile is None:
+        return False
+    if profile["format"] == "AVIF":
+        try:
+            # Pillow < 11.2 only supports AVIF through the pillow-avif-plugin package
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            pass
+        Image.init()
+        return "AVIF" in Image.SAVE
+    if profile["format"] == "WEBP":
+        return features.check("webp")
+    return True
+
+
+def get_available_profiles() -> Dict[str, Dict]:
+    """Get all encoding profiles with their availability"""
+    return {
+        name: {
+            "format": profile["format"],
+            "description": profile["description"],
+            "available": is_profile_available(name),
+        }
+        for name, profile in ENCODING_PROFILES.items()
+    }
+
+
+def encode_image(image_array: np.ndarray, profile_name: str) -> Tuple[bytes, str, float]:
+    """
+    Encode an RGB image array with a named profile
+
+    Args:
+        image_array: numpy array of the image in RGB format
+        profile_name: key of ENCODING_PROFILES; unavailable profiles fall back to the default
+
+    Returns:
+        tuple: (encoded bytes, file extension, encode time in milliseconds)
+    """
+    if not is_profile_available(profile_name):
+        print(f"Encoding profile '{profile_name}' is not available, using {DEFAULT_PROFILE}")
+        profile_name = DEFAULT_PROFILE
+    profile = ENCODING_PROFILES[profile_name]
+
+    started = time.perf_counter()
+    buffer = io.BytesIO()
+    Image.fromarray(image_array).save(buffer, format=profile["format"], **profile["params"])
+    encode_ms = (time.perf_counter() - started) * 1000
+    return buffer.getvalue(), profile["extension"], encode_ms
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class EventBus:
+    """
+    Hands events from worker threads to the server's asyncio event loop.
+
+    publish() never blocks: events go into a bounded buffer (the oldest event is dropped
+    when it is full) and the loop is woken with call_soon_threadsafe. run() is a
+    long-lived task on the server loop that drains the buffer and passes each event
+    to a delivery coroutine, e.g. a WebSocket broadcast.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max(1, int(max_pending))
+        self._pending: "deque[Dict[str, Any]]" = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0, "failed": 0}
+
+    def publish(self, event: Dict[str, Any]):
+        """Queue an event for delivery; safe to call from any thread"""
+        with self._lock:
+            self.stats["published"] += 1
+            was_empty = not self._pending
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.stats["dropped"] += 1
+            self._pending.append(event)
+            loop, wakeup = self._loop, self._wakeup
+
+        # The dispatcher drains everything it finds, so it only needs waking once per batch
+        if was_empty and loop is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The loop has been closed; the events stay buffered until a new dispatcher attaches
+                pass
+
+    async def run(self, deliver: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        """Deliver published events until cancelled; must run on the loop that should receive them"""
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = wakeup
+            if self._pending:
+                wakeup.set()
+
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                with self._lock:
+                    batch = list(self._pending)
+                    self._pending.clear()
+
+                for event in batch:
+                    try:
+                        await deliver(event)
+                        self.stats["delivered"] += 1
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"Error delivering {event.get('type')} event: {e}")
+        finally:
+            with self._lock:
+                if self._wakeup is wakeup:
+                    self._loop = None
+                    self._wakeup = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return event counters and the number of events waiting for delivery"""
+        with self._lock:
+            return {**self.stats, "pending": len(self._pending), "max_pending": self.max_pending}
+
+
+# Global event bus from the capture pipeline to WebSocket clients
+event_bus = EventBus()
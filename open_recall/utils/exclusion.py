@@ -0,0 +1,161 @@
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# "drop" skips the capture entirely; "skip_ocr" stores the screenshot without OCR or summary
+EXCLUSION_ACTIONS = ("drop", "skip_ocr")
+
+
+class ExclusionRule:
+    """
+    One compiled exclusion rule.
+
+    A rule matches when every filter it sets matches: the app name (case-insensitive,
+    any of `app_names`), the window title (regex search, case-insensitive) and the
+    monitor index. A rule without any filter never matches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        app_names: Optional[List[str]] = None,
+        title_pattern: Optional[str] = None,
+        monitors: Optional[List[int]] = None,
+        action: str = "drop",
+        enabled: bool = True,
+    ):
+        if action not in EXCLUSION_ACTIONS:
+            raise ValueError(f"Unknown exclusion action '{action}', expected one of {', '.join(EXCLUSION_ACTIONS)}")
+        try:
+            self.title_regex = re.compile(title_pattern, re.IGNORECASE) if title_pattern else None
+        except re.error as e:
+            raise ValueError(f"Invalid title pattern for rule '{name}': {e}") from e
+
+        self.name = name
+        self.app_names = {app.lower() for app in app_names} if app_names else None
+        self.title_pattern = title_pattern
+        self.monitors = set(int(m) for m in monitors) if monitors else None
+        self.action = action
+        self.enabled = enabled
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int = 0) -> "ExclusionRule":
+        """
+        Build a rule from its settings representation
+
+        Raises:
+            ValueError: if the rule or one of its fields has the wrong type
+        """
+        label = f"Exclusion rule {index + 1}"
+        if not isinstance(data, dict):
+            raise ValueError(f"{label} must be an object")
+        app_names = data.get("app_names", data.get("app_name"))
+        if isinstance(app_names, str):
+            app_names = [app_names]
+        if app_names is not None and (
+            not isinstance(app_names, list) or not all(isinstance(app, str) for app in app_names)
+        ):
+            raise ValueError(f"{label}: app_names must be a string or a list of strings")
+        monitors = data.get("monitors")
+        if monitors is not None and (
+            not isinstance(monitors, list)
+            or not all(isinstance(monitor, int) and not isinstance(monitor, bool) for monitor in monitors)
+        ):
+            raise ValueError(f"{label}: monitors must be a list of monitor indexes")
+        for key in ("name", "title_pattern", "action"):
+            if data.get(key) is not None and not isinstance(data[key], str):
+                raise ValueError(f"{label}: {key} must be a string")
+        if not isinstance(data.get("enabled", True), bool):
+            raise ValueError(f"{label}: enabled must be true or false")
+        return cls(
+            name=data.get("name") or f"rule_{index + 1}",
+            app_names=app_names,
+            title_pattern=data.get("title_pattern"),
+            monitors=monitors,
+            action=data.get("action", "drop"),
+            enabled=data.get("enabled", True),
+        )
+
+    def has_filters(self) -> bool:
+        return self.app_names is not None or self.title_regex is not None or self.monitors is not None
+
+    def matches(self, app_name: str, window_title: str, monitor: int) -> bool:
+        """Check if a frame with this window and monitor is excluded by the rule"""
+        if not self.enabled or not self.has_filters():
+            return False
+        if self.monitors is not None and monitor not in self.monitors:
+            return False
+        if self.app_names is not None and (app_name or "").lower() not in self.app_names:
+            return False
+        if self.title_regex is not None and not self.title_regex.search(window_title or ""):
+            return False
+        return True
+
+
+class ExclusionRules:
+    """
+    Ordered set of exclusion rules evaluated before a frame is captured.
+
+    The first matching rule wins. Rules can be replaced at any time with load(); hit
+    counters survive reloads for rules that keep their name.
+    """
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        self._lock = threading.Lock()
+        self._rules: List[ExclusionRule] = []
+        self._hits: Dict[str, Dict[str, Any]] = {}
+        self.load(rules or [])
+
+    @staticmethod
+    def compile(rules: List[Dict[str, Any]]) -> List[ExclusionRule]:
+        """Compile rules from settings, raising ValueError for invalid ones"""
+        if not isinstance(rules, list):
+            raise ValueError("Exclusion rules must be a list")
+        compiled = [ExclusionRule.from_dict(rule, index) for index, rule in enumerate(rules)]
+        names = [rule.name for rule in compiled]
+        if len(names) != len(set(names)):
+            raise ValueError("Exclusion rule names must be unique")
+        return compiled
+
+    def load(self, rules: List[Dict[str, Any]]):
+        """Replace the active rules"""
+        compiled = self.compile(rules)
+        with self._lock:
+            self._rules = compiled
+            self._hits = {
+                rule.name: self._hits.get(rule.name, {"hits": 0, "last_hit": None, "saved": {}}) for rule in compiled
+            }
+
+    def evaluate(self, app_name: str, window_title: str, monitor: int) -> Optional[ExclusionRule]:
+        """Return the first rule that excludes this frame and count the hit, or None"""
+        with self._lock:
+            for rule in self._rules:
+                if rule.matches(app_name, window_title, monitor):
+                    counters = self._hits[rule.name]
+                    counters["hits"] += 1
+                    counters["last_hit"] = datetime.now(timezone.utc).isoformat()
+                    return rule
+        return None
+
+    def record_saved(self, rule_name: str, stage: str):
+        """Count a unit of work (a capture, an OCR pass, a summary) that a rule made unnecessary"""
+        with self._lock:
+            counters = self._hits.get(rule_name)
+            if counters is not None:
+                counters["saved"][stage] = counters["saved"].get(stage, 0) + 1
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Return each rule with its hit counters"""
+        with self._lock:
+            return [
+                {
+                    "name": rule.name,
+                    "action": rule.action,
+                    "enabled": rule.enabled,
+                    "hits": self._hits[rule.name]["hits"],
+                    "last_hit": self._hits[rule.name]["last_hit"],
+                    "saved": dict(self._hits[rule.name]["saved"]),
+                }
+                for rule in self._rules
+            ]
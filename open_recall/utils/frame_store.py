@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .change_detection import DifferenceHashChangeDetector
+from .db_utils import Frame, frame_crud
+
+
+class FrameStore:
+    """
+    Content-addressed storage for captured frames.
+
+    Every distinct frame is stored once under a path derived from the hash of its
+    pixels, and its OCR result lives on its Frame row. Seeing a pixel-identical frame
+    again resolves to the existing Frame, so no encoding or OCR is needed. Optionally,
+    a frame within `perceptual_distance` bits of a recent frame's dHash also matches;
+    its pixels may differ in small ways, such as one edited cell or a clock tick, so
+    such a match only saves storing the image and the frame is still read with OCR.
+    """
+
+    def __init__(self, storage_path: str, perceptual_distance: Optional[int] = None, recent_limit: int = 5000):
+        self.storage_path = storage_path
+        # None disables perceptual matching; 0 only matches identical dHashes
+        self.perceptual_distance = perceptual_distance
+        self.recent_limit = recent_limit
+        # 32x32 dHash (1024 bits): fine enough that text edits usually change it
+        self._hasher = DifferenceHashChangeDetector(hash_size=32)
+        self._lock = threading.Lock()
+        self._recent: "OrderedDict[str, int]" = OrderedDict()
+        self.stats = {"exact_hits": 0, "perceptual_hits": 0, "misses": 0}
+
+    def fingerprint(self, image: np.ndarray) -> Tuple[str, str]:
+        """Return the (content hash, perceptual hash) of an RGB frame"""
+        image = np.ascontiguousarray(image)
+        content = hashlib.blake2b(digest_size=20)
+        content.update(str(image.shape).encode())
+        content.update(memoryview(image).cast("B"))
+        return content.hexdigest(), self._hasher.fingerprint(image).tobytes().hex()
+
+    def blob_path(self, content_hash: str, extension: str) -> str:
+        """Relative path of the blob for a content hash, fanned out into 256 subdirectories"""
+        return f"{content_hash[:2]}/{content_hash}.{extension}"
+
+    def write_blob(self, relative_path: str, data: bytes):
+        """Write a blob under the storage path, atomically replacing any partial earlier write"""
+        filepath = os.path.join(self.storage_path, relative_path)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # A temp file of its own per write, so concurrent writers of the same blob never share one
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def load_recent(self, db: Session):
+        """Seed the perceptual index from the most recent frames in the database"""
+        if self.perceptual_distance is None:
+            return
+        rows = frame_crud.get_recent_perceptual_hashes(db, limit=self.recent_limit)
+        with self._lock:
+            self._recent.clear()
+            for frame_id, perceptual_hash in reversed(rows):
+                self._recent[perceptual_hash] = frame_id
+
+    def remember(self, frame_id: int, perceptual_hash: str):
+        """Add a frame to the perceptual index, evicting the oldest entries beyond recent_limit"""
+        if self.perceptual_distance is None or not perceptual_hash:
+            return
+        with self._lock:
+            self._recent[perceptual_hash] = frame_id
+            self._recent.move_to_end(perceptual_hash)
+            while len(self._recent) > self.recent_limit:
+                self._recent.popitem(last=False)
+
+    def _find_perceptual(self, perceptual_hash: str) -> Optional[int]:
+        with self._lock:
+            if perceptual_hash in self._recent:
+                return self._recent[perceptual_hash]
+            if not self.perceptual_distance or not self._recent:
+                return None
+            keys = list(self._recent.keys())
+            ids = list(self._recent.values())
+
+        target = np.frombuffer(bytes.fromhex(perceptual_hash), dtype=np.uint8)
+        candidates = np.frombuffer(b"".join(bytes.fromhex(k) for k in keys), dtype=np.uint8).reshape(len(keys), -1)
+        if candidates.shape[1] != target.shape[0]:
+            return None
+        distances = np.unpackbits(np.bitwise_xor(candidates, target), axis=1).sum(axis=1)
+        best = int(np.argmin(distances))
+        return ids[best] if distances[best] <= self.perceptual_distance else None
+
+    def find(self, db: Session, content_hash: str, perceptual_hash: str) -> Tuple[Optional[Frame], bool]:
+        """
+        Find a stored frame that matches exactly or perceptually
+
+        Returns:
+            tuple: (the matching frame or None, whether its pixels are identical)
+        """
+        frame = frame_crud.get_by_content_hash(db, content_hash)
+        if frame is not None:
+            with self._lock:
+                self.stats["exact_hits"] += 1
+            return frame, True
+
+        if self.perceptual_distance is not None:
+            frame_id = self._find_perceptual(perceptual_hash)
+            frame = frame_crud.get(db, frame_id) if frame_id is not None else None
+            if frame is not None:
+                with self._lock:
+                    self.stats["perceptual_hits"] += 1
+                return frame, False
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None, False
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return dedup hit and miss counters"""
+        with self._lock:
+            return {**self.stats, "indexed_frames": len(self._recent)}
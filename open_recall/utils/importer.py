@@ -0,0 +1,402 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import insert
+
+from .db_utils import (
+    Frame,
+    FrameWords,
+    ImportedFile,
+    Screenshot,
+    get_db,
+    imported_file_crud,
+)
+from .encoding import DEFAULT_PROFILE, encode_image
+from .frame_store import FrameStore
+from .ocr_cache import ocr_cache
+from .ocr_preprocessing import (
+    DEFAULT_OCR_PROFILE,
+    OCR_PROFILES,
+    preprocess_for_ocr,
+    restore_word_boxes,
+)
+from .ocr_utils import extract_words_batch, words_confidence, words_to_text_with_offsets
+from .settings import settings_manager
+from .word_geometry import pack_words
+
+IMPORT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff", ".gif")
+
+# EXIF tags holding when the picture was taken: DateTimeOriginal and DateTimeDigitized live in
+# the Exif sub-IFD, DateTime in the main IFD
+_EXIF_IFD = 0x8769
+_EXIF_DATE_TAGS = (36867, 36868)
+_EXIF_DATETIME = 306
+
+# Fingerprints are computed in the decode processes; one hasher per process
+_fingerprinter: Optional[FrameStore] = None
+
+
+def _exif_timestamp(img: Image.Image) -> Optional[datetime]:
+    """Capture time from EXIF, as UTC; EXIF times carry no zone and are taken as local time"""
+    try:
+        exif = img.getexif()
+        sub_ifd = exif.get_ifd(_EXIF_IFD)
+        values = [sub_ifd.get(tag) for tag in _EXIF_DATE_TAGS] + [exif.get(_EXIF_DATETIME)]
+    except Exception:
+        return None
+    for value in values:
+        if not value:
+            continue
+        try:
+            return datetime.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S").astimezone(timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def _load_image(path: str, encoding_profile: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode, fingerprint and encode one source file; runs in the decode process pool
+
+    Returns None if the file cannot be read.
+    """
+    global _fingerprinter
+    if _fingerprinter is None:
+        _fingerprinter = FrameStore("")
+    try:
+        with Image.open(path) as img:
+            timestamp = _exif_timestamp(img)
+            image = np.asarray(img.convert("RGB"))
+        stat = os.stat(path)
+    except Exception as e:
+        print(f"Could not read {path}: {e}")
+        return None
+
+    content_hash, perceptual_hash = _fingerprinter.fingerprint(image)
+    data, extension, encode_ms = encode_image(image, encoding_profile)
+    return {
+        "source_path": path,
+        "source_size": stat.st_size,
+        "modified_at": stat.st_mtime,
+        "timestamp": timestamp or datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        "image": image,
+        "content_hash": content_hash,
+        "perceptual_hash": perceptual_hash,
+        "data": data,
+        "extension": extension,
+        "encode_time_ms": encode_ms,
+    }
+
+
+def find_images(directory: str) -> List[str]:
+    """Absolute paths of the importable images under a directory, in a stable order"""
+    paths = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(IMPORT_EXTENSIONS):
+                paths.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(paths)
+
+
+class ScreenshotImporter:
+    """
+    Imports a folder of screenshots taken by other tools into the archive.
+
+    Files are handled `chunk_size` at a time: decode processes read each image, take its
+    capture time from EXIF (falling back to the file's mtime), fingerprint and encode it;
+    frames already in the archive are reused as duplicates; new frames are read by OCR in
+    batches, optionally spread over OCR worker processes; and the chunk's frames,
+    screenshots, word geometry and import records are written in one transaction. Source
+    files recorded by an earlier import with the same size and mtime are skipped before
+    they are decoded.
+    """
+
+    def __init__(
+        self,
+        storage_path: str,
+        app_name: str = "Imported",
+        chunk_size: int = 32,
+        decode_workers: int = 2,
+        ocr_workers: int = 0,
+        batch_size: int = 8,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.storage_path = storage_path
+        self.app_name = app_name
+        self.chunk_size = max(1, int(chunk_size))
+        self.decode_workers = max(1, int(decode_workers))
+        self.ocr_workers = max(0, int(ocr_workers))
+        self.batch_size = max(1, int(batch_size))
+        self.on_progress = on_progress
+
+        self.frame_store = FrameStore(
+            storage_path,
+            perceptual_distance=settings_manager.get_setting("dedup_perceptual_distance"),
+            recent_limit=settings_manager.get_setting("dedup_recent_frames", 5000),
+        )
+        self.encoding_profile = settings_manager.get_setting("image_profile", DEFAULT_PROFILE)
+        self.ocr_profile = OCR_PROFILES.get(
+            settings_manager.get_setting("ocr_profile"), OCR_PROFILES[DEFAULT_OCR_PROFILE]
+        )
+        self.ocr_backend = settings_manager.get_setting("ocr_backend", "doctr")
+        self.ocr_pool = None
+        self.progress = {
+            "found": 0,
+            "skipped": 0,
+            "imported": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "pages": 0,
+            "bytes_read": 0,
+        }
+        self.started_at = None
+
+    def _read_pages(self, pages: List[np.ndarray]) -> List[List[Dict]]:
+        """OCR pages in batches of batch_size, in parallel across the OCR worker processes if there are any"""
+        batches = [pages[offset : offset + self.batch_size] for offset in range(0, len(pages), self.batch_size)]
+        read_batch = self.ocr_pool.read if self.ocr_pool is not None else extract_words_batch
+
+        def read(batch):
+            if settings_manager.get_setting("ocr_cache_enabled", True):
+                return ocr_cache.read_through(batch, read_batch, self.ocr_backend)
+            return read_batch(batch)
+
+        if self.ocr_pool is None:
+            results = [read(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.ocr_pool.workers) as executor:
+                results = list(executor.map(read, batches))
+        return [words for batch_words in results for words in batch_words]
+
+    def _ocr(self, records: List[Dict[str, Any]]):
+        """Read the text of new frames and release their pixels"""
+        prepared = [preprocess_for_ocr(record["image"], self.ocr_profile) for record in records]
+        pages = self._read_pages([page for page, _ in prepared])
+        for record, (_, transform), words in zip(records, prepared, pages):
+            words = restore_word_boxes(words, transform)
+            record["height"], record["width"] = record.pop("image").shape[:2]
+            record["words"] = words
+            record["extracted_text"], record["text_offsets"] = words_to_text_with_offsets(words)
+            record["confidence"] = words_confidence(words)
+        self.progress["pages"] += len(records)
+
+    def _import_chunk(self, records: List[Dict[str, Any]]):
+        """Deduplicate, OCR and store one chunk of decoded files in a single transaction"""
+        with next(get_db()) as db:
+            # One record per distinct image is read with OCR: a new frame, or one reusing a similar frame's blob
+            readers: Dict[str, Dict[str, Any]] = {}
+            new_frames: Dict[str, Dict[str, Any]] = {}
+            sightings = []
+            for record in records:
+                content_hash = record["content_hash"]
+                if content_hash in readers:
+                    record["reader"] = readers[content_hash]
+                else:
+                    existing, exact = self.frame_store.find(db, content_hash, record["perceptual_hash"])
+                    if existing is not None:
+                        record["frame"] = existing
+                    # A frame first stored under a skip_ocr rule has no text yet, so this file is read for it
+                    if exact and not existing.ocr_skipped:
+                        record.pop("image")
+                    else:
+                        readers[content_hash] = record
+                        record["reader"] = record
+                        if existing is None:
+                            new_frames[content_hash] = record
+                sightings.append(record)
+
+            self._ocr(list(readers.values()))
+
+            frames = {}
+            for content_hash, record in new_frames.items():
+                file_path = self.frame_store.blob_path(content_hash, record["extension"])
+                self.frame_store.write_blob(file_path, record["data"])
+                frames[content_hash] = Frame(
+                    content_hash=content_hash,
+                    perceptual_hash=record["perceptual_hash"],
+                    file_path=file_path,
+                    width=record["width"],
+                    height=record["height"],
+                    file_size=len(record["data"]),
+                    extracted_text=record["extracted_text"],
+                    confidence_score=float(record["confidence"]),
+                )
+            db.add_all(frames.values())
+            db.flush()
+
+            # Frames that were never read take the text of their first imported sighting
+            filled = {}
+            for content_hash, record in readers.items():
+                frame = record.get("frame")
+                if frame is not None and frame.content_hash == content_hash and frame.ocr_skipped:
+                    frame.extracted_text = record["extracted_text"]
+                    frame.confidence_score = float(record["confidence"])
+                    frame.ocr_skipped = False
+                    filled[content_hash] = frame
+
+            if settings_manager.get_setting("store_word_geometry", True):
+                max_words = settings_manager.get_setting("word_geometry_max_words", 5000)
+                for content_hash, record in readers.items():
+                    frame = frames.get(content_hash) or filled.get(content_hash)
+                    if frame is None or not record["words"]:
+                        continue
+                    data, word_count, truncated = pack_words(
+                        record["words"], record["text_offsets"], record["width"], record["height"], max_words
+                    )
+                    db.add(
+                        FrameWords(
+                            frame_id=frame.id,
+                            word_count=word_count,
+                            truncated=truncated,
+                            byte_size=len(data),
+                            data=data,
+                        )
+                    )
+
+            rows = []
+            for record in sightings:
+                reader = record.get("reader")
+                if reader is None:
+                    frame = record["frame"]
+                    text, confidence = frame.extracted_text, frame.confidence_score
+                else:
+                    frame = reader["frame"] if "frame" in reader else frames[reader["content_hash"]]
+                    text, confidence = reader["extracted_text"], float(reader["confidence"])
+                # Only the first sighting of a new image wrote a blob; the rest reuse a stored one
+                if reader is record and "frame" not in record:
+                    encode_ms = record["encode_time_ms"]
+                    self.progress["imported"] += 1
+                else:
+                    encode_ms = 0.0
+                    self.progress["duplicates"] += 1
+                rows.append(
+                    {
+                        "frame_id": frame.id,
+                        "file_path": frame.file_path,
+                        "file_size": frame.file_size,
+                        "encode_time_ms": encode_ms,
+                        "timestamp": record["timestamp"],
+                        "app_name": self.app_name,
+                        "window_title": os.path.basename(record["source_path"]),
+                        "extracted_text": text,
+                        "confidence_score": confidence,
+                        "summary": "",
+                    }
+                )
+            # One multi-row insert for the chunk's screenshots, returning their ids for the import records
+            screenshot_ids = db.execute(insert(Screenshot).returning(Screenshot.id, sort_by_parameter_order=True), rows)
+            screenshot_ids = [row[0] for row in screenshot_ids]
+
+            # A changed source file replaces its earlier import record
+            db.query(ImportedFile).filter(
+                ImportedFile.source_path.in_([record["source_path"] for record in sightings])
+            ).delete(synchronize_session=False)
+            db.execute(
+                insert(ImportedFile),
+                [
+                    {
+                        "source_path": record["source_path"],
+                        "file_size": record["source_size"],
+                        "modified_at": record["modified_at"],
+                        "screenshot_id": screenshot_id,
+                        "imported_at": datetime.now(timezone.utc),
+                    }
+                    for record, screenshot_id in zip(sightings, screenshot_ids)
+                ],
+            )
+            db.commit()
+
+            for frame in [*frames.values(), *filled.values()]:
+                self.frame_store.remember(frame.id, frame.perceptual_hash)
+
+    def _pending(self, paths: List[str]) -> List[str]:
+        """Drop the files an earlier import already brought in unchanged"""
+        with next(get_db()) as db:
+            records = imported_file_crud.get_by_paths(db, paths)
+        pending = []
+        for path in paths:
+            record = records.get(path)
+            if record is not None:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if record.file_size == stat.st_size and record.modified_at == stat.st_mtime:
+                    continue
+            pending.append(path)
+        return pending
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return progress counters and throughput"""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        done = self.progress["imported"] + self.progress["duplicates"] + self.progress["failed"]
+        return {
+            **self.progress,
+            "elapsed_s": round(elapsed, 1),
+            "files_per_second": round(done / elapsed, 2) if elapsed else 0.0,
+            "pages_per_second": round(self.progress["pages"] / elapsed, 2) if elapsed else 0.0,
+            "mb_per_second": round(self.progress["bytes_read"] / elapsed / 1e6, 2) if elapsed else 0.0,
+        }
+
+    def run(self, directory: str) -> Dict[str, Any]:
+        """Import every new or changed image under a directory and return the final status"""
+        self.started_at = time.perf_counter()
+        paths = find_images(directory)
+        self.progress["found"] = len(paths)
+        pending = self._pending(paths)
+        self.progress["skipped"] = len(paths) - len(pending)
+
+        with next(get_db()) as db:
+            self.frame_store.load_recent(db)
+
+        if self.ocr_workers and pending:
+            from .ocr_service import OCRWorkerPool
+
+            self.ocr_pool = OCRWorkerPool(
+                workers=self.ocr_workers,
+                torch_threads=settings_manager.get_setting("ocr_torch_threads", 2),
+                job_timeout=settings_manager.get_setting("ocr_job_timeout", 120),
+            )
+            self.ocr_pool.start()
+
+        load = partial(_load_image, encoding_profile=self.encoding_profile)
+        try:
+            with ProcessPoolExecutor(self.decode_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Keep up to two chunks decoding ahead of the one being imported, without queueing every file
+                in_flight = deque()
+                remaining = iter(pending)
+                records = []
+                while True:
+                    while len(in_flight) < 2 * self.chunk_size:
+                        path = next(remaining, None)
+                        if path is None:
+                            break
+                        in_flight.append(pool.submit(load, path))
+                    if not in_flight:
+                        break
+
+                    record = in_flight.popleft().result()
+                    if record is None:
+                        self.progress["failed"] += 1
+                    else:
+                        self.progress["bytes_read"] += record["source_size"]
+                        records.append(record)
+
+                    if len(records) >= self.chunk_size or (not in_flight and records):
+                        self._import_chunk(records)
+                        records = []
+                        if self.on_progress is not None:
+                            self.on_progress(self.get_status())
+        finally:
+            if self.ocr_pool is not None:
+                self.ocr_pool.stop()
+                self.ocr_pool = None
+        return self.get_status()
@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .settings import BASE_DIR
+
+DEFAULT_JOURNAL_PATH = os.path.join(BASE_DIR, "data", "ingest_journal.jsonl")
+
+# Frame fields written when a frame completes each stage; together they rebuild the frame
+# without its pixels, which are read back from the stored image when OCR has to be redone
+STAGE_FIELDS = {
+    "encoded": (
+        "timestamp",
+        "monitor",
+        "app_name",
+        "window_title",
+        "skip_ocr",
+        "ocr_region",
+        "content_hash",
+        "perceptual_hash",
+        "width",
+        "height",
+        "file_path",
+        "file_size",
+        "encode_time_ms",
+        "duplicate",
+        "reused_blob",
+        "frame_id",
+        "extracted_text",
+        "confidence",
+        "summary",
+    ),
+    "ocr": ("extracted_text", "text_offsets", "confidence", "words"),
+    "summary": ("summary",),
+    "persisted": (),
+    "replayed": (),
+    "abandoned": (),
+}
+
+# Stages after which a frame needs no more work
+FINAL_STAGES = ("persisted", "abandoned")
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class IngestionJournal:
+    """
+    Append-only on-disk log of how far each captured frame got through the pipeline.
+
+    Every stage appends one JSON line with the fields it produced, so after a crash or a
+    shutdown with work still queued, load() folds the log into the frames that were never
+    persisted and the stage they last completed. The log is compacted to just those
+    pending frames on load and whenever `compact_every` lines have been appended since the
+    last compaction, which keeps both the file and replay time bounded.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, fsync: bool = False, compact_every: int = 1000):
+        self.path = path
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._appended_since_compaction = 0
+        self.stats = {"appended": 0, "compactions": 0, "replayed": 0, "abandoned": 0, "corrupt_lines": 0}
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _fold(self, entry_id: str, stage: str, data: Dict[str, Any], at: float, attempts: int = 0):
+        """Apply one log line to the in-memory view of pending frames"""
+        if stage in FINAL_STAGES:
+            self._pending.pop(entry_id, None)
+            return
+        entry = self._pending.setdefault(entry_id, {"stage": None, "data": {}, "created": at, "attempts": 0})
+        entry["data"].update(data)
+        entry["attempts"] = max(entry["attempts"], attempts)
+        if stage == "replayed":
+            entry["attempts"] += 1
+        else:
+            entry["stage"] = stage
+        entry["updated"] = at
+
+    def record(self, frame: Dict[str, Any], stage: str):
+        """Append that a frame completed a stage, with the fields that stage produced"""
+        entry_id = frame.get("journal_id")
+        if entry_id is None:
+            return
+        data = {field: frame[field] for field in STAGE_FIELDS[stage] if field in frame}
+        self.append(entry_id, stage, data)
+
+    def append(self, entry_id: str, stage: str, data: Optional[Dict[str, Any]] = None):
+        """Append one line to the journal"""
+        data = data or {}
+        at = time.time()
+        line = json.dumps({"id": entry_id, "stage": stage, "at": at, "data": data}, default=_to_json)
+        with self._lock:
+            self._open()
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._fold(entry_id, stage, data, at)
+            self.stats["appended"] += 1
+            if stage in ("replayed", "abandoned"):
+                self.stats[stage] += 1
+            self._appended_since_compaction += 1
+            if self._appended_since_compaction >= self.compact_every:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the journal with one line per pending frame; callers hold the lock"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry_id, entry in self._pending.items():
+                line = {
+                    "id": entry_id,
+                    "stage": entry["stage"],
+                    "at": entry["created"],
+                    "attempts": entry["attempts"],
+                    "data": entry["data"],
+                }
+                f.write(json.dumps(line, default=_to_json) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(temp_path, self.path)
+        self._appended_since_compaction = 0
+        self.stats["compactions"] += 1
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Read the journal and compact it
+
+        Returns:
+            list: pending frames, oldest first, each a dict with id, stage (the last one
+            completed), data (the frame fields logged so far), created and attempts
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._pending = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            self._fold(
+                                entry["id"], entry["stage"], entry["data"], entry["at"], entry.get("attempts", 0)
+                            )
+                        except (ValueError, KeyError, TypeError):
+                            # A line cut short by a crash
+                            self.stats["corrupt_lines"] += 1
+            self._compact()
+            pending = [
+                {"id": entry_id, **entry} for entry_id, entry in self._pending.items() if entry["stage"] is not None
+            ]
+        return sorted(pending, key=lambda entry: entry["created"])
+
+    def close(self):
+        """Close the append handle; the journal is reopened by the next append"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return a summary of the oldest frames that have not been persisted yet"""
+        with self._lock:
+            entries = sorted(self._pending.items(), key=lambda item: item[1]["created"])[:limit]
+            return [
+                {
+                    "id": entry_id,
+                    "stage": entry["stage"],
+                    "attempts": entry["attempts"],
+                    "timestamp": entry["data"].get("timestamp"),
+                    "app_name": entry["data"].get("app_name"),
+                    "file_path": entry["data"].get("file_path"),
+                    "age_s": round(time.time() - entry["created"], 1),
+                }
+                for entry_id, entry in entries
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pending frames per stage and journal counters"""
+        with self._lock:
+            by_stage: Dict[str, int] = {}
+            for entry in self._pending.values():
+                by_stage[entry["stage"]] = by_stage.get(entry["stage"], 0) + 1
+            oldest = min((entry["created"] for entry in self._pending.values()), default=None)
+            return {
+                **self.stats,
+                "pending": len(self._pending),
+                "pending_by_stage": by_stage,
+                "oldest_pending_age_s": round(time.time() - oldest, 1) if oldest is not None else None,
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
+
+
+# Global ingestion journal
+ingestion_journal = IngestionJournal()
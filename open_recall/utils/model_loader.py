@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .settings import settings_manager
+
+# Load states reported for each model
+MODEL_STATES = ("pending", "loading", "ready", "failed")
+
+
+def _load_ocr():
+    from .ocr_utils import get_ocr_processor
+
+    get_ocr_processor()
+
+
+def _load_summarizer():
+    from .summarization import get_summarizer
+
+    if not get_summarizer():
+        raise RuntimeError("Summarization model could not be loaded")
+
+
+def _load_embedder():
+    from .embeddings import get_embedder
+
+    get_embedder()
+
+
+class ModelWarmup:
+    """
+    Loads heavy models off the request path and reports their readiness.
+
+    Models are registered with a loader function. warm_up_in_background() loads them
+    one after another on a daemon thread, so the server can bind and answer requests
+    while torch, doctr and transformers are still being imported. Code that needs a
+    model before it is warm simply loads it itself; the loaders are idempotent.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register a model loader under a name"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._status.setdefault(name, {"state": "pending", "error": None, "load_time_s": None, "loaded_at": None})
+
+    def _set_status(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def load(self, name: str) -> bool:
+        """Load one registered model now, recording its state; returns True when it is ready"""
+        self._set_status(name, state="loading", error=None)
+        started = time.perf_counter()
+        try:
+            self._loaders[name]()
+        except Exception as e:
+            print(f"Error loading model '{name}': {e}")
+            self._set_status(name, state="failed", error=str(e))
+            return False
+        self._set_status(
+            name,
+            state="ready",
+            load_time_s=round(time.perf_counter() - started, 2),
+            loaded_at=datetime.now(timezone.utc).isoformat(),
+        )
+        return True
+
+    def warm_up_in_background(self, names: Optional[List[str]] = None, delay: float = 0.0):
+        """Load models on a daemon thread after `delay` seconds; does nothing if a warm-up is running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        names = list(self._loaders) if names is None else names
+
+        def run():
+            # Give the server a moment to bind before imports start competing for the GIL
+            time.sleep(delay)
+            for name in names:
+                self.load(name)
+
+        self._thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def is_ready(self, name: str) -> bool:
+        """Check if a model has finished loading"""
+        with self._lock:
+            return self._status.get(name, {}).get("state") == "ready"
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Return the load state of every registered model"""
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+
+def models_to_warm_up() -> List[str]:
+    """Models the current settings will need in this process"""
+    names = []
+    # In process mode the OCR workers load their own predictor
+    if settings_manager.get_setting("ocr_mode", "thread") != "process":
+        names.append("ocr")
+    if settings_manager.get_setting("enable_summarization", False):
+        names.append("summarization")
+    if settings_manager.get_setting("semantic_search_enabled", False):
+        names.append("embeddings")
+    return names
+
+
+# Global model warm-up registry
+model_warmup = ModelWarmup()
+model_warmup.register("ocr", _load_ocr)
+model_warmup.register("summarization", _load_summarizer)
+model_warmup.register("embeddings", _load_embedder)
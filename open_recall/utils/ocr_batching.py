@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+
+class OCRBatcher:
+    """
+    Groups OCR requests from several threads into one predictor call.
+
+    Callers submit a list of pages and get a Future for their words. A dispatcher
+    thread collects pending requests until `max_batch_size` pages are waiting or the
+    oldest request has waited `max_wait_ms`, runs `read_batch` once over all of their
+    pages, and hands every caller back the slice that belongs to it. With `concurrency`
+    above 1, that many batches can be in flight at once, e.g. one per OCR worker process.
+    """
+
+    def __init__(
+        self,
+        read_batch: Callable[[List[np.ndarray]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 50.0,
+        concurrency: int = 1,
+    ):
+        self.read_batch = read_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.concurrency = max(1, int(concurrency))
+
+        self._requests: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {"batches": 0, "requests": 0, "pages": 0, "failed_batches": 0, "total_time": 0.0}
+
+    def start(self):
+        """Start the dispatcher threads"""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"ocr-batcher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the dispatchers once the requests already queued have been read"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, pages: List[np.ndarray]) -> Future:
+        """Queue pages for OCR and return a Future with one result per page"""
+        future = Future()
+        if not pages:
+            future.set_result([])
+            return future
+        if not self._threads:
+            raise RuntimeError("OCR batcher is not running")
+        self._requests.put((list(pages), future))
+        return future
+
+    def read(self, pages: List[np.ndarray]) -> List[Any]:
+        """Queue pages for OCR and wait for their results; usable wherever read_batch is"""
+        return self.submit(pages).result()
+
+    def _collect(self) -> List:
+        """Block for the first request, then gather more until the batch is full or the budget is spent"""
+        try:
+            batch = [self._requests.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        pages = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while pages < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            pages += len(request[0])
+        return batch
+
+    def _run(self):
+        while not (self._stop_event.is_set() and self._requests.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+
+            pages = [page for request_pages, _ in batch for page in request_pages]
+            started = time.perf_counter()
+            try:
+                results = self.read_batch(pages)
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats["failed_batches"] += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            # Fan the results back out in submission order
+            offset = 0
+            for request_pages, future in batch:
+                future.set_result(results[offset : offset + len(request_pages)])
+                offset += len(request_pages)
+
+            with self._stats_lock:
+                self.stats["batches"] += 1
+                self.stats["requests"] += len(batch)
+                self.stats["pages"] += len(pages)
+                self.stats["total_time"] += time.perf_counter() - started
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return batch sizes and OCR throughput"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        total_time = stats.pop("total_time")
+        batches = stats["batches"]
+        stats.update(
+            {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "concurrency": self.concurrency,
+                "queued_requests": self._requests.qsize(),
+                "avg_pages_per_batch": round(stats["pages"] / batches, 2) if batches else 0.0,
+                "avg_batch_time_ms": round(total_time / batches * 1000, 2) if batches else 0.0,
+                "pages_per_second": round(stats["pages"] / total_time, 2) if total_time else 0.0,
+            }
+        )
+        return stats
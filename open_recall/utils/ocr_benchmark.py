@@ -0,0 +1,185 @@
+import difflib
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .ocr_preprocessing import DEFAULT_OCR_PROFILE, OCR_PROFILES, preprocess_for_ocr
+from .ocr_utils import create_ocr_processor, words_confidence, words_to_text
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+
+def load_image_set(directory: str, limit: Optional[int] = None) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    """
+    Load a fixed, sorted set of benchmark images
+
+    An image may have a ground-truth transcription next to it with the same name and a
+    .txt extension (e.g. editor.png and editor.txt).
+
+    Returns:
+        list: (file name, RGB array, ground truth text or None) for each image
+    """
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+    if limit:
+        names = names[:limit]
+
+    images = []
+    for name in names:
+        with Image.open(os.path.join(directory, name)) as img:
+            array = np.asarray(img.convert("RGB"))
+        truth_path = os.path.join(directory, os.path.splitext(name)[0] + ".txt")
+        truth = None
+        if os.path.exists(truth_path):
+            with open(truth_path, "r", encoding="utf-8") as f:
+                truth = f.read()
+        images.append((name, array, truth))
+    return images
+
+
+def text_similarity(text: str, reference: str) -> float:
+    """Similarity of two texts from 0 to 1, ignoring differences in whitespace"""
+    return difflib.SequenceMatcher(None, " ".join(text.split()), " ".join(reference.split()), autojunk=False).ratio()
+
+
+def benchmark_backend(
+    backend: str,
+    images: List[np.ndarray],
+    batch_size: int = 8,
+    threads: Optional[int] = None,
+    repeat: int = 3,
+    profiles: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Load one OCR backend and time it over the images, once per preprocessing profile
+
+    For each profile the first pass over the images is a warm-up and is not timed; its
+    output is kept for the accuracy comparison. Profiles that crop to the active window
+    read the whole image here, as there is no window to crop to.
+    """
+    started = time.perf_counter()
+    processor = create_ocr_processor(backend, det_batch_size=batch_size, threads=threads)
+    load_time = time.perf_counter() - started
+
+    results = []
+    for profile in profiles or [DEFAULT_OCR_PROFILE]:
+        started = time.perf_counter()
+        prepared = [preprocess_for_ocr(image, OCR_PROFILES[profile]) for image in images]
+        preprocess_time = time.perf_counter() - started
+        pages = [page for page, _ in prepared]
+
+        def run_once() -> List[List[Dict]]:
+            read = []
+            for offset in range(0, len(pages), batch_size):
+                read.extend(processor.extract_words_batch(pages[offset : offset + batch_size]))
+            return read
+
+        words = run_once()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run_once()
+            timings.append(time.perf_counter() - started)
+
+        total = sum(timings)
+        results.append(
+            {
+                "backend": backend,
+                "profile": profile,
+                "load_time_s": round(load_time, 2),
+                "preprocess_ms_per_page": round(preprocess_time / len(images) * 1000, 1) if images else 0.0,
+                "pages_per_second": round(len(images) * repeat / total, 2) if total else 0.0,
+                "ms_per_page": round(total / (len(images) * repeat) * 1000, 1) if images and repeat else 0.0,
+                "mean_confidence": (
+                    round(float(np.mean([words_confidence(page_words) for page_words in words])), 4) if words else 0.0
+                ),
+                "texts": [words_to_text(page_words) for page_words in words],
+            }
+        )
+    return results
+
+
+def run_benchmark(
+    directory: str,
+    backends: List[str],
+    batch_size: int = 8,
+    threads: Optional[int] = None,
+    repeat: int = 3,
+    limit: Optional[int] = None,
+    profiles: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Compare OCR backends and preprocessing profiles for throughput and accuracy over an image directory
+
+    Accuracy is measured against the ground-truth .txt files when every image has one,
+    otherwise against the output of the first backend and profile.
+    """
+    profiles = profiles or [DEFAULT_OCR_PROFILE]
+    unknown = [profile for profile in profiles if profile not in OCR_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown OCR profiles: {', '.join(unknown)}")
+
+    image_set = load_image_set(directory, limit)
+    if not image_set:
+        raise ValueError(f"No images found in {directory}")
+    names = [name for name, _, _ in image_set]
+    images = [array for _, array, _ in image_set]
+    truths = [truth for _, _, truth in image_set]
+
+    results = []
+    for backend in backends:
+        print(f"Benchmarking OCR backend '{backend}' on {len(images)} images...")
+        try:
+            results.extend(benchmark_backend(backend, images, batch_size, threads, repeat, profiles))
+        except Exception as e:
+            print(f"Backend '{backend}' failed: {e}")
+            results.append({"backend": backend, "error": str(e)})
+
+    if all(truth is not None for truth in truths):
+        reference_name, references = "ground_truth", truths
+    else:
+        first = next((result for result in results if "texts" in result), None)
+        reference_name, references = (
+            (f"{first['backend']}/{first['profile']}", first["texts"]) if first else (None, None)
+        )
+
+    for result in results:
+        if "texts" not in result or references is None:
+            continue
+        similarities = [text_similarity(text, reference) for text, reference in zip(result["texts"], references)]
+        result["similarity"] = round(float(np.mean(similarities)), 4)
+        result["per_image_similarity"] = dict(zip(names, (round(value, 4) for value in similarities)))
+
+    return {
+        "images": len(images),
+        "batch_size": batch_size,
+        "threads": threads,
+        "repeat": repeat,
+        "profiles": profiles,
+        "reference": reference_name,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render benchmark results as a plain-text table"""
+    lines = [
+        f"{report['images']} images, batch size {report['batch_size']}, threads {report['threads'] or 'default'}, "
+        f"{report['repeat']} timed passes; similarity against {report['reference']}",
+        f"{'backend':<12}{'profile':<10}{'load s':>8}{'prep ms':>9}{'pages/s':>10}{'ms/page':>10}"
+        f"{'confidence':>12}{'similarity':>12}",
+    ]
+    for result in report["results"]:
+        if "error" in result:
+            lines.append(f"{result['backend']:<12}  failed: {result['error']}")
+            continue
+        similarity = result.get("similarity")
+        lines.append(
+            f"{result['backend']:<12}{result['profile']:<10}{result['load_time_s']:>8}"
+            f"{result['preprocess_ms_per_page']:>9}{result['pages_per_second']:>10}"
+            f"{result['ms_per_page']:>10}{result['mean_confidence']:>12}"
+            f"{similarity if similarity is not None else '-':>12}"
+        )
+    return "\n".join(lines)
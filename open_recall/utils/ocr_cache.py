@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .settings import BASE_DIR
+
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, "data", "ocr_cache.db")
+
+
+class OCRCache:
+    """
+    Persistent LRU cache from an image fingerprint to the words OCR read from it.
+
+    Keys are a hash of the exact pixels and shape of a page (a whole frame or a tile crop)
+    together with the OCR backend, so an identical page is never read twice, including
+    across restarts. Entries live in their own SQLite file, apart from the archive, and
+    the least recently used ones are evicted once the stored words exceed `max_bytes`.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._entries = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache file on first use; callers hold the lock"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache "
+                "(key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_used REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_used ON ocr_cache (last_used)")
+            conn.commit()
+            self._entries, self._total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache"
+            ).fetchone()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def fingerprint(image: np.ndarray, backend: str) -> str:
+        """Key of a page: its backend, shape and exact pixels"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{backend}:{image.shape}:{image.dtype}".encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[Dict]]:
+        """Return the cached words of the keys that are present and mark them as recently used"""
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(f"SELECT key, data FROM ocr_cache WHERE key IN ({placeholders})", keys).fetchall()
+            if rows:
+                conn.execute(
+                    f"UPDATE ocr_cache SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                    [time.time(), *(key for key, _ in rows)],
+                )
+                conn.commit()
+            self.stats["hits"] += len(rows)
+            self.stats["misses"] += len(set(keys)) - len(rows)
+        return {key: json.loads(zlib.decompress(data)) for key, data in rows}
+
+    def put_many(self, entries: Dict[str, List[Dict]]):
+        """Store the words of several pages, evicting least recently used entries beyond max_bytes"""
+        if not entries:
+            return
+        now = time.time()
+        rows = []
+        for key, words in entries.items():
+            data = zlib.compress(json.dumps(words, separators=(",", ":")).encode(), 1)
+            rows.append((key, len(data), now, data))
+
+        with self._lock:
+            conn = self._connect()
+            for key, size, last_used, data in rows:
+                previous = conn.execute("SELECT size FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?)", (key, size, last_used, data))
+                if previous:
+                    self._total_bytes -= previous[0]
+                else:
+                    self._entries += 1
+                self._total_bytes += size
+            self.stats["stores"] += len(rows)
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        while self._total_bytes > target:
+            victims = conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_used LIMIT 256").fetchall()
+            if not victims:
+                break
+            for key, size in victims:
+                if self._total_bytes <= target:
+                    break
+                conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self._entries -= 1
+                self.stats["evictions"] += 1
+
+    def read_through(
+        self, pages: List[np.ndarray], read_batch: Callable[[List[np.ndarray]], List[List[Dict]]], backend: str
+    ) -> List[List[Dict]]:
+        """
+        Read pages with OCR, answering the ones seen before from the cache
+
+        Only the pages that miss are passed to `read_batch`, in one call; identical pages
+        within the call are read once.
+        """
+        if not pages:
+            return []
+        keys = [self.fingerprint(page, backend) for page in pages]
+        found = self.get_many(keys)
+
+        missing: Dict[str, np.ndarray] = {}
+        for key, page in zip(keys, pages):
+            if key not in found:
+                missing.setdefault(key, page)
+        if missing:
+            read = dict(zip(missing, read_batch(list(missing.values()))))
+            self.put_many(read)
+            found.update(read)
+        return [found[key] for key in keys]
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM ocr_cache")
+            conn.commit()
+            self._entries, self._total_bytes = 0, 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the size of the cache"""
+        with self._lock:
+            self._connect()
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": self._entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global OCR result cache
+ocr_cache = OCRCache()
@@ -0,0 +1,156 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Region = Tuple[int, int, int, int]
+
+# Named trade-offs between OCR time and how much of the screen is read at full detail
+OCR_PROFILES: Dict[str, Dict] = {
+    "accurate": {
+        "max_side": None,
+        "interpolation": None,
+        "crop_to_window": False,
+        "grayscale": False,
+        "description": "Full-resolution RGB frame; reads everything on screen",
+    },
+    "balanced": {
+        "max_side": 2560,
+        "interpolation": "area",
+        "crop_to_window": False,
+        "grayscale": False,
+        "description": "Whole frame scaled down to at most 2560 px on its longest side",
+    },
+    "fast": {
+        "max_side": 1920,
+        "interpolation": "linear",
+        "crop_to_window": True,
+        "grayscale": True,
+        "description": "Active window only, at most 1920 px, in grayscale; text outside the window is not read",
+    },
+}
+
+DEFAULT_OCR_PROFILE = "accurate"
+
+
+def preprocess_for_ocr(
+    image: np.ndarray, profile: Dict, region: Optional[Region] = None
+) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+    """
+    Prepare a frame for OCR according to a profile
+
+    Args:
+        image: RGB frame
+        profile: entry of OCR_PROFILES
+        region: active window rectangle (x0, y0, x1, y1) in frame pixels, used when the
+            profile crops to the window
+
+    Returns:
+        tuple: (page to read, (x offset, y offset, scale)) where a point on the page maps back
+        to the frame as offset + point / scale
+    """
+    offset_x, offset_y = 0, 0
+    if profile["crop_to_window"] and region is not None:
+        x0, y0, x1, y1 = region
+        image = image[y0:y1, x0:x1]
+        offset_x, offset_y = x0, y0
+
+    height, width = image.shape[:2]
+    scale = 1.0
+    if profile["max_side"] and max(width, height) > profile["max_side"]:
+        scale = profile["max_side"] / max(width, height)
+
+    if scale == 1.0 and not profile["grayscale"]:
+        return image, (offset_x, offset_y, scale)
+
+    # opencv comes with doctr and OnnxTR; it resizes several times faster than Pillow
+    import cv2
+
+    page = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if profile["grayscale"] else image
+    if scale != 1.0:
+        # Area averaging keeps thin strokes legible; linear is faster and coarser
+        interpolation = cv2.INTER_AREA if profile["interpolation"] == "area" else cv2.INTER_LINEAR
+        page = cv2.resize(
+            page, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=interpolation
+        )
+    if profile["grayscale"]:
+        # The detector expects three channels, so the luminance is repeated
+        page = cv2.cvtColor(page, cv2.COLOR_GRAY2RGB)
+    return page, (offset_x, offset_y, scale)
+
+
+def restore_word_boxes(words: List[Dict], transform: Tuple[float, float, float]) -> List[Dict]:
+    """Map word boxes read from a preprocessed page back to frame pixels"""
+    offset_x, offset_y, scale = transform
+    if offset_x == 0 and offset_y == 0 and scale == 1.0:
+        return words
+    restored = []
+    for word in words:
+        x0, y0, x1, y1 = word["box"]
+        restored.append(
+            {
+                **word,
+                "box": (offset_x + x0 / scale, offset_y + y0 / scale, offset_x + x1 / scale, offset_y + y1 / scale),
+            }
+        )
+    return restored
+
+
+def clip_region(window: Optional[Region], monitor: Dict) -> Optional[Region]:
+    """
+    Convert a window rectangle in desktop coordinates to pixels of a monitor's frame
+
+    Returns None when the window does not overlap the monitor.
+    """
+    if window is None:
+        return None
+    left, top = monitor["left"], monitor["top"]
+    x0 = max(window[0], left) - left
+    y0 = max(window[1], top) - top
+    x1 = min(window[2], left + monitor["width"]) - left
+    y1 = min(window[3], top + monitor["height"]) - top
+    if x1 - x0 < 8 or y1 - y0 < 8:
+        return None
+    return (x0, y0, x1, y1)
+
+
+class OCRProfileStats:
+    """Running timing and confidence totals for each OCR profile, to compare them on real captures"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def record(self, profile: str, preprocess_ms: float, ocr_ms: float, confidence: float, pixels: int, cropped: bool):
+        """Record one frame read with a profile"""
+        with self._lock:
+            totals = self._totals.setdefault(
+                profile,
+                {"frames": 0, "cropped": 0, "preprocess_ms": 0.0, "ocr_ms": 0.0, "confidence": 0.0, "pixels": 0},
+            )
+            totals["frames"] += 1
+            totals["cropped"] += int(cropped)
+            totals["preprocess_ms"] += preprocess_ms
+            totals["ocr_ms"] += ocr_ms
+            totals["confidence"] += confidence
+            totals["pixels"] += pixels
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-profile averages"""
+        with self._lock:
+            stats = {}
+            for profile, totals in self._totals.items():
+                frames = totals["frames"]
+                stats[profile] = {
+                    "frames": frames,
+                    "cropped_frames": totals["cropped"],
+                    "avg_preprocess_ms": round(totals["preprocess_ms"] / frames, 2),
+                    "avg_ocr_ms": round(totals["ocr_ms"] / frames, 2),
+                    "mean_confidence": round(totals["confidence"] / frames, 4),
+                    "avg_megapixels": round(totals["pixels"] / frames / 1e6, 2),
+                }
+            return stats
+
+
+# Global per-profile OCR statistics
+ocr_profile_stats = OCRProfileStats()
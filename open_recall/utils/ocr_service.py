@@ -0,0 +1,285 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _worker_main(index: int, task_queue, result_queue, torch_threads: int, current_job, job_started):
+    """Entry point of an OCR worker process: load the predictor once, then serve jobs until told to stop"""
+    # Thread pools are sized when torch is first imported, so the limits go in before that
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(torch_threads)
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        # The ONNX backend runs without torch; its session threads come from get_ocr_processor below
+        pass
+
+    from .ocr_utils import get_ocr_processor
+
+    ocr_processor = get_ocr_processor(threads=torch_threads)
+    result_queue.put(("ready", index, os.getpid()))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        job_id, shm_name, layout = task
+        # Shared values rather than a queue message: they are visible even if this process dies mid-job
+        job_started.value = time.time()
+        current_job.value = job_id
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            error = None
+            try:
+                # Views straight into the parent's buffer; nothing is copied or unpickled
+                pages = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset) for shape, offset in layout]
+                words = ocr_processor.extract_words_batch(pages)
+            except Exception as e:
+                # Keep only the message: the traceback's frames can still hold views into the buffer
+                error = f"{type(e).__name__}: {e}"
+            # The buffer cannot be closed while any view into it exists
+            pages = None
+            shm.close()
+            if error is None:
+                result_queue.put(("done", index, job_id, words))
+            else:
+                result_queue.put(("error", index, job_id, error))
+        except Exception as e:
+            result_queue.put(("error", index, job_id, f"{type(e).__name__}: {e}"))
+        current_job.value = -1
+
+
+class OCRWorkerPool:
+    """
+    Runs OCR in separate worker processes so it does not compete with the server for the GIL.
+
+    Each worker loads the configured OCR backend once and limits its runtime to
+    `torch_threads` intra-op threads. Pages are copied once into a shared-memory block
+    and workers read them in place; only the small word results travel back through a
+    queue. A monitor thread restarts workers that die and kills workers whose job
+    exceeds `job_timeout`, failing the job they were running.
+    """
+
+    def __init__(self, workers: int = 2, torch_threads: int = 2, job_timeout: float = 120.0):
+        self.workers = max(1, int(workers))
+        self.torch_threads = max(1, int(torch_threads))
+        self.job_timeout = job_timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queue = None
+        self._result_queue = None
+        self._processes: List[Optional[Any]] = []
+        self._worker_state: List[Dict[str, Any]] = []
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {"jobs": 0, "pages": 0, "failed": 0, "restarts": 0, "timeouts": 0}
+
+    def _spawn(self, index: int):
+        current_job = self._context.Value("q", -1, lock=False)
+        job_started = self._context.Value("d", 0.0, lock=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._task_queue, self._result_queue, self.torch_threads, current_job, job_started),
+            name=f"ocr-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+        self._worker_state[index] = {
+            "pid": process.pid,
+            "ready": False,
+            "jobs": self._worker_state[index].get("jobs", 0),
+            "current_job": current_job,
+            "job_started": job_started,
+        }
+
+    def _current_job(self, index: int):
+        """Return (job id, seconds running) of the job a worker is on, or (None, None) if it is idle"""
+        state = self._worker_state[index]
+        job_id = state["current_job"].value
+        if job_id < 0:
+            return None, None
+        return job_id, time.time() - state["job_started"].value
+
+    def start(self):
+        """Start the worker processes and the threads that collect results and watch worker health"""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        self._processes = [None] * self.workers
+        self._worker_state = [{} for _ in range(self.workers)]
+        with self._lock:
+            for index in range(self.workers):
+                self._spawn(index)
+
+        for target, name in ((self._collect_results, "ocr-pool-results"), (self._monitor, "ocr-pool-monitor")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        """Ask workers to exit, kill the ones that do not, and fail any unfinished jobs"""
+        if not self._threads:
+            return
+        self._stop_event.set()
+        for _ in self._processes:
+            self._task_queue.put(None)
+
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(timeout=max(0.1, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1)
+
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+        with self._lock:
+            jobs, self._jobs = self._jobs, {}
+        for job in jobs.values():
+            if not job["future"].done():
+                job["future"].set_exception(RuntimeError("OCR worker pool stopped"))
+
+    def read(self, pages: List[np.ndarray]) -> List[List[Dict]]:
+        """Run OCR over pages in a worker process; same contract as OCRProcessor.extract_words_batch"""
+        if not pages:
+            return []
+        if not self._threads:
+            raise RuntimeError("OCR worker pool is not running")
+
+        pages = [np.ascontiguousarray(page, dtype=np.uint8) for page in pages]
+        layout, offset = [], 0
+        for page in pages:
+            layout.append((page.shape, offset))
+            offset += page.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+        try:
+            for page, (shape, page_offset) in zip(pages, layout):
+                np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=page_offset)[...] = page
+
+            future = Future()
+            job_id = next(self._job_ids)
+            with self._lock:
+                self._jobs[job_id] = {"future": future, "pages": len(pages), "submitted": time.monotonic()}
+            self._task_queue.put((job_id, shm.name, layout))
+            return future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _finish(self, job_id: int, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            if error is None:
+                self.stats["jobs"] += 1
+                self.stats["pages"] += job["pages"]
+            else:
+                self.stats["failed"] += 1
+        if error is None:
+            job["future"].set_result(result)
+        else:
+            job["future"].set_exception(RuntimeError(error))
+
+    def _collect_results(self):
+        while not self._stop_event.is_set():
+            try:
+                message = self._result_queue.get(timeout=0.5)
+            except (queue.Empty, OSError, EOFError):
+                continue
+
+            kind, index = message[0], message[1]
+            with self._lock:
+                state = self._worker_state[index]
+                if kind == "ready":
+                    # A restarted worker reports in under a new pid
+                    if state.get("pid") == message[2]:
+                        state["ready"] = True
+                    continue
+                state["jobs"] += 1
+
+            if kind == "done":
+                self._finish(message[2], result=message[3])
+            elif kind == "error":
+                print(f"OCR worker {index} failed a job: {message[3]}")
+                self._finish(message[2], error=message[3])
+
+    def _monitor(self):
+        while not self._stop_event.wait(1.0):
+            for index, process in enumerate(self._processes):
+                with self._lock:
+                    job_id, running_for = self._current_job(index)
+
+                if process.is_alive():
+                    if job_id is None or self.job_timeout is None or running_for < self.job_timeout:
+                        continue
+                    print(f"OCR worker {index} exceeded the {self.job_timeout}s job timeout, restarting it")
+                    process.terminate()
+                    process.join(timeout=5)
+                    with self._lock:
+                        self.stats["timeouts"] += 1
+                    reason = "OCR job timed out"
+                else:
+                    print(f"OCR worker {index} exited with code {process.exitcode}, restarting it")
+                    reason = f"OCR worker exited with code {process.exitcode}"
+
+                if job_id is not None:
+                    self._finish(job_id, error=reason)
+                if self._stop_event.is_set():
+                    return
+                with self._lock:
+                    self.stats["restarts"] += 1
+                    self._spawn(index)
+
+            # Results can be lost if a worker dies right after finishing, so no job may wait forever
+            if self.job_timeout is not None:
+                with self._lock:
+                    now = time.monotonic()
+                    stale = [
+                        job_id for job_id, job in self._jobs.items() if now - job["submitted"] > 2 * self.job_timeout
+                    ]
+                for job_id in stale:
+                    self._finish(job_id, error="OCR job was not answered in time")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-worker health and job counters"""
+        with self._lock:
+            workers = []
+            for index, (process, state) in enumerate(zip(self._processes, self._worker_state)):
+                _, running_for = self._current_job(index) if state else (None, None)
+                workers.append(
+                    {
+                        "index": index,
+                        "pid": state.get("pid"),
+                        "alive": process.is_alive() if process is not None else False,
+                        "ready": state.get("ready", False),
+                        "jobs": state.get("jobs", 0),
+                        "busy_seconds": round(running_for, 1) if running_for is not None else None,
+                    }
+                )
+            return {
+                **self.stats,
+                "torch_threads": self.torch_threads,
+                "pending_jobs": len(self._jobs),
+                "workers": workers,
+            }
@@ -1,15 +1,124 @@
-from typing import Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from doctr.models import ocr_predictor
+
+from .settings import settings_manager
+
+
+def words_to_text_with_offsets(words: List[Dict]) -> Tuple[str, List[int]]:
+    """
+    Join OCR words into text, one line per OCR line and a blank line between blocks
+
+    Args:
+        words: word dicts in reading order, as returned by OCRProcessor.extract_words
+
+    Returns:
+        tuple: (the extracted text, the offset in that text where each word starts)
+    """
+    parts, offsets = [], []
+    position = 0
+    previous = None
+    for word in words:
+        if previous is not None:
+            if word["block"] != previous[0]:
+                separator = "\n\n"
+            elif word["line"] != previous[1]:
+                separator = "\n"
+            else:
+                separator = " "
+            parts.append(separator)
+            position += len(separator)
+        offsets.append(position)
+        parts.append(word["value"])
+        position += len(word["value"])
+        previous = (word["block"], word["line"])
+
+    text = "".join(parts)
+    stripped = text.lstrip()
+    shift = len(text) - len(stripped)
+    return stripped.rstrip(), [max(0, offset - shift) for offset in offsets]
+
+
+def words_to_text(words: List[Dict]) -> str:
+    """Join OCR words into text, see words_to_text_with_offsets"""
+    return words_to_text_with_offsets(words)[0]
+
+
+def words_confidence(words: List[Dict]) -> float:
+    """Average word confidence, or 0.0 when there are no words"""
+    if not words:
+        return 0.0
+    return float(np.mean([word["confidence"] for word in words]))
 
 
 class OCRProcessor:
-    def __init__(self):
-        self.model = ocr_predictor(
-            pretrained=True, det_arch="db_mobilenet_v3_large", reco_arch="crnn_mobilenet_v3_large"
+    """OCR with doctr's PyTorch db_mobilenet_v3_large + crnn_mobilenet_v3_large models"""
+
+    backend = "doctr"
+
+    def __init__(self, det_batch_size: int = 8, threads: Optional[int] = None):
+        self.model = self._build_predictor(det_batch_size, threads)
+
+    def _build_predictor(self, det_batch_size: int, threads: Optional[int]):
+        # doctr pulls in torch, so it is imported when the first processor is built rather than with this module
+        import torch
+        from doctr.models import ocr_predictor
+
+        # torch's thread pool is process-wide, so this also applies to summarization
+        if threads:
+            torch.set_num_threads(threads)
+
+        # det_bs is how many pages the detector runs at once; the default of 2 would split every batch
+        return ocr_predictor(
+            pretrained=True,
+            det_arch="db_mobilenet_v3_large",
+            reco_arch="crnn_mobilenet_v3_large",
+            det_bs=det_batch_size,
         )
 
+    def extract_words_batch(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        Run OCR over several images in one predictor call
+
+        Args:
+            images: numpy arrays of the images in RGB format
+
+        Returns:
+            list: for each image, its words in reading order. Each word is a dict with
+            value, confidence, box (x0, y0, x1, y1 in pixels), block and line indexes.
+        """
+        if not images:
+            return []
+
+        result = self.model(list(images))
+
+        pages = []
+        for image, page in zip(images, result.pages):
+            height, width = image.shape[:2]
+            words = []
+            line_index = 0
+            for block_index, block in enumerate(page.blocks):
+                for line in block.lines:
+                    for word in line.words:
+                        (x0, y0), (x1, y1) = word.geometry
+                        words.append(
+                            {
+                                "value": word.value,
+                                "confidence": float(word.confidence),
+                                "box": (x0 * width, y0 * height, x1 * width, y1 * height),
+                                "block": block_index,
+                                "line": line_index,
+                            }
+                        )
+                    line_index += 1
+            pages.append(words)
+        return pages
+
+    def extract_words(self, image: np.ndarray) -> List[Dict]:
+        """Run OCR over a single image and return its words"""
+        return self.extract_words_batch([image])[0]
+
     def process_image(self, image: np.ndarray) -> Tuple[str, float]:
         """
         Process image with OCR and return extracted text and confidence score
@@ -21,37 +130,114 @@ class OCRProcessor:
             tuple: (extracted_text, confidence_score)
         """
         try:
-            # Process image with OCR
-            result = self.model([image])
-
-            text = ""
-            confidence_scores = []
-
-            # Extract text and confidence scores
-            for page in result.pages:
-                for block in page.blocks:
-                    for line in block.lines:
-                        for word in line.words:
-                            text += word.value + " "
-                            confidence_scores.append(word.confidence)
-                        text += "\n"
-                    text += "\n"
-
-            # Calculate average confidence
-            confidence_score = np.mean(confidence_scores) if confidence_scores else 0.0
+            words = self.extract_words(image)
+            text = words_to_text(words)
+            confidence_score = words_confidence(words)
 
             print(f"Extracted text length: {len(text)}")
             print(f"Confidence score: {confidence_score}")
 
-            return text.strip(), float(confidence_score)
+            return text, confidence_score
 
         except Exception as e:
             print(f"OCR processing failed: {e}")
             return "", 0.0
 
 
-# Global OCR processor instance
-ocr_processor = OCRProcessor()
+class ONNXOCRProcessor(OCRProcessor):
+    """
+    OCR with the same detection and recognition architectures exported to ONNX and run by
+    onnxruntime through OnnxTR, optionally with the int8-quantized exports. OnnxTR returns
+    doctr's document structure, so words are extracted exactly as for the doctr backend.
+    """
+
+    backend = "onnx"
+
+    def __init__(self, det_batch_size: int = 8, threads: Optional[int] = None, int8: bool = False):
+        self.int8 = int8
+        super().__init__(det_batch_size, threads)
+
+    def _build_predictor(self, det_batch_size: int, threads: Optional[int]):
+        try:
+            import onnxruntime
+            from onnxtr.models import EngineConfig, ocr_predictor
+        except ImportError as e:
+            raise ImportError("The ONNX OCR backend needs the 'onnx' extra: pip install onnxtr[cpu]") from e
+
+        def engine_config():
+            options = onnxruntime.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+                options.inter_op_num_threads = 1
+            return EngineConfig(providers=["CPUExecutionProvider"], session_options=options)
+
+        return ocr_predictor(
+            det_arch="db_mobilenet_v3_large",
+            reco_arch="crnn_mobilenet_v3_large",
+            det_bs=det_batch_size,
+            load_in_8_bit=self.int8,
+            det_engine_cfg=engine_config(),
+            reco_engine_cfg=engine_config(),
+            clf_engine_cfg=engine_config(),
+        )
+
+
+# Selectable OCR backends: name -> (processor class, extra constructor arguments)
+OCR_BACKENDS = {
+    "doctr": (OCRProcessor, {}),
+    "onnx": (ONNXOCRProcessor, {"int8": False}),
+    "onnx_int8": (ONNXOCRProcessor, {"int8": True}),
+}
+
+
+def create_ocr_processor(
+    backend: Optional[str] = None, det_batch_size: Optional[int] = None, threads: Optional[int] = None
+) -> OCRProcessor:
+    """
+    Create an OCR processor for a backend, taking anything not given from settings
+
+    Args:
+        backend: key of OCR_BACKENDS
+        det_batch_size: pages per detection batch
+        threads: intra-op threads for the backend's runtime; None or 0 keeps the runtime default
+
+    Returns:
+        OCRProcessor: the loaded processor
+    """
+    backend = backend or settings_manager.get_setting("ocr_backend", "doctr")
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{backend}', expected one of {', '.join(OCR_BACKENDS)}")
+    if det_batch_size is None:
+        det_batch_size = settings_manager.get_setting("ocr_batch_size", 8)
+    if threads is None:
+        # Threads are configured per runtime, so onnx and onnx_int8 share a value
+        family = OCR_BACKENDS[backend][0].backend
+        threads = (settings_manager.get_setting("ocr_threads", {}) or {}).get(family)
+
+    processor_class, kwargs = OCR_BACKENDS[backend]
+    return processor_class(det_batch_size=det_batch_size, threads=threads, **kwargs)
+
+
+# Global OCR processor instance, built on first use
+ocr_processor: Optional[OCRProcessor] = None
+_ocr_processor_lock = threading.Lock()
+
+
+def get_ocr_processor(threads: Optional[int] = None) -> OCRProcessor:
+    """Get the global OCR processor, loading the configured backend the first time it is needed"""
+    global ocr_processor
+    if ocr_processor is None:
+        with _ocr_processor_lock:
+            if ocr_processor is None:
+                ocr_processor = create_ocr_processor(threads=threads)
+    return ocr_processor
+
+
+def reset_ocr_processor():
+    """Drop the global OCR processor so the next use loads the backend configured in settings"""
+    global ocr_processor
+    with _ocr_processor_lock:
+        ocr_processor = None
 
 
 def process_image_ocr(image: np.ndarray) -> Tuple[str, float]:
@@ -64,4 +250,30 @@ def process_image_ocr(image: np.ndarray) -> Tuple[str, float]:
     Returns:
         tuple: (extracted_text, confidence_score)
     """
-    return ocr_processor.process_image(image)
+    if not settings_manager.get_setting("ocr_cache_enabled", True):
+        return get_ocr_processor().process_image(image)
+
+    # An image read before is answered from the OCR cache without running the predictor
+    from .ocr_cache import ocr_cache
+
+    try:
+        words = ocr_cache.read_through(
+            [image], extract_words_batch, settings_manager.get_setting("ocr_backend", "doctr")
+        )[0]
+    except Exception as e:
+        print(f"OCR processing failed: {e}")
+        return "", 0.0
+    return words_to_text(words), words_confidence(words)
+
+
+def extract_words_batch(images: List[np.ndarray]) -> List[List[Dict]]:
+    """
+    Wrapper function to run OCR over several images and return their words
+
+    Args:
+        images: numpy arrays of the images in RGB format
+
+    Returns:
+        list: the words of each image, see OCRProcessor.extract_words_batch
+    """
+    return get_ocr_processor().extract_words_batch(images)
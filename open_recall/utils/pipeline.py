@@ -0,0 +1,229 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# What a stage does when its input queue is full:
+#   block       - wait for room (propagates backpressure to the previous stage)
+#   drop_newest - discard the incoming item
+#   drop_oldest - discard the oldest queued item to make room for the incoming one
+DROP_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+
+class PipelineStage:
+    """A bounded queue served by a pool of worker threads.
+
+    The handler receives one item and returns the item to forward to the next
+    stage, or None to end processing for that item. With `batch_size` above 1 a
+    worker also takes whatever else is already queued, up to `batch_size` items,
+    and the handler receives that list and returns a list of the same length.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = 8,
+        drop_policy: str = "block",
+        batch_size: int = 1,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.drop_policy = drop_policy
+        self.batch_size = max(1, int(batch_size))
+        self.next_stage: Optional["PipelineStage"] = None
+
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._processed = 0
+        self._dropped = 0
+        self._failed = 0
+        self._busy = 0
+        self._max_depth = 0
+        self._total_time = 0.0
+
+    def put(self, item: Any) -> bool:
+        """Queue an item according to the drop policy, returning False if it was dropped"""
+        with self._stats_lock:
+            self._submitted += 1
+
+        if self.drop_policy == "block":
+            while not self._stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                self._count_drop()
+                return False
+        elif self.drop_policy == "drop_newest":
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self._count_drop()
+                return False
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.queue.task_done()
+                        self._count_drop()
+                    except queue.Empty:
+                        pass
+
+        with self._stats_lock:
+            self._max_depth = max(self._max_depth, self.queue.qsize())
+        return True
+
+    def _count_drop(self):
+        with self._stats_lock:
+            self._dropped += 1
+
+    def _take(self) -> List[Any]:
+        """Wait for one item, then add whatever else is queued, up to the batch size"""
+        try:
+            items = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        while len(items) < self.batch_size:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _worker(self):
+        while not self._stop_event.is_set():
+            items = self._take()
+            if not items:
+                continue
+
+            with self._stats_lock:
+                self._busy += 1
+            started = time.perf_counter()
+            try:
+                results = self.handler(items) if self.batch_size > 1 else [self.handler(items[0])]
+                for result in results:
+                    if result is not None and self.next_stage is not None:
+                        self.next_stage.put(result)
+                with self._stats_lock:
+                    self._processed += len(items)
+            except Exception as e:
+                print(f"Error in pipeline stage '{self.name}': {e}")
+                with self._stats_lock:
+                    self._failed += len(items)
+            finally:
+                with self._stats_lock:
+                    self._busy -= 1
+                    self._total_time += time.perf_counter() - started
+                for _ in items:
+                    self.queue.task_done()
+
+    def start(self):
+        """Start the worker threads"""
+        self._stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"pipeline-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def drain(self, deadline: float) -> bool:
+        """Wait until every queued item has been handled or the deadline passes"""
+        while time.monotonic() < deadline:
+            if self.queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.05)
+        return self.queue.unfinished_tasks == 0
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker threads, abandoning anything still queued"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth and throughput counters for this stage"""
+        with self._stats_lock:
+            processed = self._processed + self._failed
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "drop_policy": self.drop_policy,
+                "batch_size": self.batch_size,
+                "queue_size": self.queue_size,
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "busy_workers": self._busy,
+                "submitted": self._submitted,
+                "processed": self._processed,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "avg_time_ms": round(self._total_time / processed * 1000, 2) if processed else 0.0,
+            }
+
+
+class Pipeline:
+    """A chain of stages where each stage feeds the next one"""
+
+    def __init__(self, stages: List[PipelineStage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+
+        self.stages = stages
+        for current, following in zip(stages, stages[1:]):
+            current.next_stage = following
+        self.is_running = False
+
+    def submit(self, item: Any) -> bool:
+        """Feed an item into the first stage"""
+        if not self.is_running:
+            return False
+        return self.stages[0].put(item)
+
+    def submit_to(self, stage_name: str, item: Any) -> bool:
+        """Feed an item into a named stage, skipping the ones before it"""
+        if not self.is_running:
+            return False
+        for stage in self.stages:
+            if stage.name == stage_name:
+                return stage.put(item)
+        raise ValueError(f"Unknown pipeline stage '{stage_name}'")
+
+    def start(self):
+        """Start all stages"""
+        if self.is_running:
+            return
+        for stage in self.stages:
+            stage.start()
+        self.is_running = True
+
+    def stop(self, timeout: float = 30.0):
+        """Stop accepting items, give queued work up to `timeout` seconds to finish, then stop all stages"""
+        if not self.is_running:
+            return
+        self.is_running = False
+
+        deadline = time.monotonic() + timeout
+        for stage in self.stages:
+            if not stage.drain(deadline):
+                print(f"Warning: pipeline stage '{stage.name}' still had queued work at shutdown")
+            stage.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-stage statistics"""
+        return {"running": self.is_running, "stages": [stage.get_stats() for stage in self.stages]}
@@ -0,0 +1,354 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import and_, or_
+
+from .db_utils import Frame, FrameWords, Screenshot, get_db
+from .ocr_cache import ocr_cache
+from .ocr_utils import extract_words_batch, words_confidence, words_to_text_with_offsets
+from .semantic_search import reembed_screenshots
+from .settings import BASE_DIR, settings_manager
+from .word_geometry import pack_words
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(BASE_DIR, "data", "reprocess_checkpoint.json")
+
+
+def _decode_image(path: str) -> Optional[np.ndarray]:
+    """Decode a stored screenshot into an RGB array; runs in the decode process pool"""
+    try:
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGB"))
+    except Exception as e:
+        print(f"Could not decode {path}: {e}")
+        return None
+
+
+class OCRReprocessJob:
+    """
+    Re-runs OCR over stored screenshots and replaces their text, confidence and word geometry.
+
+    Screenshots are walked in (timestamp, id) order, `chunk_size` at a time. Each chunk's
+    images are decoded in a process pool, read in OCR batches of `batch_size` pages and
+    written back in one transaction, after which the position is saved to the checkpoint
+    file so an interrupted job resumes where it stopped. A frame shared by several
+    screenshots is read once and every screenshot of it is updated. Throttling keeps the
+    job below `max_pages_per_second` and makes it wait while `is_busy()` reports that live
+    capture needs the OCR engine.
+
+    The OCR cache is cleared when the job starts, so live capture stops serving results the
+    job is replacing. With semantic search on, the vectors of every screenshot whose text
+    changed are replaced after each chunk; otherwise the status reports that the index
+    needs a rebuild before it matches the new text.
+    """
+
+    def __init__(
+        self,
+        storage_path: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        only_empty: bool = False,
+        batch_size: int = 8,
+        chunk_size: int = 64,
+        decode_workers: int = 2,
+        max_pages_per_second: Optional[float] = None,
+        checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+        resume: bool = True,
+        read_batch: Callable[[List[np.ndarray]], List[List[Dict]]] = extract_words_batch,
+        is_busy: Optional[Callable[[], bool]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.storage_path = storage_path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.only_empty = only_empty
+        self.batch_size = max(1, int(batch_size))
+        self.chunk_size = max(1, int(chunk_size))
+        self.decode_workers = max(1, int(decode_workers))
+        self.max_pages_per_second = max_pages_per_second
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+        self.read_batch = read_batch
+        self.is_busy = is_busy
+        self.on_progress = on_progress
+
+        self._cancel_event = threading.Event()
+        self._done_frames = set()
+        self._last_page_at = 0.0
+        self.state = "pending"
+        self.error = None
+        self.position = None
+        self.progress = {
+            "total": 0,
+            "screenshots": 0,
+            "pages": 0,
+            "failed": 0,
+            "chunks": 0,
+            "reembedded": 0,
+            "stale_embeddings": 0,
+        }
+        self.started_at = None
+        self.finished_at = None
+
+    def _params(self) -> Dict[str, Any]:
+        return {
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "only_empty": self.only_empty,
+        }
+
+    def _load_checkpoint(self):
+        """Continue after the last committed chunk of a previous run with the same parameters"""
+        if not self.resume or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable reprocess checkpoint: {e}")
+            return
+        if checkpoint.get("params") != self._params() or checkpoint.get("completed"):
+            return
+        self.position = (datetime.fromisoformat(checkpoint["last_timestamp"]), checkpoint["last_id"])
+        self.progress.update(checkpoint.get("progress", {}))
+        print(f"Resuming OCR reprocessing after screenshot {checkpoint['last_id']}")
+
+    def _save_checkpoint(self, completed: bool = False):
+        checkpoint = {
+            "params": self._params(),
+            "last_timestamp": self.position[0].isoformat() if self.position else None,
+            "last_id": self.position[1] if self.position else None,
+            "progress": self.progress,
+            "completed": completed,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+        }
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _filtered(self, query):
+        if self.start_date:
+            query = query.filter(Screenshot.timestamp >= self.start_date)
+        if self.end_date:
+            query = query.filter(Screenshot.timestamp <= self.end_date)
+        if self.only_empty:
+            query = query.filter(or_(Screenshot.extracted_text.is_(None), Screenshot.extracted_text == ""))
+        # Frames stored under a skip_ocr rule show excluded windows, so they are never read
+        return query.filter(~Screenshot.frame.has(Frame.ocr_skipped.is_(True)))
+
+    def _next_chunk(self, db) -> List[Screenshot]:
+        query = self._filtered(db.query(Screenshot))
+        if self.position is not None:
+            timestamp, last_id = self.position
+            query = query.filter(
+                or_(Screenshot.timestamp > timestamp, and_(Screenshot.timestamp == timestamp, Screenshot.id > last_id))
+            )
+        return query.order_by(Screenshot.timestamp, Screenshot.id).limit(self.chunk_size).all()
+
+    def _throttle(self, pages: int):
+        """Wait while live capture is busy, then pace the job to max_pages_per_second"""
+        while self.is_busy is not None and self.is_busy() and not self._cancel_event.is_set():
+            time.sleep(0.5)
+        if self.max_pages_per_second:
+            wait = self._last_page_at + pages / self.max_pages_per_second - time.monotonic()
+            if wait > 0:
+                self._cancel_event.wait(wait)
+        self._last_page_at = time.monotonic()
+
+    def _read(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        results = []
+        for offset in range(0, len(images), self.batch_size):
+            batch = images[offset : offset + self.batch_size]
+            self._throttle(len(batch))
+            results.extend(self.read_batch(batch))
+        return results
+
+    def _write(self, db, screenshot: Screenshot, image: np.ndarray, words: List[Dict]) -> List[tuple]:
+        """
+        Stage the new OCR result of one screenshot (and every other sighting of its frame)
+
+        Returns:
+            list: (id, window title, new text) of every screenshot whose text was replaced
+        """
+        text, offsets = words_to_text_with_offsets(words)
+        confidence = words_confidence(words)
+        values = {Screenshot.extracted_text: text, Screenshot.confidence_score: confidence}
+
+        if screenshot.frame_id is None:
+            db.query(Screenshot).filter(Screenshot.id == screenshot.id).update(values, synchronize_session=False)
+            return [(screenshot.id, screenshot.window_title, text)]
+
+        sightings = db.query(Screenshot.id, Screenshot.window_title).filter(Screenshot.frame_id == screenshot.frame_id)
+        updated = [(screenshot_id, window_title, text) for screenshot_id, window_title in sightings]
+
+        db.query(Frame).filter(Frame.id == screenshot.frame_id).update(
+            {Frame.extracted_text: text, Frame.confidence_score: confidence}, synchronize_session=False
+        )
+        db.query(Screenshot).filter(Screenshot.frame_id == screenshot.frame_id).update(
+            values, synchronize_session=False
+        )
+        db.query(FrameWords).filter(FrameWords.frame_id == screenshot.frame_id).delete(synchronize_session=False)
+        if words and settings_manager.get_setting("store_word_geometry", True):
+            height, width = image.shape[:2]
+            data, word_count, truncated = pack_words(
+                words,
+                offsets,
+                width,
+                height,
+                max_words=settings_manager.get_setting("word_geometry_max_words", 5000),
+            )
+            db.add(
+                FrameWords(
+                    frame_id=screenshot.frame_id,
+                    word_count=word_count,
+                    truncated=truncated,
+                    byte_size=len(data),
+                    data=data,
+                )
+            )
+        return updated
+
+    def _refresh_embeddings(self, updated: List[tuple]):
+        """Replace the vectors of screenshots whose text changed, or count them as stale"""
+        if not updated:
+            return
+        if settings_manager.get_setting("semantic_search_enabled", False):
+            try:
+                reembed_screenshots(updated, batch_size=settings_manager.get_setting("embedding_batch_size", 16))
+                self.progress["reembedded"] += len(updated)
+                return
+            except Exception as e:
+                print(f"Could not re-embed reprocessed screenshots: {e}")
+        self.progress["stale_embeddings"] += len(updated)
+
+    def cancel(self):
+        """Stop after the chunk in progress; the checkpoint lets a later run resume"""
+        self._cancel_event.set()
+
+    def run(self):
+        """Process the whole range, chunk by chunk, until done or cancelled"""
+        self.state = "running"
+        self.started_at = datetime.now(timezone.utc)
+        self._load_checkpoint()
+        try:
+            # Cached OCR results may come from the engine or settings this job is replacing
+            ocr_cache.clear()
+            with next(get_db()) as db:
+                self.progress["total"] = self._filtered(db.query(Screenshot)).count()
+
+            with ProcessPoolExecutor(self.decode_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                while not self._cancel_event.is_set():
+                    with next(get_db()) as db:
+                        chunk = self._next_chunk(db)
+                        if not chunk:
+                            break
+
+                        # Frames already read in this run were written for all of their screenshots
+                        todo = [s for s in chunk if s.frame_id is None or s.frame_id not in self._done_frames]
+                        unique, seen = [], set()
+                        for screenshot in todo:
+                            key = screenshot.frame_id or f"s{screenshot.id}"
+                            if key not in seen:
+                                seen.add(key)
+                                unique.append(screenshot)
+
+                        paths = [os.path.join(self.storage_path, s.file_path or "") for s in unique]
+                        decoded = list(pool.map(_decode_image, paths))
+                        readable = [(s, image) for s, image in zip(unique, decoded) if image is not None]
+                        self.progress["failed"] += len(unique) - len(readable)
+
+                        pages = self._read([image for _, image in readable])
+                        updated = []
+                        for (screenshot, image), words in zip(readable, pages):
+                            updated.extend(self._write(db, screenshot, image, words))
+                            if screenshot.frame_id is not None:
+                                self._done_frames.add(screenshot.frame_id)
+                        db.commit()
+                        self._refresh_embeddings(updated)
+
+                        self.position = (chunk[-1].timestamp, chunk[-1].id)
+                        self.progress["screenshots"] += len(chunk)
+                        self.progress["pages"] += len(readable)
+                        self.progress["chunks"] += 1
+                    self._save_checkpoint()
+                    if self.on_progress is not None:
+                        self.on_progress(self.get_status())
+
+            self.state = "cancelled" if self._cancel_event.is_set() else "completed"
+            self._save_checkpoint(completed=self.state == "completed")
+        except KeyboardInterrupt:
+            # Work up to the last committed chunk is in the checkpoint
+            self.state = "cancelled"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"OCR reprocessing failed: {e}")
+        finally:
+            self.finished_at = datetime.now(timezone.utc)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return the job state, progress and throughput"""
+        elapsed = (
+            ((self.finished_at or datetime.now(timezone.utc)) - self.started_at).total_seconds()
+            if self.started_at
+            else 0
+        )
+        return {
+            "state": self.state,
+            "error": self.error,
+            **self._params(),
+            "progress": dict(self.progress),
+            "last_timestamp": self.position[0].isoformat() if self.position else None,
+            "last_id": self.position[1] if self.position else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "pages_per_second": round(self.progress["pages"] / elapsed, 2) if elapsed else 0.0,
+            # Run the embedding backfill with rebuild so semantic search matches the new text
+            "embedding_rebuild_needed": self.progress["stale_embeddings"] > 0,
+        }
+
+
+class ReprocessManager:
+    """Runs at most one OCR reprocessing job at a time on a background thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.job: Optional[OCRReprocessJob] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, job: OCRReprocessJob) -> bool:
+        """Start a job in the background; returns False if one is already running"""
+        with self._lock:
+            if self.is_running():
+                return False
+            self.job = job
+            self._thread = threading.Thread(target=job.run, name="ocr-reprocess", daemon=True)
+            self._thread.start()
+            return True
+
+    def cancel(self) -> bool:
+        """Ask the running job to stop; returns False if nothing is running"""
+        with self._lock:
+            if not self.is_running():
+                return False
+            self.job.cancel()
+            return True
+
+    def get_status(self) -> Optional[Dict[str, Any]]:
+        return self.job.get_status() if self.job is not None else None
+
+
+# Global reprocessing job manager for the API
+reprocess_manager = ReprocessManager()
@@ -0,0 +1,86 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class AdaptiveScheduler:
+    """
+    Decides how long the capture loop waits before the next capture.
+
+    The interval shrinks towards min_interval while captures keep finding changes and
+    grows towards max_interval while the screen is idle. While waiting, the active
+    window is polled through get_focus, if given, and a change of focus ends the wait
+    early, as long as at least min_interval has passed since the last capture.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        speedup: float = 0.5,
+        backoff: float = 1.5,
+        focus_poll_interval: float = 1.0,
+        get_focus: Optional[Callable[[], Any]] = None,
+    ):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.interval = min(max(float(base_interval), self.min_interval), self.max_interval)
+        self.speedup = speedup
+        self.backoff = backoff
+        self.focus_poll_interval = focus_poll_interval
+        self.get_focus = get_focus
+
+        self._last_capture = time.monotonic()
+        self._last_focus = None
+        self.stats = {"interval": 0, "focus": 0, "changed": 0, "idle": 0}
+
+    def record(self, changed: bool, focus: Any = None):
+        """Adjust the interval after a capture depending on whether it found a change"""
+        self._last_capture = time.monotonic()
+        if focus is not None:
+            self._last_focus = focus
+
+        if changed:
+            self.stats["changed"] += 1
+            self.interval = max(self.min_interval, self.interval * self.speedup)
+        else:
+            self.stats["idle"] += 1
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def wait(self, should_continue: Callable[[], bool]) -> str:
+        """
+        Sleep until the next capture is due
+
+        Returns:
+            str: why the wait ended - "interval", "focus" or "stopped"
+        """
+        deadline = self._last_capture + self.interval
+        while should_continue():
+            now = time.monotonic()
+            if now >= deadline:
+                self.stats["interval"] += 1
+                return "interval"
+
+            time.sleep(min(self.focus_poll_interval, deadline - now))
+
+            if self.get_focus is not None and time.monotonic() - self._last_capture >= self.min_interval:
+                focus = self.get_focus()
+                if self._last_focus is not None and focus != self._last_focus:
+                    self._last_focus = focus
+                    self.stats["focus"] += 1
+                    return "focus"
+                self._last_focus = focus
+        return "stopped"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the current interval and how captures were triggered"""
+        return {
+            "current_interval": round(self.interval, 2),
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "focus_polling": self.get_focus is not None,
+            "triggered_by_interval": self.stats["interval"],
+            "triggered_by_focus": self.stats["focus"],
+            "captures_with_changes": self.stats["changed"],
+            "captures_without_changes": self.stats["idle"],
+        }
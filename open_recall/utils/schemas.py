@@ -36,10 +36,14 @@ class TagResponse(TagBase):
 
 class ScreenshotResponse(BaseModel):
     id: int
+    frame_id: int | None = None
     file_path: str
+    file_size: int | None = None
+    encode_time_ms: float | None = None
     timestamp: datetime
     app_name: str
     window_title: str
+    monitor: int | None = None
     extracted_text: str
     confidence_score: float
     is_favorite: bool
@@ -50,9 +54,44 @@ class ScreenshotResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SearchResultResponse(BaseModel):
+    """A search hit with snippets of the text around its matches instead of its full OCR text"""
+
+    id: int
+    frame_id: int | None = None
+    file_path: str
+    timestamp: datetime
+    app_name: str
+    window_title: str
+    monitor: int | None = None
+    confidence_score: float
+    is_favorite: bool
+    notes: str | None = None
+    summary: str | None = None
+    tags: List[TagResponse]
+    # Relevance score, higher is better; None when there is no full-text index to rank with
+    score: float | None = None
+    # HTML-escaped text with matches wrapped in <mark> tags
+    snippet: str = ""
+    title_highlight: str | None = None
+    notes_snippet: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class Page(BaseModel, Generic[T]):
     items: List[T]
     total: int
     page: int
     size: int
     pages: int
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    size: int
+    # Pass back as `cursor` to get the next page; None on the last page
+    next_cursor: str | None = None
+    # Only counted when asked for; with a capped count, `total_capped` means more screenshots match
+    total: int | None = None
+    total_capped: bool = False
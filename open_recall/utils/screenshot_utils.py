@@ -1,21 +1,45 @@
-import asyncio
 import os
 import platform
 import threading
 import time
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
-import mss
 import numpy as np
 import psutil
 from PIL import Image
 
-from .db_utils import get_db, screenshot_crud
-from .ocr_utils import process_image_ocr
+from .capture import ScreenGrabber
+from .change_detection import create_change_detector
+from .db_utils import frame_crud, frame_words_crud, get_db, screenshot_crud
+from .encoding import DEFAULT_PROFILE, encode_image
+from .events import event_bus
+from .exclusion import ExclusionRules
+from .frame_store import FrameStore
+from .journal import ingestion_journal
+from .ocr_batching import OCRBatcher
+from .ocr_cache import ocr_cache
+from .ocr_preprocessing import (
+    DEFAULT_OCR_PROFILE,
+    OCR_PROFILES,
+    clip_region,
+    ocr_profile_stats,
+    preprocess_for_ocr,
+    restore_word_boxes,
+)
+from .ocr_service import OCRWorkerPool
+from .ocr_utils import extract_words_batch, words_confidence, words_to_text_with_offsets
+from .pipeline import Pipeline, PipelineStage
+from .scheduler import AdaptiveScheduler
 from .schemas import EventType
-from .settings import BASE_DIR, settings_manager
+from .semantic_search import embed_screenshots
+from .settings import BASE_DIR, DEFAULT_SETTINGS, settings_manager
 from .summarization import generate_summary
+from .tile_ocr import TileTracker
+from .vector_index import vector_index
+from .window_info import X11WindowBackend, process_cache, truncate_title
+from .word_geometry import pack_words
 
 
 class ScreenshotManager:
@@ -33,9 +57,24 @@ class ScreenshotManager:
             self.storage_path = storage_path or self._get_default_storage_path()
             # Get capture interval from settings or use default
             self.capture_interval = capture_interval or settings_manager.get_setting("capture_interval", 300)
-            self.last_screenshot = None
+            # Change detector, last fingerprint and tile tracker of each captured monitor
+            self.monitor_states = {}
+            self.grabber = None
+            self.scheduler = None
+            self.frame_store = None
+            self.ocr_batcher = None
+            self.ocr_pool = None
+            self.ocr_profile_name = DEFAULT_OCR_PROFILE
+            self.ocr_profile = OCR_PROFILES[DEFAULT_OCR_PROFILE]
+            self.journal_enabled = False
+            self.semantic_enabled = False
+            # Persistent X11 connection for window lookups; False once it is known to be unavailable
+            self._x11_backend = None
+            self.exclusion_rules = ExclusionRules()
+            self.reload_exclusion_rules()
             self.is_running = False
             self.thread = None
+            self.pipeline = None
             self._ensure_storage_path()
             self.initialized = True
 
@@ -48,6 +87,15 @@ class ScreenshotManager:
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path, exist_ok=True)
 
+    def reload_exclusion_rules(self) -> bool:
+        """Recompile the exclusion rules from settings; takes effect from the next capture"""
+        try:
+            self.exclusion_rules.load(settings_manager.get_setting("exclusion_rules", []) or [])
+            return True
+        except ValueError as e:
+            print(f"Invalid exclusion rules, keeping the previous ones: {e}")
+            return False
+
     def _get_active_window_info(self) -> tuple:
         """Get active window information using platform-specific methods"""
         try:
@@ -85,20 +133,10 @@ class ScreenshotManager:
 
             # Get process information
             try:
-                process = psutil.Process(pid.value)
-                app_name = process.name()
-
-                # Try to get a better name from the executable path
-                try:
-                    exe = process.exe()
-                    if exe:
-                        better_name = os.path.basename(exe)
-                        # Remove extension if present
-                        better_name = os.path.splitext(better_name)[0]
-                        if better_name and better_name != app_name:
-                            app_name = better_name
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+                resolved = process_cache.lookup(pid.value)
+                if resolved is None:
+                    return "Unknown", "Unknown"
+                app_name = resolved[0]
 
                 # Get window title
                 length = ctypes.windll.user32.GetWindowTextLengthW(hwnd)
@@ -109,16 +147,12 @@ class ScreenshotManager:
                 # If window title is empty, try to use the process name or command line
                 if not window_title:
                     try:
-                        cmdline = process.cmdline()
+                        cmdline = psutil.Process(pid.value).cmdline()
                         window_title = " ".join(cmdline) if cmdline else app_name
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         window_title = app_name
 
-                # Truncate if too long
-                if len(window_title) > 100:
-                    window_title = window_title[:97] + "..."
-
-                return app_name, window_title
+                return app_name, truncate_title(window_title)
 
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 return "Unknown", "Unknown"
@@ -205,9 +239,53 @@ class ScreenshotManager:
             print(f"Error getting macOS window info: {e}")
             return "Unknown", "Unknown"
 
+    def _get_active_window_rect(self) -> Optional[tuple]:
+        """Get the active window's rectangle (x0, y0, x1, y1) in desktop coordinates, or None if unknown"""
+        try:
+            system = platform.system()
+            if system == "Windows":
+                import ctypes
+                from ctypes import wintypes
+
+                hwnd = ctypes.windll.user32.GetForegroundWindow()
+                rect = wintypes.RECT()
+                if not hwnd or not ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+                    return None
+                return rect.left, rect.top, rect.right, rect.bottom
+            if system == "Linux":
+                x11_backend = self._get_x11_backend()
+                return x11_backend.active_window_rect() if x11_backend is not None else None
+        except Exception as e:
+            print(f"Error getting active window bounds: {e}")
+        # macOS does not expose window bounds without accessibility permissions
+        return None
+
+    def _get_x11_backend(self) -> Optional[X11WindowBackend]:
+        """Get the persistent X11 window backend, or None if python-xlib or an X display is unavailable"""
+        if self._x11_backend is None:
+            try:
+                self._x11_backend = X11WindowBackend()
+            except ImportError:
+                print("python-xlib is not installed, falling back to xdotool/wmctrl for window info")
+                self._x11_backend = False
+            except Exception as e:
+                print(f"Could not connect to the X display for window info: {e}")
+                self._x11_backend = False
+        return self._x11_backend or None
+
     def _get_active_window_info_linux(self) -> tuple:
         """Get active window information for Linux"""
         try:
+            # Prefer the persistent X11 connection when python-xlib is installed
+            x11_backend = self._get_x11_backend()
+            if x11_backend is not None:
+                try:
+                    info = x11_backend.get_active_window_info()
+                    if info is not None:
+                        return info
+                except Exception as e:
+                    print(f"X11 window backend failed: {e}")
+
             # Try using xdotool if available
             try:
                 import subprocess
@@ -226,32 +304,11 @@ class ScreenshotManager:
                     )
 
                     if window_pid.returncode == 0 and window_pid.stdout.strip():
-                        try:
-                            pid = int(window_pid.stdout.strip())
-                            process = psutil.Process(pid)
-                            app_name = process.name()
-
-                            # Try to get a better name from the executable path
-                            try:
-                                exe = process.exe()
-                                if exe:
-                                    better_name = os.path.basename(exe)
-                                    # Remove extension if present
-                                    better_name = os.path.splitext(better_name)[0]
-                                    if better_name and better_name != app_name:
-                                        app_name = better_name
-                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                pass
-
+                        resolved = process_cache.lookup(int(window_pid.stdout.strip()))
+                        if resolved is not None:
+                            app_name = resolved[0]
                             window_title = window_name.stdout.strip() if window_name.returncode == 0 else app_name
-
-                            # Truncate if too long
-                            if len(window_title) > 100:
-                                window_title = window_title[:97] + "..."
-
-                            return app_name, window_title
-                        except (ValueError, psutil.NoSuchProcess, psutil.AccessDenied):
-                            pass
+                            return app_name, truncate_title(window_title)
             except (ImportError, FileNotFoundError) as e:
                 print(f"xdotool approach failed: {e}")
                 pass
@@ -281,32 +338,12 @@ class ScreenshotManager:
                                     parts = line.split()
                                     if len(parts) >= 3:
                                         try:
-                                            pid = int(parts[2])
-                                            process = psutil.Process(pid)
-                                            app_name = process.name()
-
-                                            # Try to get a better name from the executable path
-                                            try:
-                                                exe = process.exe()
-                                                if exe:
-                                                    better_name = os.path.basename(exe)
-                                                    # Remove extension if present
-                                                    better_name = os.path.splitext(better_name)[0]
-                                                    if better_name and better_name != app_name:
-                                                        app_name = better_name
-                                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                                pass
-
+                                            resolved = process_cache.lookup(int(parts[2]))
+                                        except ValueError:
+                                            resolved = None
+                                        if resolved is not None:
                                             # Window title is the rest of the line after the desktop number
-                                            window_title = " ".join(parts[4:])
-
-                                            # Truncate if too long
-                                            if len(window_title) > 100:
-                                                window_title = window_title[:97] + "..."
-
-                                            return app_name, window_title
-                                        except (ValueError, psutil.NoSuchProcess, psutil.AccessDenied):
-                                            pass
+                                            return resolved[0], truncate_title(" ".join(parts[4:]))
             except (ImportError, FileNotFoundError) as e:
                 print(f"wmctrl approach failed: {e}")
                 pass
@@ -340,158 +377,546 @@ class ScreenshotManager:
             print(f"Error getting Linux window info: {e}")
             return "Unknown", "Unknown"
 
-    def _calculate_image_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
-        """Calculate structural similarity between two images"""
-        if img1 is None or img2 is None:
-            return 0.0
-
-        # Convert to grayscale for faster comparison
-        def rgb2gray(img):
-            return 0.2989 * img[..., 0] + 0.5870 * img[..., 1] + 0.1140 * img[..., 2]
-
-        img1_gray = rgb2gray(img1)
-        img2_gray = rgb2gray(img2)
-
-        # Calculate mean squared error
-        mse = np.mean((img1_gray - img2_gray) ** 2)
-        if mse == 0:
-            return 1.0
-
-        # Convert MSE to similarity score (0-1)
-        similarity = 1 / (1 + mse)
-        return similarity
-
-    def _is_significant_change(self, current: np.ndarray) -> bool:
-        """Check if the current screenshot is significantly different from the last one"""
-        if self.last_screenshot is None:
-            return True
+    def _get_monitor_state(self, monitor: int) -> dict:
+        """Get (or create) the change tracking state of a monitor"""
+        state = self.monitor_states.get(monitor)
+        if state is None:
+            state = {
+                "change_detector": create_change_detector(),
+                # Only the compact fingerprint of the last frame is kept, never the full frame
+                "last_fingerprint": None,
+                "tile_tracker": self._create_tile_tracker(),
+            }
+            self.monitor_states[monitor] = state
+        return state
 
-        similarity = self._calculate_image_similarity(current, self.last_screenshot)
-        return similarity < 0.95  # Threshold for significant change
+    def _is_significant_change(self, monitor: int, fingerprint: np.ndarray) -> bool:
+        """Check if the current screenshot of a monitor is significantly different from its last one"""
+        state = self._get_monitor_state(monitor)
+        return state["change_detector"].is_significant_change(state["last_fingerprint"], fingerprint)
 
-    def _capture_screenshot(self) -> Optional[tuple]:
-        """Capture screenshot and return image array with metadata"""
+    def _capture_screenshot(self, monitor: int) -> Optional[np.ndarray]:
+        """Capture one monitor and return its RGB image array"""
         try:
-            with mss.mss() as sct:
-                monitor = sct.monitors[1]  # Primary monitor
-                screenshot = np.array(sct.grab(monitor))
-                # Convert from BGRA to RGB
-                screenshot = screenshot[:, :, :3]
-                # Ensure the array is in uint8 format
-                if screenshot.dtype != np.uint8:
-                    screenshot = (screenshot * 255).astype(np.uint8)
-                return screenshot
+            return self.grabber.grab(monitor)
         except Exception as e:
-            print(f"Screenshot capture failed: {e}")
+            print(f"Screenshot capture failed for monitor {monitor}: {e}")
             return None
 
-    def _save_screenshot(self, image_array: np.ndarray) -> Optional[str]:
-        """Save screenshot and return filename only"""
+    def _save_screenshot(
+        self, image_array: np.ndarray, timestamp: datetime, monitor: int, content_hash: Optional[str] = None
+    ) -> Optional[dict]:
+        """Encode and save screenshot, returning the filename (not full path) with its size and encode time"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.webp"
-            filepath = os.path.join(self.storage_path, filename)
+            profile = settings_manager.get_setting("image_profile", DEFAULT_PROFILE)
+            data, extension, encode_ms = encode_image(image_array, profile)
 
-            image = Image.fromarray(image_array)
-            image.save(filepath, format="webp", quality=90, method=6)
+            if content_hash is not None and self.frame_store is not None:
+                filename = self.frame_store.blob_path(content_hash, extension)
+                self.frame_store.write_blob(filename, data)
+            else:
+                filename = f"screenshot_{timestamp.astimezone().strftime('%Y%m%d_%H%M%S')}_m{monitor}.{extension}"
+                filepath = os.path.join(self.storage_path, filename)
+                with open(filepath, "wb") as f:
+                    f.write(data)
             # Return only filename, not full path
             # NOTE: When accessing this file later, you must join it with the storage_path
             # For example, when deleting files, use os.path.join(storage_path, file_path)
-            return filename
+            return {"file_path": filename, "file_size": len(data), "encode_time_ms": encode_ms}
         except Exception as e:
             print(f"Error saving screenshot: {e}")
             return None
 
-    def _process_and_save(self):
-        """Process screenshot and save to database"""
-        if not self.is_running:
-            return
-
-        screenshot_array = self._capture_screenshot()
-        if screenshot_array is None:
-            return
+    def _build_pipeline(self) -> Pipeline:
+        """Create the encode -> OCR -> summary -> persist (-> embed) pipeline from settings"""
+        config = settings_manager.get_setting("pipeline", {}) or {}
+        handlers = [
+            ("encode", self._encode_stage),
+            ("ocr", self._ocr_stage),
+            ("summary", self._summary_stage),
+            ("persist", self._persist_stage),
+        ]
+        if self.semantic_enabled:
+            handlers.append(("embed", self._embed_stage))
+
+        stages = []
+        for name, handler in handlers:
+            stage_config = {**DEFAULT_SETTINGS["pipeline"][name], **config.get(name, {})}
+            stages.append(
+                PipelineStage(
+                    name,
+                    handler,
+                    workers=stage_config["workers"],
+                    queue_size=stage_config["queue_size"],
+                    drop_policy=stage_config["drop_policy"],
+                    batch_size=settings_manager.get_setting("embedding_batch_size", 16) if name == "embed" else 1,
+                )
+            )
+        return Pipeline(stages)
 
-        if not self._is_significant_change(screenshot_array):
-            return
+    def _create_frame_store(self) -> Optional[FrameStore]:
+        """Create the deduplicating frame store, or None if deduplication is disabled in settings"""
+        if not settings_manager.get_setting("dedup_enabled", True):
+            return None
+        frame_store = FrameStore(
+            self.storage_path,
+            perceptual_distance=settings_manager.get_setting("dedup_perceptual_distance"),
+            recent_limit=settings_manager.get_setting("dedup_recent_frames", 5000),
+        )
+        with next(get_db()) as db:
+            frame_store.load_recent(db)
+        return frame_store
 
-        filename = self._save_screenshot(screenshot_array)
-        if not filename:
-            return
+    def _resolve_duplicate(self, frame: dict) -> bool:
+        """
+        Point the frame at an already stored copy of the same image, if there is one
 
-        app_name, window_title = self._get_active_window_info()
+        A pixel-identical frame also takes the stored text. A perceptual match only reuses the
+        stored image: the frame keeps its pixels and is read with OCR, because a small change
+        such as an edited cell or a new chat line can leave the dHash unchanged. The same goes
+        for an exact match whose stored frame was never read, which then takes this frame's text.
 
-        # Process OCR
-        extracted_text, confidence = process_image_ocr(screenshot_array)
+        Returns:
+            bool: whether the frame needs no image of its own
+        """
+        with next(get_db()) as db:
+            existing, exact = self.frame_store.find(db, frame["content_hash"], frame["perceptual_hash"])
+            if existing is None:
+                return False
+
+            frame.update(
+                {
+                    "frame_id": existing.id,
+                    "file_path": existing.file_path,
+                    "file_size": existing.file_size,
+                    "encode_time_ms": 0.0,
+                }
+            )
+            # Excluded windows are never read, so for them a perceptual match is as good as an exact one.
+            # A frame first stored under a skip_ocr rule has no text yet, so this sighting reads it
+            if (not exact or existing.ocr_skipped) and not frame.get("skip_ocr"):
+                frame["reused_blob"] = not exact
+                frame["height"], frame["width"] = frame["image"].shape[:2]
+                return True
+
+            latest = screenshot_crud.get_latest_for_frame(db, existing.id)
+            frame.pop("image")
+            # Excluded windows never carry text, even when the same pixels were read elsewhere
+            if frame.get("skip_ocr"):
+                latest = None
+                existing_text, existing_confidence = "", 0.0
+            else:
+                existing_text, existing_confidence = existing.extracted_text or "", existing.confidence_score or 0.0
+            frame.update(
+                {
+                    "duplicate": True,
+                    "extracted_text": existing_text,
+                    "confidence": existing_confidence,
+                    "summary": latest.summary if latest is not None else "",
+                }
+            )
+            return True
 
-        # Generate summary only if enabled in settings
-        summary = ""
-        if settings_manager.get_setting("enable_summarization", False):
-            summary = generate_summary(
+    def _encode_stage(self, frame: dict) -> Optional[dict]:
+        """Encode the captured frame and write it to disk, unless the same frame is already stored"""
+        content_hash = None
+        if self.frame_store is not None:
+            frame["content_hash"], frame["perceptual_hash"] = self.frame_store.fingerprint(frame["image"])
+            if self._resolve_duplicate(frame):
+                ingestion_journal.record(frame, "encoded")
+                return frame
+            content_hash = frame["content_hash"]
+
+        frame["height"], frame["width"] = frame["image"].shape[:2]
+        saved = self._save_screenshot(frame["image"], frame["timestamp"], frame["monitor"], content_hash)
+        if not saved:
+            return None
+        frame.update(saved)
+        # From here on the stored image lets the frame be resumed after a crash
+        ingestion_journal.record(frame, "encoded")
+        return frame
+
+    def _create_ocr_batcher(self) -> OCRBatcher:
+        """
+        Create the batcher that groups OCR pages from concurrent OCR workers. In "process"
+        OCR mode its batches are read by a pool of worker processes instead of in-process.
+        """
+        read_batch, concurrency = extract_words_batch, 1
+        if settings_manager.get_setting("ocr_mode", "thread") == "process":
+            self.ocr_pool = OCRWorkerPool(
+                workers=settings_manager.get_setting("ocr_process_workers", 2),
+                torch_threads=settings_manager.get_setting("ocr_torch_threads", 2),
+                job_timeout=settings_manager.get_setting("ocr_job_timeout", 120),
+            )
+            self.ocr_pool.start()
+            read_batch, concurrency = self.ocr_pool.read, self.ocr_pool.workers
+        return OCRBatcher(
+            read_batch,
+            max_batch_size=settings_manager.get_setting("ocr_batch_size", 8),
+            max_wait_ms=settings_manager.get_setting("ocr_batch_wait_ms", 50),
+            concurrency=concurrency,
+        )
+
+    def _create_tile_tracker(self) -> Optional[TileTracker]:
+        """Create the tile tracker for incremental OCR, or None if it is disabled in settings"""
+        if not settings_manager.get_setting("incremental_ocr", True):
+            return None
+        return TileTracker(
+            rows=settings_manager.get_setting("ocr_tile_rows", 8),
+            cols=settings_manager.get_setting("ocr_tile_cols", 8),
+            full_frame_threshold=settings_manager.get_setting("ocr_full_frame_threshold", 0.6),
+        )
+
+    def _read_pages(self, pages: list) -> list:
+        """Read frames or tile crops with OCR, answering pages seen before from the OCR cache"""
+        if not settings_manager.get_setting("ocr_cache_enabled", True):
+            return self.ocr_batcher.read(pages)
+        return ocr_cache.read_through(
+            pages, self.ocr_batcher.read, settings_manager.get_setting("ocr_backend", "doctr")
+        )
+
+    def _ocr_stage(self, frame: dict) -> dict:
+        """Extract text from the frame and release the pixel data"""
+        if frame.get("duplicate"):
+            return frame
+
+        image = frame.pop("image")
+        if frame.get("skip_ocr"):
+            self.exclusion_rules.record_saved(frame["skip_ocr"], "ocr")
+            frame["extracted_text"], frame["confidence"] = "", 0.0
+            return frame
+
+        started = time.perf_counter()
+        page, transform = preprocess_for_ocr(image, self.ocr_profile, frame.get("ocr_region"))
+        preprocessed = time.perf_counter()
+
+        # Pages from frames that are in OCR at the same time share one predictor call. A replayed
+        # frame is older than the tracker's state, so it is read in full
+        tile_tracker = None if frame.get("replayed") else self._get_monitor_state(frame["monitor"])["tile_tracker"]
+        try:
+            if tile_tracker is None:
+                words = self._read_pages([page])[0]
+            else:
+                words = tile_tracker.process(page, self._read_pages)
+        except Exception as e:
+            print(f"OCR processing failed: {e}")
+            words = []
+        words = restore_word_boxes(words, transform)
+        ocr_profile_stats.record(
+            self.ocr_profile_name,
+            preprocess_ms=(preprocessed - started) * 1000,
+            ocr_ms=(time.perf_counter() - preprocessed) * 1000,
+            confidence=words_confidence(words),
+            pixels=page.shape[0] * page.shape[1],
+            cropped=self.ocr_profile["crop_to_window"] and frame.get("ocr_region") is not None,
+        )
+        frame["extracted_text"], frame["text_offsets"] = words_to_text_with_offsets(words)
+        frame["confidence"] = words_confidence(words)
+        frame["words"] = words
+        ingestion_journal.record(frame, "ocr")
+        return frame
+
+    def _summary_stage(self, frame: dict) -> dict:
+        """Generate summary only if enabled in settings"""
+        if frame.get("duplicate"):
+            return frame
+
+        frame["summary"] = ""
+        if not settings_manager.get_setting("enable_summarization", False):
+            return frame
+        if frame.get("skip_ocr"):
+            self.exclusion_rules.record_saved(frame["skip_ocr"], "summary")
+        else:
+            frame["summary"] = generate_summary(
                 f"""
-            Active App Name: {app_name}
-            Screenshot Extracted Text: {extracted_text}
+            Active App Name: {frame["app_name"]}
+            Screenshot Extracted Text: {frame["extracted_text"]}
             """
             )
+        ingestion_journal.record(frame, "summary")
+        return frame
 
-        # Save to database
+    def _store_word_geometry(self, db, frame: dict):
+        """Pack the frame's word boxes and confidences into its side-table row, if enabled in settings"""
+        if not settings_manager.get_setting("store_word_geometry", True):
+            return
+        data, word_count, truncated = pack_words(
+            frame["words"],
+            frame["text_offsets"],
+            frame["width"],
+            frame["height"],
+            max_words=settings_manager.get_setting("word_geometry_max_words", 5000),
+        )
+        frame_words_crud.create_if_missing(
+            db,
+            data={
+                "frame_id": frame["frame_id"],
+                "word_count": word_count,
+                "truncated": truncated,
+                "byte_size": len(data),
+                "data": data,
+            },
+        )
+
+    def _persist_stage(self, frame: dict) -> None:
+        """Save the processed frame to the database"""
         with next(get_db()) as db:
+            # A frame that reuses a similar frame's image keeps its own text on its screenshot only
+            if self.frame_store is not None and not frame.get("duplicate") and not frame.get("reused_blob"):
+                stored_frame = frame_crud.get_or_create(
+                    db,
+                    data={
+                        "content_hash": frame["content_hash"],
+                        "perceptual_hash": frame["perceptual_hash"],
+                        "file_path": frame["file_path"],
+                        "width": frame["width"],
+                        "height": frame["height"],
+                        "file_size": frame["file_size"],
+                        "extracted_text": frame["extracted_text"],
+                        "confidence_score": float(frame["confidence"]),
+                        "ocr_skipped": bool(frame.get("skip_ocr")),
+                    },
+                )
+                frame["frame_id"] = stored_frame.id
+                # The first sighting of this frame was excluded from OCR, so this one's text becomes the frame's
+                if stored_frame.ocr_skipped and not frame.get("skip_ocr"):
+                    frame_crud.fill_text(
+                        db,
+                        stored_frame,
+                        extracted_text=frame["extracted_text"],
+                        confidence_score=float(frame["confidence"]),
+                    )
+                # Frames stored without OCR stay out of the perceptual index so they do not lend empty text
+                if not frame.get("skip_ocr"):
+                    self.frame_store.remember(stored_frame.id, frame["perceptual_hash"])
+                # Word offsets point into this frame's text, so skip them if another worker stored different text
+                if frame.get("words") and stored_frame.extracted_text == frame["extracted_text"]:
+                    self._store_word_geometry(db, frame)
+
             screenshot_data = {
-                "file_path": filename,
-                "timestamp": datetime.now(timezone.utc),
-                "app_name": app_name,
-                "window_title": window_title,
-                "extracted_text": extracted_text,
-                "confidence_score": float(confidence),
-                "summary": summary,
+                "frame_id": frame.get("frame_id"),
+                "file_path": frame["file_path"],
+                "file_size": frame["file_size"],
+                "encode_time_ms": frame["encode_time_ms"],
+                "timestamp": frame["timestamp"],
+                "app_name": frame["app_name"],
+                "window_title": frame["window_title"],
+                "monitor": frame["monitor"],
+                "extracted_text": frame["extracted_text"],
+                "confidence_score": float(frame["confidence"]),
+                "summary": frame["summary"],
             }
             screenshot = screenshot_crud.create(db, data=screenshot_data)
 
-            # Try to broadcast the new screenshot via WebSocket if available
-            try:
-                # Import here to avoid circular imports
-                from open_recall.main import manager
-
-                # Convert SQLAlchemy model to dict for JSON serialization
-                screenshot_dict = {
-                    "id": screenshot.id,
-                    "file_path": screenshot.file_path,
-                    "timestamp": screenshot.timestamp.isoformat(),
-                    "app_name": screenshot.app_name,
-                    "window_title": screenshot.window_title,
-                    "extracted_text": screenshot.extracted_text,
-                    "confidence_score": screenshot.confidence_score,
-                    "summary": screenshot.summary,
-                    "is_favorite": screenshot.is_favorite,
-                    "notes": screenshot.notes,
-                    "tags": [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in screenshot.tags],
-                }
+            # Hand the new screenshot to the server loop for WebSocket clients; never blocks the pipeline
+            screenshot_dict = {
+                "id": screenshot.id,
+                "frame_id": screenshot.frame_id,
+                "file_path": screenshot.file_path,
+                "timestamp": screenshot.timestamp.isoformat(),
+                "app_name": screenshot.app_name,
+                "window_title": screenshot.window_title,
+                "monitor": screenshot.monitor,
+                "extracted_text": screenshot.extracted_text,
+                "confidence_score": screenshot.confidence_score,
+                "summary": screenshot.summary,
+                "is_favorite": screenshot.is_favorite,
+                "notes": screenshot.notes,
+                "tags": [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in screenshot.tags],
+            }
+            event_bus.publish({"type": EventType.NEW_SCREENSHOT, "screenshot": screenshot_dict})
+        ingestion_journal.record(frame, "persisted")
+        if not self.semantic_enabled:
+            return None
+        frame["screenshot_id"] = screenshot.id
+        return frame
+
+    def _embed_stage(self, frames: List[dict]) -> List[None]:
+        """Embed the text of a batch of saved frames into the semantic index"""
+        # A screenshot missed here, e.g. by a crash, is picked up by the embedding backfill
+        embed_screenshots(
+            [(frame["screenshot_id"], frame["window_title"], frame["extracted_text"]) for frame in frames],
+            batch_size=settings_manager.get_setting("embedding_batch_size", 16),
+        )
+        return [None] * len(frames)
+
+    def _replay_journal(self):
+        """
+        Resume frames the journal shows were not persisted before the last shutdown or crash
+
+        Each frame continues after the last stage it completed; frames that still need OCR are
+        read again from their stored image. Frames older than journal_max_age_hours, beyond
+        the newest journal_max_replay, already replayed three times, or whose image is gone
+        are abandoned, which bounds how much work a restart can queue.
+        """
+        pending = ingestion_journal.load()
+        if not pending:
+            return
+        max_replay = settings_manager.get_setting("journal_max_replay", 500)
+        max_age = settings_manager.get_setting("journal_max_age_hours", 24) * 3600
+        now = time.time()
+        print(f"Ingestion journal has {len(pending)} unfinished frames, resuming up to {max_replay}")
 
-                async def broadcast():
-                    asyncio.create_task(
-                        manager.broadcast({"type": EventType.NEW_SCREENSHOT, "screenshot": screenshot_dict})
-                    )
+        for index, entry in enumerate(pending):
+            if not self.is_running:
+                return
+            data = entry["data"]
+            if len(pending) - index > max_replay or now - entry["created"] > max_age or entry["attempts"] >= 3:
+                ingestion_journal.append(entry["id"], "abandoned")
+                continue
+            if "timestamp" not in data or "file_path" not in data:
+                # Only later stages made it to disk
+                ingestion_journal.append(entry["id"], "abandoned")
+                continue
+
+            frame = {**data, "journal_id": entry["id"], "replayed": True}
+            frame["timestamp"] = datetime.fromisoformat(data["timestamp"])
+            with next(get_db()) as db:
+                # The frame may have been saved just before the crash, before "persisted" was logged
+                if screenshot_crud.get_by_capture(db, frame["file_path"], frame["timestamp"]) is not None:
+                    ingestion_journal.append(entry["id"], "persisted")
+                    continue
+
+            next_stage = {"encoded": "ocr", "ocr": "summary", "summary": "persist"}[entry["stage"]]
+            if next_stage == "ocr":
+                frame["image"] = None
+                if not frame.get("duplicate") and not frame.get("skip_ocr"):
+                    try:
+                        with Image.open(os.path.join(self.storage_path, frame["file_path"])) as img:
+                            frame["image"] = np.asarray(img.convert("RGB"))
+                    except Exception as e:
+                        print(f"Abandoning journaled frame {entry['id']}: {e}")
+                        ingestion_journal.append(entry["id"], "abandoned")
+                        continue
+
+            ingestion_journal.append(entry["id"], "replayed")
+            self.pipeline.submit_to(next_stage, frame)
+
+    def _process_and_save(self) -> tuple:
+        """
+        Capture the selected monitors and hand changed ones to the processing pipeline
+
+        Returns:
+            tuple: (whether any monitor changed, active window info or None if it was not looked up)
+        """
+        if not self.is_running or self.pipeline is None:
+            return False, None
+
+        timestamp = datetime.now(timezone.utc)
+        changed = False
+
+        # The active window is the same for every monitor in this tick, so look it up once and
+        # apply the exclusion rules before paying for any capture work
+        window_info = self._get_active_window_info()
+        app_name, window_title = window_info
+        # Only looked up when the OCR profile reads the active window alone
+        window_rect = self._get_active_window_rect() if self.ocr_profile["crop_to_window"] else None
+
+        for monitor in self.grabber.selected_monitors():
+            rule = self.exclusion_rules.evaluate(app_name, window_title, monitor)
+            if rule is not None and rule.action == "drop":
+                self.exclusion_rules.record_saved(rule.name, "capture")
+                continue
+
+            screenshot_array = self._capture_screenshot(monitor)
+            if screenshot_array is None:
+                continue
+
+            state = self._get_monitor_state(monitor)
+            fingerprint = state["change_detector"].fingerprint(screenshot_array)
+            if not self._is_significant_change(monitor, fingerprint):
+                continue
+            changed = True
+
+            frame = {
+                "image": screenshot_array,
+                "timestamp": timestamp,
+                "monitor": monitor,
+                "app_name": app_name,
+                "window_title": window_title,
+                # Name of the skip_ocr rule that matched, if any
+                "skip_ocr": rule.name if rule is not None else None,
+                # Key of the frame's entries in the ingestion journal
+                "journal_id": uuid.uuid4().hex if self.journal_enabled else None,
+                # Active window rectangle in this frame's pixels, for profiles that crop to it
+                "ocr_region": clip_region(window_rect, self.grabber.available_monitors()[monitor]),
+            }
+            if self.pipeline.submit(frame):
+                state["last_fingerprint"] = fingerprint
 
-                asyncio.run(broadcast())
-            except Exception as e:
-                print(f"Failed to broadcast new screenshot: {e}")
+        return changed, window_info
 
-        self.last_screenshot = screenshot_array
+    def _has_in_process_window_backend(self) -> bool:
+        """Whether the active window can be read without spawning helper processes"""
+        system = platform.system()
+        if system == "Windows":
+            return True
+        if system == "Linux":
+            return self._get_x11_backend() is not None
+        return False
+
+    def _create_scheduler(self) -> AdaptiveScheduler:
+        """Create the capture scheduler; with adaptive capture off it waits exactly capture_interval"""
+        if not settings_manager.get_setting("adaptive_capture", True):
+            return AdaptiveScheduler(self.capture_interval, self.capture_interval, self.capture_interval)
+        focus_polling = settings_manager.get_setting("focus_polling", "auto")
+        poll_focus = focus_polling == "on" or (focus_polling == "auto" and self._has_in_process_window_backend())
+        return AdaptiveScheduler(
+            self.capture_interval,
+            settings_manager.get_setting("min_capture_interval", 10),
+            settings_manager.get_setting("max_capture_interval", 600),
+            focus_poll_interval=settings_manager.get_setting("focus_poll_interval", 1.0),
+            get_focus=self._get_active_window_info if poll_focus else None,
+        )
 
     def _screenshot_loop(self):
         """Main screenshot capture loop"""
-        while self.is_running:
-            try:
-                self._process_and_save()
-            except Exception as e:
-                print(f"Error in screenshot loop: {e}")
-
-            if not self.is_running:
-                break
+        # The grabber is bound to the thread that opens it, so it lives and dies with this loop
+        self.grabber = ScreenGrabber(monitors=settings_manager.get_setting("capture_monitors", "all"))
+        try:
+            while self.is_running:
+                try:
+                    changed, window_info = self._process_and_save()
+                    self.scheduler.record(changed, focus=window_info)
+                except Exception as e:
+                    print(f"Error in screenshot loop: {e}")
 
-            for _ in range(int(self.capture_interval)):
                 if not self.is_running:
                     break
-                time.sleep(1)
+
+                self.scheduler.wait(lambda: self.is_running)
+        finally:
+            self.grabber.close()
+
+    def get_pipeline_stats(self) -> dict:
+        """Get queue depth and throughput statistics for each pipeline stage"""
+        if self.pipeline is None:
+            return {"running": False, "stages": []}
+        stats = self.pipeline.get_stats()
+        stats["dedup"] = self.frame_store.get_stats() if self.frame_store is not None else None
+        stats["scheduler"] = self.scheduler.get_stats() if self.scheduler is not None else None
+        stats["monitors"] = {
+            monitor: state["tile_tracker"].get_stats() if state["tile_tracker"] is not None else None
+            for monitor, state in self.monitor_states.items()
+        }
+        stats["ocr_batching"] = self.ocr_batcher.get_stats() if self.ocr_batcher is not None else None
+        stats["ocr_workers"] = self.ocr_pool.get_stats() if self.ocr_pool is not None else None
+        stats["ocr_cache"] = ocr_cache.get_stats()
+        stats["ocr_profile"] = self.ocr_profile_name
+        stats["journal"] = ingestion_journal.get_stats()
+        stats["semantic_index"] = vector_index.get_stats() if self.semantic_enabled else None
+        stats["exclusion_rules"] = self.exclusion_rules.get_stats()
+        stats["window_info"] = {
+            "backend": "x11" if self._x11_backend else "fallback",
+            "process_cache": dict(process_cache.stats),
+        }
+        return stats
+
+    def is_ocr_busy(self) -> bool:
+        """Check if live capture has frames waiting for OCR, so background OCR work should yield"""
+        if self.pipeline is None or not self.pipeline.is_running:
+            return False
+        return any(stage.name == "ocr" and stage.queue.qsize() > 0 for stage in self.pipeline.stages)
 
     def start(self):
         """Start screenshot capture thread"""
@@ -499,9 +924,28 @@ class ScreenshotManager:
             return
 
         print("Starting screenshot manager...")
+        self.monitor_states = {}
+        self.scheduler = self._create_scheduler()
+        self.frame_store = self._create_frame_store()
+        self.ocr_profile_name = settings_manager.get_setting("ocr_profile", DEFAULT_OCR_PROFILE)
+        if self.ocr_profile_name not in OCR_PROFILES:
+            print(f"Unknown OCR profile '{self.ocr_profile_name}', using '{DEFAULT_OCR_PROFILE}'")
+            self.ocr_profile_name = DEFAULT_OCR_PROFILE
+        self.ocr_profile = OCR_PROFILES[self.ocr_profile_name]
+        ocr_cache.max_bytes = settings_manager.get_setting("ocr_cache_max_mb", 64) * 1024 * 1024
+        self.ocr_batcher = self._create_ocr_batcher()
+        self.ocr_batcher.start()
+        self.semantic_enabled = settings_manager.get_setting("semantic_search_enabled", False)
+        self.pipeline = self._build_pipeline()
+        self.pipeline.start()
+        self.journal_enabled = settings_manager.get_setting("journal_enabled", True)
+        ingestion_journal.fsync = settings_manager.get_setting("journal_fsync", False)
         self.is_running = True
         self.thread = threading.Thread(target=self._screenshot_loop, daemon=True)
         self.thread.start()
+        if self.journal_enabled:
+            # Replayed frames queue behind live captures without holding up startup
+            threading.Thread(target=self._replay_journal, name="journal-replay", daemon=True).start()
         print("Screenshot manager started")
 
     def stop(self):
@@ -521,6 +965,17 @@ class ScreenshotManager:
                 print(f"Error stopping screenshot thread: {e}")
 
         self.thread = None
+
+        # Let frames that were already captured finish processing
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self.ocr_batcher is not None:
+            self.ocr_batcher.stop()
+        if self.ocr_pool is not None:
+            self.ocr_pool.stop()
+            self.ocr_pool = None
+        # Frames still queued stay pending in the journal and resume at the next start
+        ingestion_journal.close()
         print("Screenshot manager stopped")
 
     def __del__(self):
@@ -0,0 +1,184 @@
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from .db_utils import Base, Screenshot, screenshot_text_filter
+
+# (label, what is typed in the search box); the planted words below give each a known selectivity
+SEARCH_QUERIES = [
+    ("common word", "report"),
+    ("rare word", "kubernetes"),
+    ("two words", "invoice vendor"),
+    ("phrase", '"quarterly report"'),
+    ("prefix", "kube"),
+    ("no match", "zzqxj"),
+]
+
+# Words planted in a fraction of the rows, on top of the Zipf-distributed filler
+PLANTED_WORDS = [("report", 0.05), ("invoice", 0.01), ("vendor", 0.02), ("kubernetes", 0.001)]
+PLANTED_PHRASE = ("quarterly report", 0.005)
+
+APP_NAMES = ["chrome", "code", "slack", "terminal", "outlook", "excel", "zoom", "explorer"]
+
+
+class SyntheticScreenshots:
+    """Deterministic generator of screenshot rows with OCR-like text"""
+
+    def __init__(self, seed: int = 0, vocabulary_size: int = 20000, text_words: int = 200):
+        self.rng = random.Random(seed)
+        self.text_words = text_words
+        self.vocabulary = [
+            "".join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(3, 10))) for _ in range(vocabulary_size)
+        ]
+        # Word frequencies on screen follow roughly Zipf's law
+        weights = [1 / rank**1.07 for rank in range(1, vocabulary_size + 1)]
+        total = 0.0
+        self.cumulative_weights = []
+        for weight in weights:
+            total += weight
+            self.cumulative_weights.append(total)
+        self.start = datetime(2024, 1, 1)
+
+    def _text(self) -> str:
+        words = self.rng.choices(self.vocabulary, cum_weights=self.cumulative_weights, k=self.text_words)
+        for word, rate in PLANTED_WORDS:
+            if self.rng.random() < rate:
+                words[self.rng.randrange(len(words))] = word
+        phrase, rate = PLANTED_PHRASE
+        if self.rng.random() < rate:
+            words[self.rng.randrange(len(words))] = phrase
+        return " ".join(words)
+
+    def rows(self, first: int, count: int) -> List[Dict[str, Any]]:
+        """Rows number first to first + count - 1, captured ten seconds apart"""
+        rows = []
+        for number in range(first, first + count):
+            app_name = self.rng.choice(APP_NAMES)
+            rows.append(
+                {
+                    "file_path": f"{number}.webp",
+                    "timestamp": self.start + timedelta(seconds=10 * number),
+                    "app_name": app_name,
+                    "window_title": f"{app_name} - {' '.join(self.rng.choices(self.vocabulary[:500], k=4))}",
+                    "monitor": 1,
+                    "extracted_text": self._text(),
+                    "confidence_score": 0.9,
+                    "is_favorite": False,
+                }
+            )
+        return rows
+
+
+def time_search(db, search_filter, page_size: int, repeat: int) -> Dict[str, Any]:
+    """Time a listing page the way GET /api/screenshots runs it: a count plus the newest page of matches"""
+    timings = []
+    total = 0
+    for attempt in range(repeat + 1):
+        started = time.perf_counter()
+        query = db.query(Screenshot).filter(search_filter)
+        total = query.count()
+        query.order_by(Screenshot.timestamp.desc()).limit(page_size).all()
+        if attempt:
+            # The first run warms the page cache and is not timed
+            timings.append((time.perf_counter() - started) * 1000)
+        db.expunge_all()
+    return {"median_ms": round(statistics.median(timings), 2), "max_ms": round(max(timings), 2), "hits": total}
+
+
+def run_search_benchmark(
+    row_counts: Sequence[int] = (10000, 100000),
+    repeat: int = 5,
+    text_words: int = 200,
+    page_size: int = 12,
+    db_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compare substring (LIKE) search with the full-text index on a synthetic archive
+
+    The archive is grown to each row count in turn and every query in SEARCH_QUERIES is timed
+    through both paths. It is built in a temporary database unless db_path is given, and the
+    user's archive is never touched.
+
+    Returns:
+        dict: report with one result per row count and query
+    """
+    temp_dir = None
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, "search_benchmark.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    generator = SyntheticScreenshots(text_words=text_words)
+
+    results = []
+    rows = 0
+    try:
+        for target in sorted(row_counts):
+            started = time.perf_counter()
+            while rows < target:
+                batch = generator.rows(rows, min(10000, target - rows))
+                with engine.begin() as connection:
+                    connection.execute(insert(Screenshot), batch)
+                rows += len(batch)
+            print(f"{rows} rows ready in {time.perf_counter() - started:.1f}s, timing searches...")
+
+            with Session() as db:
+                for label, search_text in SEARCH_QUERIES:
+                    # The substring filter GET /api/screenshots used before the index existed
+                    like_filter = Screenshot.extracted_text.ilike("%" + search_text.strip('"') + "%")
+                    like = time_search(db, like_filter, page_size, repeat)
+                    fts = time_search(db, screenshot_text_filter(db, search_text), page_size, repeat)
+                    results.append(
+                        {
+                            "rows": rows,
+                            "query": label,
+                            "text": search_text,
+                            "like": like,
+                            "fts": fts,
+                            "speedup": round(like["median_ms"] / max(fts["median_ms"], 0.01), 1),
+                        }
+                    )
+        db_size = os.path.getsize(db_path)
+    finally:
+        engine.dispose()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    return {
+        "repeat": repeat,
+        "text_words": text_words,
+        "page_size": page_size,
+        "db_mb": db_size / 1e6,
+        "results": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a search benchmark report as a text table"""
+    lines = [
+        f"{report['text_words']} words of text per screenshot, pages of {report['page_size']}, "
+        f"median of {report['repeat']} runs (count + page)",
+        f"{'rows':>9}  {'query':<12} {'text':<18} {'LIKE ms':>9} {'FTS ms':>9} {'speedup':>8} "
+        f"{'LIKE hits':>10} {'FTS hits':>10}",
+    ]
+    for result in report["results"]:
+        lines.append(
+            f"{result['rows']:>9}  {result['query']:<12} {result['text']:<18} {result['like']['median_ms']:>9.2f} "
+            f"{result['fts']['median_ms']:>9.2f} {result['speedup']:>7.1f}x "
+            f"{result['like']['hits']:>10} {result['fts']['hits']:>10}"
+        )
+    lines.append(f"Database size at {report['results'][-1]['rows']} rows: {report['db_mb']:.1f} MB")
+    lines.append(
+        "Hit counts differ where LIKE matches inside words (e.g. 'report' in 'reporting') and FTS matches "
+        "whole words or word prefixes"
+    )
+    return "\n".join(lines)
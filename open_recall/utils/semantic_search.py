@@ -0,0 +1,218 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .db_utils import Screenshot, get_db
+from .embeddings import TextEmbedder, embedding_text, get_embedder
+from .settings import settings_manager
+from .vector_index import VectorIndex, vector_index
+
+_index_lock = threading.Lock()
+
+
+def open_vector_index(embedder: TextEmbedder) -> VectorIndex:
+    """Open the global vector index for the embedder's model with the storage settings"""
+    with _index_lock:
+        vector_index.nprobe = settings_manager.get_setting("semantic_nprobe", 16)
+        dtype = settings_manager.get_setting("semantic_index_dtype", "float16")
+        meta = vector_index.meta
+        if meta is None or (meta["model"], meta["dim"], meta["dtype"]) != (embedder.model_name, embedder.dim, dtype):
+            vector_index.dtype = dtype
+            vector_index.open(embedder.dim, embedder.model_name)
+        return vector_index
+
+
+def embed_screenshots(rows: List[Tuple[int, Optional[str], Optional[str]]], batch_size: int = 16) -> int:
+    """
+    Embed screenshots and add their vectors to the index
+
+    Args:
+        rows: (screenshot id, window title, extracted text) of each screenshot
+
+    Returns:
+        int: number of screenshots embedded; those without any text are skipped
+    """
+    rows = [(screenshot_id, embedding_text(title, text)) for screenshot_id, title, text in rows]
+    rows = [(screenshot_id, text) for screenshot_id, text in rows if text]
+    if not rows:
+        return 0
+    embedder = get_embedder()
+    index = open_vector_index(embedder)
+    vectors = embedder.embed([text for _, text in rows], batch_size=batch_size)
+    index.add(np.array([screenshot_id for screenshot_id, _ in rows], dtype=np.int64), vectors)
+    return len(rows)
+
+
+def reembed_screenshots(rows: List[Tuple[int, Optional[str], Optional[str]]], batch_size: int = 16) -> int:
+    """Replace the vectors of screenshots whose text changed; returns how many were embedded"""
+    if not rows:
+        return 0
+    index = open_vector_index(get_embedder())
+    index.remove(np.array([screenshot_id for screenshot_id, _, _ in rows], dtype=np.int64))
+    return embed_screenshots(rows, batch_size=batch_size)
+
+
+def forget_screenshots(ids: List[int]) -> int:
+    """Remove the vectors of deleted screenshots, even while semantic search is off"""
+    if not ids:
+        return 0
+    # SQLite reuses the ids of deleted rows, so leftover vectors would match unrelated new screenshots
+    with _index_lock:
+        if not vector_index.open_existing():
+            return 0
+    return vector_index.remove(np.array(ids, dtype=np.int64))
+
+
+def semantic_matches(
+    search_text: str, k: int, allowed_ids: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Screenshot ids whose text is closest in meaning to the search text, with cosine similarities"""
+    embedder = get_embedder()
+    index = open_vector_index(embedder)
+    query = embedder.embed([search_text])[0]
+    return index.search(query, k=k, allowed_ids=allowed_ids)
+
+
+class EmbeddingBackfillJob:
+    """
+    Embeds stored screenshots that have no vector yet.
+
+    Screenshots are walked in id order, `chunk_size` at a time, and embedded in model
+    batches of `batch_size`. Screenshots already in the index are skipped, so the job can
+    be stopped and started again at any time; with `rebuild` the index is emptied first,
+    e.g. after OCR reprocessing changed the text. It waits while `is_busy()` reports that
+    live capture needs the CPU.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 16,
+        chunk_size: int = 256,
+        rebuild: bool = False,
+        is_busy: Optional[Callable[[], bool]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.batch_size = max(1, int(batch_size))
+        self.chunk_size = max(1, int(chunk_size))
+        self.rebuild = rebuild
+        self.is_busy = is_busy
+        self.on_progress = on_progress
+
+        self._cancel_event = threading.Event()
+        self.state = "pending"
+        self.error = None
+        self.last_id = 0
+        self.progress = {"total": 0, "screenshots": 0, "embedded": 0, "skipped": 0, "chunks": 0}
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        """Stop after the chunk in progress"""
+        self._cancel_event.set()
+
+    def run(self):
+        """Embed every screenshot missing from the index, chunk by chunk, until done or cancelled"""
+        self.state = "running"
+        self.started_at = datetime.now(timezone.utc)
+        try:
+            index = open_vector_index(get_embedder())
+            if self.rebuild:
+                index.reset()
+            indexed = index.indexed_ids()
+            with next(get_db()) as db:
+                self.progress["total"] = db.query(Screenshot).count()
+
+            while not self._cancel_event.is_set():
+                with next(get_db()) as db:
+                    chunk = (
+                        db.query(Screenshot.id, Screenshot.window_title, Screenshot.extracted_text)
+                        .filter(Screenshot.id > self.last_id)
+                        .order_by(Screenshot.id)
+                        .limit(self.chunk_size)
+                        .all()
+                    )
+                if not chunk:
+                    break
+
+                done = np.isin(np.array([row.id for row in chunk], dtype=np.int64), indexed)
+                todo = [tuple(row) for row, skip in zip(chunk, done) if not skip]
+                while self.is_busy is not None and self.is_busy() and not self._cancel_event.is_set():
+                    time.sleep(0.5)
+                embedded = embed_screenshots(todo, batch_size=self.batch_size)
+
+                self.last_id = chunk[-1].id
+                self.progress["screenshots"] += len(chunk)
+                self.progress["embedded"] += embedded
+                self.progress["skipped"] += len(chunk) - embedded
+                self.progress["chunks"] += 1
+                if self.on_progress is not None:
+                    self.on_progress(self.get_status())
+
+            self.state = "cancelled" if self._cancel_event.is_set() else "completed"
+        except KeyboardInterrupt:
+            # Vectors added so far are kept; a new run skips them
+            self.state = "cancelled"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"Embedding backfill failed: {e}")
+        finally:
+            self.finished_at = datetime.now(timezone.utc)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return the job state, progress and throughput"""
+        elapsed = (
+            ((self.finished_at or datetime.now(timezone.utc)) - self.started_at).total_seconds()
+            if self.started_at
+            else 0
+        )
+        return {
+            "state": self.state,
+            "error": self.error,
+            "rebuild": self.rebuild,
+            "progress": dict(self.progress),
+            "last_id": self.last_id,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "texts_per_second": round(self.progress["embedded"] / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+class EmbeddingBackfillManager:
+    """Runs at most one embedding backfill at a time on a background thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.job: Optional[EmbeddingBackfillJob] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, job: EmbeddingBackfillJob) -> bool:
+        """Start a job in the background; returns False if one is already running"""
+        with self._lock:
+            if self.is_running():
+                return False
+            self.job = job
+            self._thread = threading.Thread(target=job.run, name="embedding-backfill", daemon=True)
+            self._thread.start()
+            return True
+
+    def cancel(self) -> bool:
+        """Ask the running job to stop; returns False if nothing is running"""
+        with self._lock:
+            if not self.is_running():
+                return False
+            self.job.cancel()
+            return True
+
+    def get_status(self) -> Optional[Dict[str, Any]]:
+        return self.job.get_status() if self.job is not None else None
+
+
+# Global embedding backfill manager for the API
+embedding_backfill = EmbeddingBackfillManager()
@@ -9,6 +9,87 @@ DEFAULT_SETTINGS = {
     "enable_summarization": False,
     "capture_interval": 300,  # Default 5 minutes (300 seconds)
     "summarization_model": "Qwen/Qwen2.5-0.5B",  # Default model
+    # Shorten the interval while the screen keeps changing, back off while idle and capture on focus changes
+    "adaptive_capture": True,
+    "min_capture_interval": 10,
+    "max_capture_interval": 600,
+    "focus_poll_interval": 1.0,
+    # Poll the active window while waiting, to capture early on focus changes. "auto" polls only when the
+    # window can be read in-process (python-xlib on X11, the Win32 API on Windows); any other backend spawns
+    # xdotool/wmctrl/osascript processes on every poll, i.e. every focus_poll_interval seconds even while
+    # idle. "on" polls with any backend, "off" never polls
+    "focus_polling": "auto",
+    "capture_monitors": "all",  # "all", "primary" or a list of monitor indexes (1 = primary)
+    "change_detector": "dhash",  # One of: downsampled, ahash, dhash, phash
+    "change_threshold": None,  # Fraction of the fingerprint that must change (None = detector default)
+    "incremental_ocr": True,  # Only re-read the screen tiles that changed since the last capture
+    "ocr_tile_rows": 8,
+    "ocr_tile_cols": 8,
+    "ocr_full_frame_threshold": 0.6,  # Read the whole frame when at least this fraction of tiles changed
+    # Pages from concurrently processed frames are read in one OCR call of up to this many pages,
+    # waiting at most ocr_batch_wait_ms for the batch to fill
+    "ocr_batch_size": 8,
+    "ocr_batch_wait_ms": 50,
+    # OCR engine, one of: doctr (PyTorch), onnx (onnxruntime fp32), onnx_int8 (onnxruntime int8-quantized)
+    "ocr_backend": "doctr",
+    # Intra-op threads per OCR runtime (0 = runtime default); in process mode ocr_torch_threads applies instead
+    "ocr_threads": {"doctr": 0, "onnx": 0},
+    # "thread" runs OCR inside the server process; "process" runs it in ocr_process_workers worker
+    # processes with ocr_torch_threads torch threads each, restarting any stuck longer than ocr_job_timeout
+    "ocr_mode": "thread",
+    "ocr_process_workers": 2,
+    "ocr_torch_threads": 2,
+    "ocr_job_timeout": 120,
+    # OCR preprocessing, one of: accurate (full frame), balanced (downscaled), fast (active window, downscaled,
+    # grayscale); see utils/ocr_preprocessing.py
+    "ocr_profile": "accurate",
+    # Reuse the OCR result of any frame or tile whose pixels were read before, kept on disk in LRU order
+    "ocr_cache_enabled": True,
+    "ocr_cache_max_mb": 64,
+    # Keep word boxes and confidences of each frame (~11-19 bytes per word) so search hits can be highlighted
+    "store_word_geometry": True,
+    "word_geometry_max_words": 5000,  # Words kept per frame, in reading order; bounds the size per frame
+    # Ranked search: BM25 weight of matches in each field, and the age in days at which a match's
+    # score is halved (0 ranks by text relevance alone)
+    "search_weight_text": 1.0,
+    "search_weight_title": 4.0,
+    "search_weight_notes": 2.0,
+    "search_recency_half_life_days": 30,
+    # Semantic search: embed each screenshot's window title and OCR text with a small local model on
+    # CPU, into an on-disk vector index searched together with the keyword index
+    "semantic_search_enabled": False,
+    "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+    "embedding_batch_size": 16,  # Texts per model call in the embed stage and the backfill
+    "semantic_index_dtype": "float16",  # "int8" halves the index again at a small loss of precision
+    "semantic_nprobe": 16,  # Inverted lists scanned per search once the index is large enough to have them
+    "semantic_weight": 0.5,  # Share of the semantic score in hybrid search; the rest is keyword relevance
+    # Log each frame's progress through the pipeline so frames left unfinished by a crash or shutdown
+    # resume at the next start; at most journal_max_replay frames no older than journal_max_age_hours
+    "journal_enabled": True,
+    "journal_max_replay": 500,
+    "journal_max_age_hours": 24,
+    "journal_fsync": False,  # Also survive power loss, at the cost of a disk flush per stage
+    "image_profile": "webp_fast",  # Encoding profile for stored screenshots, see utils/encoding.py
+    # Store each distinct frame once; repeat sightings reuse its blob and OCR result
+    "dedup_enabled": True,
+    # Max differing dHash bits for a perceptual match; None matches pixel-identical frames only. A
+    # perceptual match reuses the stored image but still runs OCR, since small edits keep the dHash
+    "dedup_perceptual_distance": None,
+    "dedup_recent_frames": 5000,  # How many recent frames are searched for perceptual matches
+    # Rules checked against the active window before capture, e.g.
+    # {"name": "banking", "app_names": ["firefox"], "title_pattern": "bank", "monitors": [1], "action": "drop"}
+    # "drop" skips the capture, "skip_ocr" stores the screenshot without OCR or summary
+    "exclusion_rules": [],
+    # Worker count, queue bound and drop policy for each capture pipeline stage
+    "pipeline": {
+        "encode": {"workers": 2, "queue_size": 4, "drop_policy": "drop_oldest"},
+        # Several OCR workers keep frames in flight together so the OCR batcher can group them
+        "ocr": {"workers": 4, "queue_size": 8, "drop_policy": "block"},
+        "summary": {"workers": 1, "queue_size": 8, "drop_policy": "block"},
+        "persist": {"workers": 1, "queue_size": 16, "drop_policy": "block"},
+        # Only part of the pipeline with semantic search on; a worker embeds whatever frames are queued at once
+        "embed": {"workers": 1, "queue_size": 32, "drop_policy": "block"},
+    },
 }
 
 
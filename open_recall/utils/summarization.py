@@ -1,8 +1,6 @@
 import logging
 
-import torch
 from huggingface_hub import hf_hub_download, snapshot_download
-from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from open_recall.utils.settings import settings_manager
 
@@ -99,6 +97,14 @@ def get_summarizer():
     if model is not None and tokenizer is not None and current_model_name == model_name:
         return True
 
+    # torch and transformers take seconds to import, so they are only loaded once a model is needed
+    try:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+    except ImportError as e:
+        logger.error(f"Summarization dependencies are not available: {e}")
+        return False
+
     # If a different model was previously loaded, unload it to free memory
     if model is not None and current_model_name != model_name:
         logger.info(f"Unloading previous model: {current_model_name}")
@@ -196,6 +202,8 @@ Text: {text}
 Summary:"""
 
         # Generate summary
+        import torch
+
         inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
 
         with torch.no_grad():
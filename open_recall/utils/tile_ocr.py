@@ -0,0 +1,225 @@
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .change_detection import to_small_gray
+
+Region = Tuple[int, int, int, int]
+
+
+def _intersects(box: Tuple[float, float, float, float], region: Region) -> bool:
+    return box[0] < region[2] and box[2] > region[0] and box[1] < region[3] and box[3] > region[1]
+
+
+class TileTracker:
+    """
+    Tracks per-tile fingerprints of consecutive frames from one screen so OCR only
+    has to run on the tiles that changed. Words read from unchanged tiles are reused
+    from the previous result.
+
+    The tracker is not tied to an OCR engine: process() receives a function that
+    reads a list of image crops and returns their words.
+
+    Frames can be read concurrently. Every plan takes the next generation number; a
+    tile still being read for an earlier frame counts as dirty for later frames, and
+    the cached words are only replaced if no later frame has already refreshed the
+    same tiles.
+    """
+
+    def __init__(
+        self,
+        rows: int = 8,
+        cols: int = 8,
+        tile_fingerprint_size: int = 16,
+        tolerance: int = 12,
+        full_frame_threshold: float = 0.6,
+        padding: int = 24,
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.tile_fingerprint_size = tile_fingerprint_size
+        self.tolerance = tolerance
+        self.full_frame_threshold = full_frame_threshold
+        self.padding = padding
+
+        # Guards tile state and cached words; plan() and merge() must be called with it held
+        self.lock = threading.Lock()
+        self._shape: Optional[Tuple[int, int]] = None
+        self._fingerprints: Optional[np.ndarray] = None
+        self._words: List[Dict] = []
+        self._next_generation = 1
+        # Generation of the frame whose words are cached for each tile, and how many reads of each tile are running
+        self._generations = np.zeros((rows, cols), dtype=np.int64)
+        self._in_flight = np.zeros((rows, cols), dtype=np.int64)
+        self.stats = {"frames": 0, "full_frames": 0, "tiles_total": 0, "tiles_ocr": 0}
+
+    def reset(self):
+        """Forget the previous frame so the next one is read in full"""
+        with self.lock:
+            self._shape = None
+            self._fingerprints = None
+            self._words = []
+
+    def _tile_fingerprints(self, image: np.ndarray) -> np.ndarray:
+        """Return a (rows, cols, size, size) array holding a small grayscale thumbnail of every tile"""
+        size = self.tile_fingerprint_size
+        small = to_small_gray(image, (self.cols * size, self.rows * size))
+        return small.reshape(self.rows, size, self.cols, size).swapaxes(1, 2)
+
+    def _tile_rect(self, row0: int, col0: int, row1: int, col1: int) -> Region:
+        """Pixel rectangle covering tiles [row0, row1] x [col0, col1]"""
+        height, width = self._shape
+        return (
+            col0 * width // self.cols,
+            row0 * height // self.rows,
+            (col1 + 1) * width // self.cols,
+            (row1 + 1) * height // self.rows,
+        )
+
+    def _dirty_regions(self, dirty: np.ndarray) -> List[Region]:
+        """Group dirty tiles into connected components and return their bounding rectangles"""
+        seen = np.zeros_like(dirty)
+        regions = []
+        for row, col in zip(*np.nonzero(dirty)):
+            if seen[row, col]:
+                continue
+            seen[row, col] = True
+            stack = [(row, col)]
+            row0, col0, row1, col1 = row, col, row, col
+            while stack:
+                r, c = stack.pop()
+                row0, col0, row1, col1 = min(row0, r), min(col0, c), max(row1, r), max(col1, c)
+                for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if 0 <= nr < self.rows and 0 <= nc < self.cols and dirty[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+            regions.append(self._tile_rect(row0, col0, row1, col1))
+        return regions
+
+    def plan(self, image: np.ndarray) -> Dict:
+        """
+        Compare the frame with the previous one and decide which regions need OCR.
+        Updates the stored tile fingerprints and marks the dirty tiles as being read.
+
+        Returns:
+            dict: regions (dirty rectangles), crops (padded rectangles to OCR), full (whole frame is read),
+            plus the dirty tile mask, generation and cached words that merge() needs
+        """
+        height, width = image.shape[:2]
+        fingerprints = self._tile_fingerprints(image)
+        tiles = self.rows * self.cols
+
+        if self._fingerprints is None or self._shape != (height, width):
+            dirty = np.ones((self.rows, self.cols), dtype=bool)
+        else:
+            delta = np.abs(fingerprints.astype(np.int16) - self._fingerprints.astype(np.int16))
+            dirty = delta.max(axis=(2, 3)) > self.tolerance
+        # The cached words of a tile still being read for an earlier frame are out of date
+        dirty |= self._in_flight > 0
+
+        self._shape = (height, width)
+        self._fingerprints = fingerprints
+        self.stats["frames"] += 1
+        self.stats["tiles_total"] += tiles
+        self.stats["tiles_ocr"] += int(dirty.sum())
+
+        full = dirty.sum() >= self.full_frame_threshold * tiles
+        if full:
+            self.stats["full_frames"] += 1
+            dirty[:] = True
+        self._in_flight[dirty] += 1
+        state = {"dirty": dirty, "generation": self._next_generation, "cached": self._words}
+        self._next_generation += 1
+
+        if full:
+            frame_rect = (0, 0, width, height)
+            return {"full": True, "regions": [frame_rect], "crops": [frame_rect], **state}
+
+        regions = self._dirty_regions(dirty)
+        crops = [
+            (
+                max(0, x0 - self.padding),
+                max(0, y0 - self.padding),
+                min(width, x1 + self.padding),
+                min(height, y1 + self.padding),
+            )
+            for x0, y0, x1, y1 in regions
+        ]
+        return {"full": False, "regions": regions, "crops": crops, **state}
+
+    def merge(self, plan: Dict, crop_words: List[List[Dict]]) -> List[Dict]:
+        """
+        Combine the words read from the planned crops with the cached words of unchanged tiles.
+        Updates the cached words, unless a frame planned later has already refreshed these tiles.
+
+        Args:
+            plan: the result of plan() for this frame
+            crop_words: words for each planned crop, with boxes relative to the crop
+
+        Returns:
+            list: words for the whole frame in reading order
+        """
+        if plan["full"]:
+            merged = crop_words[0] if crop_words else []
+        else:
+            merged = self._merge_regions(plan, crop_words)
+
+        self._release(plan)
+        if not (self._generations[plan["dirty"]] > plan["generation"]).any():
+            self._generations[plan["dirty"]] = plan["generation"]
+            self._words = merged
+        return list(merged)
+
+    def _release(self, plan: Dict):
+        """Mark the planned tiles as no longer being read"""
+        self._in_flight[plan["dirty"]] -= 1
+
+    def _merge_regions(self, plan: Dict, crop_words: List[List[Dict]]) -> List[Dict]:
+        """Replace the words in the planned regions with the fresh reads and renumber blocks and lines"""
+        # Keep cached words that do not touch any dirty region; changed regions are replaced by fresh reads
+        blocks: Dict[Tuple, List[Dict]] = {}
+        for word in plan["cached"]:
+            if not any(_intersects(word["box"], region) for region in plan["regions"]):
+                blocks.setdefault(("cached", word["block"]), []).append(word)
+
+        for index, (region, crop, words) in enumerate(zip(plan["regions"], plan["crops"], crop_words)):
+            offset_x, offset_y = crop[0], crop[1]
+            for word in words:
+                x0, y0, x1, y1 = word["box"]
+                box = (x0 + offset_x, y0 + offset_y, x1 + offset_x, y1 + offset_y)
+                # Words only inside the padding belong to clean tiles, which already kept their cached copy
+                if _intersects(box, region):
+                    blocks.setdefault((index, word["block"]), []).append({**word, "box": box})
+
+        # Order blocks top-to-bottom, left-to-right and renumber blocks and lines
+        ordered = sorted(blocks.values(), key=lambda ws: (min(w["box"][1] for w in ws), min(w["box"][0] for w in ws)))
+        merged = []
+        line_ids: Dict[Tuple[int, int], int] = {}
+        for block_index, block_words in enumerate(ordered):
+            for word in block_words:
+                line = line_ids.setdefault((block_index, word["line"]), len(line_ids))
+                merged.append({**word, "block": block_index, "line": line})
+        return merged
+
+    def process(self, image: np.ndarray, read_crops: Callable[[List[np.ndarray]], List[List[Dict]]]) -> List[Dict]:
+        """Plan and merge under the tracker lock, reading the dirty crops with `read_crops` outside it"""
+        with self.lock:
+            plan = self.plan(image)
+        crops = [image[y0:y1, x0:x1] for x0, y0, x1, y1 in plan["crops"]]
+        try:
+            crop_words = read_crops(crops) if crops else []
+        except Exception:
+            with self.lock:
+                self._release(plan)
+                # The fingerprints already describe this frame but the cached words do not
+                self._fingerprints = None
+            raise
+        with self.lock:
+            return self.merge(plan, crop_words)
+
+    def get_stats(self) -> Dict:
+        """Return how many tiles were read compared to the total seen"""
+        stats = dict(self.stats)
+        stats["ocr_tile_ratio"] = round(stats["tiles_ocr"] / stats["tiles_total"], 3) if stats["tiles_total"] else 0.0
+        return stats
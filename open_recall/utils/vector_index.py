@@ -0,0 +1,348 @@
+import json
+import math
+import os
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .settings import BASE_DIR
+
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, "data", "vectors")
+
+# Storage types for vectors: float16 halves float32, int8 halves it again at a small loss of precision
+INDEX_DTYPES = {"float16": np.float16, "int8": np.int8}
+
+# Rows scored per matrix product during a scan, which bounds the memory a search needs
+SCAN_CHUNK = 65536
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first"""
+    if len(scores) > k:
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+class VectorIndex:
+    """
+    On-disk index of unit vectors keyed by screenshot id, with approximate nearest-neighbour search.
+
+    Vectors, their screenshot ids and their inverted-list numbers live in memory-mapped files
+    that grow as vectors are appended, so the index costs page cache rather than heap, and
+    reopening it is instant. Until `train_threshold` vectors are stored every search scans
+    them all. From then on the index works as an inverted file (IVF): spherical k-means
+    splits the vectors into about sqrt(n) lists, and a search scores only the vectors in
+    the `nprobe` lists whose centroids are closest to the query. The lists are retrained
+    whenever the index has doubled in size since the last training. Removed vectors keep
+    their rows with the id -1 until the index is reset.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_INDEX_PATH,
+        dtype: str = "float16",
+        nprobe: int = 16,
+        train_threshold: int = 20000,
+        train_sample: int = 50000,
+    ):
+        self.path = path
+        self.dtype = dtype
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.train_sample = train_sample
+        self.meta: Optional[Dict[str, Any]] = None
+        self._vectors = None
+        self._ids = None
+        self._lists = None
+        self._centroids: Optional[np.ndarray] = None
+        self._training = False
+        self._lock = threading.RLock()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_meta(self):
+        temp_path = self._file("meta.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(temp_path, self._file("meta.json"))
+
+    def _map(self, capacity: int, mode: str):
+        dim = self.meta["dim"]
+        self._vectors = np.memmap(
+            self._file("vectors.bin"), dtype=INDEX_DTYPES[self.meta["dtype"]], mode=mode, shape=(capacity, dim)
+        )
+        self._ids = np.memmap(self._file("ids.bin"), dtype=np.int64, mode=mode, shape=(capacity,))
+        self._lists = np.memmap(self._file("lists.bin"), dtype=np.int32, mode=mode, shape=(capacity,))
+
+    def open(self, dim: int, model_name: str):
+        """
+        Open the index for vectors of a model, creating it if needed
+
+        An index built with another model, dimension or storage type is discarded, since
+        its vectors cannot be compared with the new ones.
+        """
+        with self._lock:
+            meta = None
+            if os.path.exists(self._file("meta.json")):
+                with open(self._file("meta.json")) as f:
+                    meta = json.load(f)
+            if meta is None or (meta["dim"], meta["model"], meta["dtype"]) != (dim, model_name, self.dtype):
+                if meta is not None:
+                    print(f"Vector index was built with {meta['model']} ({meta['dtype']}), starting a new one")
+                self._create(dim, model_name)
+                return
+            self.meta = meta
+            self._map(meta["capacity"], "r+")
+            centroids_path = self._file("centroids.npy")
+            self._centroids = np.load(centroids_path) if meta["nlist"] and os.path.exists(centroids_path) else None
+
+    def open_existing(self) -> bool:
+        """Open the index as it was last built, whatever model it was built with; False if there is none"""
+        with self._lock:
+            if self.is_open():
+                return True
+            if not os.path.exists(self._file("meta.json")):
+                return False
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+            self.dtype = meta["dtype"]
+            self.open(meta["dim"], meta["model"])
+            return True
+
+    def _create(self, dim: int, model_name: str, capacity: int = 4096):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = {
+            "model": model_name,
+            "dim": dim,
+            "dtype": self.dtype,
+            "count": 0,
+            "capacity": capacity,
+            "nlist": 0,
+            "trained_count": 0,
+            "removed": 0,
+        }
+        self._map(capacity, "w+")
+        self._lists[:] = -1
+        self._centroids = None
+        self._write_meta()
+
+    def is_open(self) -> bool:
+        return self.meta is not None
+
+    def reset(self):
+        """Drop every vector, keeping the model and storage type"""
+        with self._lock:
+            self._create(self.meta["dim"], self.meta["model"])
+
+    def _grow(self, needed: int):
+        capacity = self.meta["capacity"]
+        while capacity < needed:
+            capacity *= 2
+        for array in (self._vectors, self._ids, self._lists):
+            array.flush()
+        # Searches in progress keep their mapping of the old, smaller files
+        self._vectors = self._ids = self._lists = None
+        for name, itemsize in (
+            ("vectors.bin", np.dtype(INDEX_DTYPES[self.meta["dtype"]]).itemsize * self.meta["dim"]),
+            ("ids.bin", 8),
+            ("lists.bin", 4),
+        ):
+            with open(self._file(name), "r+b") as f:
+                f.truncate(capacity * itemsize)
+        self._map(capacity, "r+")
+        self._lists[self.meta["capacity"] :] = -1
+        self.meta["capacity"] = capacity
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        if self.meta["dtype"] == "int8":
+            return np.clip(np.rint(vectors * 127), -127, 127).astype(np.int8)
+        return vectors.astype(np.float16)
+
+    def _scores(self, vectors: np.ndarray, rows, query: np.ndarray) -> np.ndarray:
+        """Dot products of the query with stored rows, given as a slice or as row numbers"""
+        scores = vectors[rows].astype(np.float32) @ query
+        return scores / 127 if self.meta["dtype"] == "int8" else scores
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Append unit vectors for screenshot ids"""
+        if len(ids) == 0:
+            return
+        with self._lock:
+            count = self.meta["count"]
+            end = count + len(ids)
+            if end > self.meta["capacity"]:
+                self._grow(end)
+            self._vectors[count:end] = self._quantize(vectors)
+            self._ids[count:end] = ids
+            if self._centroids is not None:
+                self._lists[count:end] = np.argmax(vectors @ self._centroids.T, axis=1)
+            for array in (self._vectors, self._ids, self._lists):
+                array.flush()
+            # The count is only raised once the rows are on disk, so a crash never exposes half-written rows
+            self.meta["count"] = end
+            self._write_meta()
+            retrain = end >= self.train_threshold and end >= 2 * self.meta["trained_count"] and not self._training
+        if retrain:
+            self.train()
+
+    def remove(self, ids: np.ndarray) -> int:
+        """Drop the vectors of screenshot ids from search results; returns how many were removed"""
+        with self._lock:
+            if not self.is_open() or self.meta["count"] == 0 or len(ids) == 0:
+                return 0
+            rows = np.flatnonzero(np.isin(self._ids[: self.meta["count"]], ids))
+            if len(rows) == 0:
+                return 0
+            self._ids[rows] = -1
+            self._ids.flush()
+            self.meta["removed"] = self.meta.get("removed", 0) + len(rows)
+            self._write_meta()
+            return len(rows)
+
+    def train(self, iterations: int = 10, seed: int = 0):
+        """Cluster the stored vectors into inverted lists with spherical k-means"""
+        with self._lock:
+            if self._training or self.meta["count"] == 0:
+                return
+            self._training = True
+            count = self.meta["count"]
+            vectors = self._vectors
+        try:
+            self._train(vectors, count, iterations, seed)
+        finally:
+            self._training = False
+
+    def _train(self, vectors: np.ndarray, count: int, iterations: int, seed: int):
+        nlist = max(1, min(4096, int(math.sqrt(count))))
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(count, size=min(count, self.train_sample), replace=False))
+        sample = vectors[sample_rows].astype(np.float32)
+        if self.meta["dtype"] == "int8":
+            sample /= 127
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            # An empty list restarts from a random sample vector
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True).clip(min=1e-9)
+
+        lists = np.empty(count, dtype=np.int32)
+        for start in range(0, count, SCAN_CHUNK):
+            block = vectors[start : min(start + SCAN_CHUNK, count)].astype(np.float32)
+            lists[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        with self._lock:
+            # Vectors appended while training are assigned too
+            added = self.meta["count"] - count
+            if added:
+                tail = self._vectors[count : count + added].astype(np.float32)
+                if self.meta["dtype"] == "int8":
+                    tail /= 127
+                self._lists[count : count + added] = np.argmax(tail @ centroids.T, axis=1)
+            self._lists[:count] = lists
+            self._lists.flush()
+            np.save(self._file("centroids.npy"), centroids)
+            self._centroids = centroids
+            self.meta["nlist"] = nlist
+            self.meta["trained_count"] = self.meta["count"]
+            self._write_meta()
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 100,
+        allowed_ids: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the stored vectors most similar to a unit query vector
+
+        Args:
+            query: unit vector from the same model
+            k: number of results
+            allowed_ids: only consider these screenshot ids; the search is then exact over them
+            nprobe: inverted lists to scan, overriding the index default
+
+        Returns:
+            tuple: (screenshot ids, cosine similarities), most similar first
+        """
+        with self._lock:
+            if not self.is_open() or self.meta["count"] == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            count = self.meta["count"]
+            # Searches keep these mappings even if the files are remapped while they run
+            vectors, ids, lists, centroids = self._vectors, self._ids[:count], self._lists[:count], self._centroids
+        query = np.asarray(query, dtype=np.float32)
+
+        rows = None
+        if allowed_ids is not None:
+            rows = np.flatnonzero(np.isin(ids, allowed_ids))
+        elif centroids is not None:
+            probe = _top_k(centroids @ query, min(nprobe or self.nprobe, len(centroids)))
+            probed = np.zeros(len(centroids), dtype=bool)
+            probed[probe] = True
+            rows = np.flatnonzero(probed[lists])
+
+        if rows is None:
+            scores = np.concatenate(
+                [
+                    self._scores(vectors, slice(start, min(start + SCAN_CHUNK, count)), query)
+                    for start in range(0, count, SCAN_CHUNK)
+                ]
+            )
+            scores[np.asarray(ids) < 0] = -np.inf
+            best = _top_k(scores, k)
+            best = best[np.isfinite(scores[best])]
+            return np.asarray(ids[best]), scores[best]
+        rows = rows[np.asarray(ids[rows]) >= 0]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.concatenate(
+            [
+                self._scores(vectors, rows[start : start + SCAN_CHUNK], query)
+                for start in range(0, len(rows), SCAN_CHUNK)
+            ]
+        )
+        best = _top_k(scores, k)
+        return np.asarray(ids[rows[best]]), scores[best]
+
+    def indexed_ids(self) -> np.ndarray:
+        """Screenshot ids that have a vector"""
+        with self._lock:
+            if not self.is_open():
+                return np.empty(0, dtype=np.int64)
+            ids = np.array(self._ids[: self.meta["count"]])
+            return ids[ids >= 0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the size and layout of the index"""
+        with self._lock:
+            if not self.is_open():
+                return {"open": False}
+            return {
+                "open": True,
+                "model": self.meta["model"],
+                "dtype": self.meta["dtype"],
+                "dim": self.meta["dim"],
+                "vectors": self.meta["count"] - self.meta.get("removed", 0),
+                "removed_vectors": self.meta.get("removed", 0),
+                "inverted_lists": self.meta["nlist"],
+                "nprobe": self.nprobe,
+                "disk_mb": round(
+                    sum(os.path.getsize(self._file(name)) for name in os.listdir(self.path)) / 1e6,
+                    2,
+                ),
+            }
+
+
+# Global vector index, opened once the embedding model is known
+vector_index = VectorIndex()
@@ -0,0 +1,180 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import psutil
+
+
+def truncate_title(title: str, limit: int = 100) -> str:
+    """Truncate long window titles"""
+    if len(title) > limit:
+        return title[: limit - 3] + "..."
+    return title
+
+
+class ProcessInfoCache:
+    """
+    Caches PID -> (app name, executable path) lookups.
+
+    Entries remember the process creation time, so a PID that the OS has reused for a
+    different process is detected and resolved again instead of returning a stale name.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._cache: "OrderedDict[int, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def lookup(self, pid: int) -> Optional[Tuple[str, str]]:
+        """Return (app name, exe) for a PID, or None if the process is gone or inaccessible"""
+        try:
+            process = psutil.Process(pid)
+            created = process.create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+            return None
+
+        with self._lock:
+            cached = self._cache.get(pid)
+            if cached is not None and cached[0] == created:
+                self._cache.move_to_end(pid)
+                self.stats["hits"] += 1
+                return cached[1], cached[2]
+
+        try:
+            app_name = process.name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+        # Try to get a better name from the executable path
+        exe = ""
+        try:
+            exe = process.exe() or ""
+            if exe:
+                better_name = os.path.splitext(os.path.basename(exe))[0]
+                if better_name and better_name != app_name:
+                    app_name = better_name
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._cache[pid] = (created, app_name, exe)
+            self._cache.move_to_end(pid)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return app_name, exe
+
+
+# Global process info cache shared by all window info backends
+process_cache = ProcessInfoCache()
+
+
+class X11WindowBackend:
+    """
+    Reads the active window from an X server over one persistent connection.
+
+    Uses the EWMH properties _NET_ACTIVE_WINDOW on the root window and _NET_WM_NAME /
+    _NET_WM_PID on the active window, so each lookup is a few X round trips instead of
+    spawning xdotool processes. Requires python-xlib.
+    """
+
+    def __init__(self, display_name: Optional[str] = None):
+        # Import here so the dependency stays optional on non-X11 systems
+        from Xlib import display as xdisplay
+
+        self.display_name = display_name
+        self._xdisplay = xdisplay
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        from Xlib import X
+
+        self._display = self._xdisplay.Display(self.display_name)
+        self._root = self._display.screen().root
+        self._any_property_type = X.AnyPropertyType
+        self._atoms = {
+            name: self._display.intern_atom(name)
+            for name in ("_NET_ACTIVE_WINDOW", "_NET_WM_NAME", "_NET_WM_PID", "UTF8_STRING")
+        }
+
+    def close(self):
+        """Close the X connection"""
+        with self._lock:
+            if self._display is not None:
+                try:
+                    self._display.close()
+                except Exception:
+                    pass
+                self._display = None
+
+    def _property(self, window, atom_name: str, property_type=None):
+        prop = window.get_full_property(self._atoms[atom_name], property_type or self._any_property_type)
+        return prop.value if prop is not None else None
+
+    def active_window(self) -> Optional[Tuple[int, str, Optional[int]]]:
+        """Return (window id, title, pid) of the active window, or None if there is none"""
+        from Xlib import error as xerror
+
+        with self._lock:
+            if self._display is None:
+                self._connect()
+            try:
+                value = self._property(self._root, "_NET_ACTIVE_WINDOW")
+                if not value or not value[0]:
+                    return None
+                window_id = int(value[0])
+                window = self._display.create_resource_object("window", window_id)
+
+                title = self._property(window, "_NET_WM_NAME", self._atoms["UTF8_STRING"])
+                if title is None:
+                    title = window.get_wm_name()
+                if isinstance(title, bytes):
+                    title = title.decode("utf-8", errors="replace")
+
+                pid_value = self._property(window, "_NET_WM_PID")
+                pid = int(pid_value[0]) if pid_value else None
+                return window_id, title or "", pid
+            except (xerror.BadWindow, xerror.BadAtom):
+                # The window closed between reading _NET_ACTIVE_WINDOW and its properties
+                return None
+            except (xerror.ConnectionClosedError, OSError):
+                # Reconnect on the next call
+                self._display = None
+                raise
+
+    def active_window_rect(self) -> Optional[Tuple[int, int, int, int]]:
+        """Return the active window's rectangle (x0, y0, x1, y1) in root window coordinates, or None"""
+        from Xlib import error as xerror
+
+        with self._lock:
+            if self._display is None:
+                self._connect()
+            try:
+                value = self._property(self._root, "_NET_ACTIVE_WINDOW")
+                if not value or not value[0]:
+                    return None
+                window = self._display.create_resource_object("window", int(value[0]))
+                geometry = window.get_geometry()
+                origin = self._root.translate_coords(window, 0, 0)
+                return origin.x, origin.y, origin.x + geometry.width, origin.y + geometry.height
+            except (xerror.BadWindow, xerror.BadDrawable, xerror.BadAtom):
+                return None
+            except (xerror.ConnectionClosedError, OSError):
+                self._display = None
+                raise
+
+    def get_active_window_info(self) -> Optional[Tuple[str, str]]:
+        """Return (app name, window title) of the active window, or None if it cannot be resolved"""
+        active = self.active_window()
+        if active is None:
+            return None
+
+        _, title, pid = active
+        resolved = process_cache.lookup(pid) if pid else None
+        if resolved is None:
+            return None
+        app_name = resolved[0]
+        return app_name, truncate_title(title or app_name)